@@ -0,0 +1,127 @@
+"""
+Métricas do Prometheus, exportadas em ``/metrics``.
+
+Registradas pelo ``app.middleware.MetricsMiddleware`` em todas as
+requisições, com a ViewSet e a action do DRF como labels (nas demais views,
+o nome da rota e o método):
+
+- ``livraria_http_request_duration_seconds``: histograma da latência;
+- ``livraria_http_responses_total``: respostas por código de status;
+- ``livraria_db_queries_per_request``: histograma das consultas SQL;
+- ``livraria_db_query_duration_seconds_total``: tempo total em SQL;
+- ``livraria_response_cache_requests_total``: acertos (``hit``) e faltas
+  (``miss``) do cache de respostas (``core.cache``, só com um cache
+  compartilhado). A taxa de acertos é
+  ``sum(rate(..{resultado="hit"}[5m])) / sum(rate(..[5m]))``.
+
+E pelo ``app.middleware.ServerTimingMiddleware``, só nas requisições
+amostradas (``SERVER_TIMING_SAMPLE_RATE``), com o nome da rota
+(``livros-list``, ``compras-finalizar``...) como label:
+
+- ``livraria_server_timing_requests_total``: requisições medidas;
+- ``livraria_server_timing_queries_total``: consultas SQL;
+- ``livraria_server_timing_seconds_total``: tempo por trecho (``sql``,
+  ``view``, ``render`` e ``total``). A média de um trecho na rota é
+  ``rate(..seconds_total{trecho="sql"}[5m]) / rate(..requests_total[5m])``.
+
+O endpoint só responde com ``PROMETHEUS_METRICS = True`` e um
+``PROMETHEUS_METRICS_TOKEN`` definido, enviado como ``Authorization: Bearer
+<token>`` (sem o token configurado, 404; com um token errado, 401).
+
+Com vários processos (workers do gunicorn), defina a variável de ambiente
+``PROMETHEUS_MULTIPROC_DIR`` com um diretório compartilhado: cada processo
+grava as suas métricas nele e ``/metrics`` soma as de todos
+(``gunicorn.conf.py`` limpa o diretório ao iniciar e descarta os workers
+encerrados).
+"""
+
+import hmac
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LABELS = ('viewset', 'action', 'method')
+SEM_ROTA = '<sem rota>'
+
+DURACAO = Histogram(
+    'livraria_http_request_duration_seconds',
+    'Duração das requisições, até a resposta ser retornada pela view.',
+    LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPOSTAS = Counter('livraria_http_responses', 'Respostas por código de status.', (*LABELS, 'status'))
+CONSULTAS = Histogram(
+    'livraria_db_queries_per_request',
+    'Consultas SQL por requisição.',
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+TEMPO_SQL = Counter('livraria_db_query_duration_seconds', 'Tempo gasto em consultas SQL.', LABELS)
+CACHE = Counter(
+    'livraria_response_cache_requests',
+    'Consultas ao cache de respostas (cabeçalho X-Cache).',
+    (*LABELS, 'resultado'),
+)
+AMOSTRAS = Counter('livraria_server_timing_requests', 'Requisições medidas pelo Server-Timing.', ('rota',))
+CONSULTAS_AMOSTRADAS = Counter('livraria_server_timing_queries', 'Consultas SQL das requisições medidas.', ('rota',))
+TRECHOS = Counter('livraria_server_timing_seconds', 'Tempo das requisições medidas, por trecho.', ('rota', 'trecho'))
+TRECHOS_MEDIDOS = ('sql', 'view', 'render', 'total')
+
+
+def rotulos(request):
+    """ViewSet e action do DRF; nas demais views, o nome da rota e o método."""
+    metodo = request.method
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return SEM_ROTA, SEM_ROTA, metodo
+
+    classe = getattr(match.func, 'cls', None)
+    if classe is None:
+        return match.view_name or match._func_path, metodo.lower(), metodo
+    acoes = getattr(match.func, 'actions', None) or {}
+    return classe.__name__, acoes.get(metodo.lower(), metodo.lower()), metodo
+
+
+def registrar(request, response, metricas, duracao):
+    labels = rotulos(request)
+    DURACAO.labels(*labels).observe(duracao)
+    RESPOSTAS.labels(*labels, response.status_code).inc()
+    CONSULTAS.labels(*labels).observe(metricas['consultas'])
+    TEMPO_SQL.labels(*labels).inc(metricas['sql'])
+    resultado = response.get('X-Cache')
+    if resultado:
+        CACHE.labels(*labels, resultado.lower()).inc()
+
+
+def registrar_amostra(rota, metricas):
+    AMOSTRAS.labels(rota).inc()
+    CONSULTAS_AMOSTRADAS.labels(rota).inc(metricas['consultas'])
+    for trecho in TRECHOS_MEDIDOS:
+        TRECHOS.labels(rota, trecho).inc(metricas[trecho])
+
+
+def _registro():
+    if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro)
+    return registro
+
+
+def metrics(request):
+    token = getattr(settings, 'PROMETHEUS_METRICS_TOKEN', '')
+    if not token or not getattr(settings, 'PROMETHEUS_METRICS', False):
+        raise Http404
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(generate_latest(_registro()), content_type=CONTENT_TYPE_LATEST)
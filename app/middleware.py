@@ -0,0 +1,210 @@
+import functools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from app import metrics
+
+# Server-Timing e métricas do Prometheus
+
+# Métricas da requisição em medição (None quando a requisição não é medida)
+_metricas = ContextVar('server_timing', default=None)
+METRICAS = ('consultas', 'sql', 'view', 'render', 'total')
+METRICS_PATH = '/metrics'
+
+
+def _medir_sql(execute, sql, params, many, context):
+    metricas = _metricas.get()
+    if metricas is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metricas['sql'] += time.perf_counter() - inicio
+        metricas['consultas'] += 1
+
+
+def _instalar_em_conexao(connection, **kwargs):
+    if _medir_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_sql)
+
+
+def iniciar_trecho():
+    """Marca o início de um trecho medido; ``None`` fora de uma requisição medida."""
+    metricas = _metricas.get()
+    if metricas is None:
+        return None
+    return metricas, time.perf_counter(), metricas['sql']
+
+
+def encerrar_trecho(metrica, inicio):
+    """Soma em ``metrica`` a duração do trecho iniciado em ``inicio``, sem o SQL executado nele."""
+    if inicio is None:
+        return
+    metricas, instante, sql = inicio
+    metricas[metrica] += time.perf_counter() - instante - (metricas['sql'] - sql)
+
+
+@contextmanager
+def medir_trecho(metrica):
+    """``iniciar_trecho``/``encerrar_trecho`` em torno de um bloco."""
+    inicio = iniciar_trecho()
+    try:
+        yield
+    finally:
+        encerrar_trecho(metrica, inicio)
+
+
+@functools.cache
+def instrumentar():
+    """
+    Instala, uma vez por processo, um execute wrapper em cada conexão, que
+    mede o SQL. A view (``MedicaoViewMixin``) e a
+    renderização (``app.renderers``) são medidas pelas próprias classes do
+    DRF. Fora de uma requisição medida, cada ponto só consulta um ``ContextVar``.
+    """
+    connection_created.connect(_instalar_em_conexao, dispatch_uid='server_timing')
+    for conexao in connections.all(initialized_only=True):
+        _instalar_em_conexao(conexao)
+
+
+class MedicaoViewMixin:
+    """
+    Mede o handler das views do DRF (a lógica da view e a serialização, sem o
+    SQL), de ``initial()`` a ``finalize_response()``, na métrica ``view``.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._inicio_medicao = iniciar_trecho()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        encerrar_trecho('view', getattr(self, '_inicio_medicao', None))
+        self._inicio_medicao = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class MedicaoMiddleware:
+    """
+    Base dos middlewares que medem a requisição (síncronos e assíncronos).
+    As métricas (SQL, view, renderização) ficam no ``ContextVar`` e são
+    compartilhadas quando mais de um middleware mede a mesma requisição.
+
+    As subclasses definem ``registrar``, que recebe a resposta, as métricas e
+    a duração e retorna a resposta; ``ativo`` e ``medir`` escolhem se o
+    middleware é carregado e quais requisições mede.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not self.ativo():
+            raise MiddlewareNotUsed
+        instrumentar()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def ativo(self):
+        return True
+
+    def medir(self, request):
+        return True
+
+    def registrar(self, request, response, metricas, duracao):
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        if not self.medir(request):
+            return self.get_response(request)
+
+        metricas, token = self._iniciar()
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token:
+                _metricas.reset(token)
+        # Em respostas em fluxo, a duração não inclui o envio do conteúdo
+        return self.registrar(request, response, metricas, time.perf_counter() - inicio)
+
+    async def _acall(self, request):
+        if not self.medir(request):
+            return await self.get_response(request)
+
+        metricas, token = self._iniciar()
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token:
+                _metricas.reset(token)
+        return self.registrar(request, response, metricas, time.perf_counter() - inicio)
+
+    @staticmethod
+    def _iniciar():
+        metricas = _metricas.get()
+        if metricas is not None:
+            return metricas, None
+        metricas = dict.fromkeys(METRICAS, 0)
+        return metricas, _metricas.set(metricas)
+
+
+class ServerTimingMiddleware(MedicaoMiddleware):
+    """
+    Mede, em uma amostra das requisições (``SERVER_TIMING_SAMPLE_RATE``, de 0
+    a 1), a quantidade e o tempo das consultas SQL, a view do DRF (lógica e
+    serialização, sem o SQL) e a renderização. Os tempos vão no cabeçalho ``Server-Timing`` e são
+    somados por rota (``livros-list``, ``compras-finalizar``...) nas métricas
+    ``livraria_server_timing_*`` do Prometheus (``app.metrics``).
+    """
+
+    def ativo(self):
+        self.taxa = float(getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0))
+        return self.taxa > 0
+
+    def medir(self, request):
+        return self.taxa >= 1 or random.random() < self.taxa
+
+    def registrar(self, request, response, metricas, duracao):
+        metricas = {**metricas, 'total': duracao}
+        match = getattr(request, 'resolver_match', None)
+        metrics.registrar_amostra(match.view_name if match else metrics.SEM_ROTA, metricas)
+
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={metricas["sql"] * 1000:.1f};desc="{metricas["consultas"]} consultas"',
+            f'view;dur={metricas["view"] * 1000:.1f};desc="view e serialização"',
+            f'render;dur={metricas["render"] * 1000:.1f}',
+            f'total;dur={duracao * 1000:.1f}',
+        ])
+        return response
+
+
+class MetricsMiddleware(MedicaoMiddleware):
+    """
+    Registra as métricas do Prometheus (``app.metrics``) de todas as
+    requisições: duração, status, consultas SQL e acertos do cache de
+    respostas (cabeçalho ``X-Cache``), por ViewSet e action do DRF.
+    Desativado com ``PROMETHEUS_METRICS = False``.
+    """
+
+    def ativo(self):
+        return getattr(settings, 'PROMETHEUS_METRICS', False)
+
+    def medir(self, request):
+        return request.path_info != METRICS_PATH
+
+    def registrar(self, request, response, metricas, duracao):
+        metrics.registrar(request, response, metricas, duracao)
+        return response
@@ -2,12 +2,46 @@ from rest_framework import pagination
 from rest_framework.response import Response
 
 
+class CustomCursorPagination(pagination.CursorPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-id'  # ordenação padrão, sobrescrita por `cursor_ordering` na view
+
+    def get_ordering(self, request, queryset, view):
+        # Ignora o OrderingFilter: o cursor só é estável em colunas indexadas e (quase) únicas.
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'page_size': self.page_size,
+            'results': data,
+        })
+
+
 class CustomPagination(pagination.PageNumberPagination):
     page_size = 10  # tamanho padrão da página
     page_size_query_param = 'page_size'  # permitir mudar via query parameter
     max_page_size = 100  # tamanho máximo da página que pode ser solicitado
+    cursor_query_param = 'cursor'  # `?cursor` (mesmo vazio) ativa a paginação por cursor
+
+    cursor_pagination = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.cursor_pagination = CustomCursorPagination()
+            return self.cursor_pagination.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
+        if self.cursor_pagination:
+            return self.cursor_pagination.get_paginated_response(data)
+
         return Response({
             'page': self.page.number,
             'page_size': self.page.paginator.per_page,
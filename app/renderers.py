@@ -0,0 +1,19 @@
+from rest_framework import renderers
+
+from app.middleware import medir_trecho
+
+
+class RenderizacaoMedidaMixin:
+    """Soma a renderização (sem o SQL) às métricas da requisição medida (``Server-Timing``)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with medir_trecho('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class JSONRenderer(RenderizacaoMedidaMixin, renderers.JSONRenderer):
+    pass
+
+
+class BrowsableAPIRenderer(RenderizacaoMedidaMixin, renderers.BrowsableAPIRenderer):
+    pass
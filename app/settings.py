@@ -3,6 +3,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Carrega as variáveis de ambiente do arquivo .env
@@ -15,7 +16,7 @@ MODE = os.getenv('MODE')
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure')
-DEBUG = os.getenv('DEBUG', 'False')
+DEBUG = os.getenv('DEBUG', 'False') == 'True'
 ALLOWED_HOSTS = ['*']
 CSRF_TRUSTED_ORIGINS = [
     'http://localhost:3000',
@@ -30,11 +31,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'cloudinary_storage',
-    'cloudinary',
     'corsheaders',
-    'debug_toolbar',
-    'django_extensions',
     'django_filters',
     'drf_spectacular',
     'rest_framework',
@@ -43,6 +40,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.middleware.MetricsMiddleware',
+    'app.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -52,9 +51,17 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Ferramentas de desenvolvimento: ficam fora do perfil de produção, que só carrega o necessário
+if MODE in {'DEVELOPMENT', 'MIGRATE'}:
+    INSTALLED_APPS.append('django_extensions')  # shell_plus, graph_models
+if MODE == 'DEVELOPMENT' and DEBUG:
+    # Django Debug Toolbar
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+    INTERNAL_IPS = ['127.0.0.1']
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 ROOT_URLCONF = 'app.urls'
@@ -86,6 +93,10 @@ DATABASES = {
     )
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Lock de escrita no BEGIN de toda transação (leituras em atomic incluídas): checkouts concorrentes esperam
+    DATABASES['default'].setdefault('OPTIONS', {})['transaction_mode'] = 'IMMEDIATE'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -126,12 +137,20 @@ else:
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
     STORAGES = {
         'default': {
-            'BACKEND': 'cloudinary_storage.storage.MediaCloudinaryStorage',
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
         },
         'staticfiles': {
             'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
         },
     }
+    if MODE == 'PRODUCTION' and not CLOUDINARY_URL:
+        # Sem Cloudinary, os uploads iriam para o disco efêmero do servidor e se perderiam no próximo deploy
+        raise ImproperlyConfigured('CLOUDINARY_URL é obrigatória com MODE=PRODUCTION.')
+    if CLOUDINARY_URL:
+        # Cloudinary só é carregado quando configurado
+        posicao = INSTALLED_APPS.index('django.contrib.staticfiles') + 1
+        INSTALLED_APPS[posicao:posicao] = ['cloudinary_storage', 'cloudinary']
+        STORAGES['default']['BACKEND'] = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -139,10 +158,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    'DEFAULT_AUTHENTICATION_CLASSES': ('core.autenticacao.CachedJWTAuthentication',),
     'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly',),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'app.pagination.CustomPagination',
+    'DEFAULT_RENDERER_CLASSES': ('app.renderers.JSONRenderer', 'app.renderers.BrowsableAPIRenderer'),
     'PAGE_SIZE': 10,
 }
 
@@ -159,7 +179,29 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
-print(f'{MODE = } \n{MEDIA_URL = } \n{DATABASES = }')
-
-# Django Debug Toolbar
-INTERNAL_IPS = ['127.0.0.1']
+# Cache dos usuários autenticados por JWT (core.autenticacao), em segundos: no processo e no Redis, se houver
+JWT_USER_CACHE_LOCAL_TTL = int(os.getenv('JWT_USER_CACHE_LOCAL_TTL', '5'))
+JWT_USER_CACHE_TIMEOUT = int(os.getenv('JWT_USER_CACHE_TIMEOUT', '300'))
+JWT_USER_CACHE_SIZE = 1000
+
+# Variações geradas para as imagens enviadas (uploader): nome -> (largura, altura) máximas
+IMAGE_VARIANTS = {'thumb': (150, 150), 'medium': (400, 400), 'large': (1024, 1024)}
+IMAGE_VARIANT_FORMATS = ['jpeg', 'webp']
+# Threads por processo que geram as variações em segundo plano
+IMAGE_VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', '2'))
+# Largura x altura máxima aceita no upload, verificada pelo cabeçalho antes de decodificar a imagem
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', '40000000'))
+
+# Cache (respostas de autores, editoras e categorias). Com vários processos, use Redis.
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': os.getenv('REDIS_URL')}
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+
+# Fração das requisições medidas pelo ServerTimingMiddleware (0 desativa; 1 mede todas)
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '0'))
+
+# Métricas do Prometheus em /metrics (app.metrics). Desligadas por padrão; ligadas, o endpoint exige
+# "Authorization: Bearer <token>" e responde 404 enquanto o token não estiver definido
+PROMETHEUS_METRICS = os.getenv('PROMETHEUS_METRICS', 'False') == 'True'
+PROMETHEUS_METRICS_TOKEN = os.getenv('PROMETHEUS_METRICS_TOKEN', '')
@@ -14,6 +14,7 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from app.metrics import metrics
 from core.views import (
     AutorViewSet,
     CategoriaViewSet,
@@ -59,9 +60,11 @@ urlpatterns = [
     path('api/media/', include(uploader_router.urls)),
     # API
     path('api/', include(router.urls)),
+    # Métricas do Prometheus
+    path('metrics', metrics, name='metrics'),
 ]
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
     urlpatterns += [path('__debug__/', include(debug_toolbar.urls))]
 
@@ -6,6 +6,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
+from core import vendas
 from core.models import (
     Autor,
     Categoria,
@@ -109,6 +110,23 @@ class CompraAdmin(admin.ModelAdmin):
     list_per_page = 25
     inlines = [ItensCompraInline]
 
+    # A compra e os itens são gravados em save_model e save_related: os resumos de vendas são atualizados em volta
+    def save_model(self, request, obj, form, change):
+        if change:
+            vendas.retirar_venda(obj)
+        super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        vendas.registrar_venda(form.instance)
+
+    def delete_model(self, request, obj):
+        vendas.excluir_compra(obj)
+
+    def delete_queryset(self, request, queryset):
+        for compra in queryset:
+            vendas.excluir_compra(compra)
+
 
 @admin.register(Favorito)
 class FavoritoAdmin(admin.ModelAdmin):
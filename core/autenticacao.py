@@ -0,0 +1,151 @@
+"""
+Autenticação JWT com cache dos usuários.
+
+O ``JWTAuthentication`` do simplejwt valida o token (assinatura e expiração,
+sem acessar o banco) e depois carrega o usuário pelo id, com uma consulta em
+toda requisição autenticada. Aqui o usuário vem de até dois níveis de cache:
+
+- um LRU no processo, com validade curta (``JWT_USER_CACHE_LOCAL_TTL``), que
+  não faz nenhuma chamada externa;
+- o cache do Django, com validade ``JWT_USER_CACHE_TIMEOUT``, só quando ele é
+  compartilhado entre os processos (``REDIS_URL``). O ``LocMemCache`` padrão é
+  de cada processo: uma invalidação feita em um worker não chegaria aos
+  outros, que usariam o usuário antigo por todo o ``JWT_USER_CACHE_TIMEOUT``.
+  Com ele, só o LRU é usado.
+
+Ao salvar ou excluir um usuário (inclusive ao desativá-lo, mudar o
+``tipo_usuario`` ou a senha), os sinais em ``core.signals`` chamam
+``invalidar_usuarios``: a entrada do processo atual é descartada e, após o
+commit, a geração do usuário no cache compartilhado é incrementada. Os demais
+processos deixam de usar a cópia local em até ``JWT_USER_CACHE_LOCAL_TTL``
+segundos. Alterações com ``update()`` não disparam sinais: chame
+``invalidar_usuarios`` depois delas.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core import cache as cache_respostas
+
+PREFIXO = 'usuarios-jwt'
+
+
+class _LRU:
+    """Dicionário limitado a ``tamanho`` entradas, com validade por entrada."""
+
+    def __init__(self):
+        self._dados = OrderedDict()
+        self._trava = threading.Lock()
+
+    def get(self, chave):
+        with self._trava:
+            entrada = self._dados.get(chave)
+            if entrada is None:
+                return None
+            valor, expira = entrada
+            if expira < time.monotonic():
+                del self._dados[chave]
+                return None
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor, validade, tamanho):
+        with self._trava:
+            self._dados[chave] = (valor, time.monotonic() + validade)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > tamanho:
+                self._dados.popitem(last=False)
+
+    def pop(self, chave):
+        with self._trava:
+            self._dados.pop(chave, None)
+
+
+usuarios_locais = _LRU()
+
+
+def _chave_geracao(user_id):
+    return f'{PREFIXO}:{user_id}:geracao'
+
+
+def _chave_usuario(user_id):
+    geracao = cache.get(_chave_geracao(user_id))
+    if geracao is None:
+        cache.add(_chave_geracao(user_id), time.time_ns(), timeout=None)
+        geracao = cache.get(_chave_geracao(user_id))
+    return f'{PREFIXO}:{user_id}:{geracao}'
+
+
+def _incrementar(ids):
+    for user_id in ids:
+        usuarios_locais.pop(str(user_id))
+        if not cache_respostas.compartilhado():
+            continue
+        try:
+            cache.incr(_chave_geracao(user_id))
+        except ValueError:
+            cache.add(_chave_geracao(user_id), time.time_ns(), timeout=None)
+
+
+def invalidar_usuarios(*ids):
+    """Descarta os usuários guardados, agora no processo atual e depois do commit em todos."""
+    for user_id in ids:
+        usuarios_locais.pop(str(user_id))
+    transaction.on_commit(lambda: _incrementar(ids))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` que busca o usuário no cache antes do banco."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        usuario = usuarios_locais.get(user_id)
+        if usuario is None:
+            usuario = self._buscar(validated_token, user_id)
+            usuarios_locais.set(
+                user_id,
+                usuario,
+                getattr(settings, 'JWT_USER_CACHE_LOCAL_TTL', 5),
+                getattr(settings, 'JWT_USER_CACHE_SIZE', 1000),
+            )
+
+        self._verificar(usuario, validated_token)
+        # Cada requisição recebe a sua cópia: o que a view guardar no usuário não volta ao cache
+        return copy.copy(usuario)
+
+    def _buscar(self, validated_token, user_id):
+        """O usuário do cache compartilhado, se houver um, ou do banco."""
+        if not cache_respostas.compartilhado():
+            return super().get_user(validated_token)
+        chave = _chave_usuario(user_id)
+        usuario = cache.get(chave)
+        if usuario is None:
+            usuario = super().get_user(validated_token)
+            cache.set(chave, usuario, getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 300))
+        return usuario
+
+    @staticmethod
+    def _verificar(usuario, validated_token):
+        """As verificações do ``get_user`` do simplejwt, para os usuários vindos do cache."""
+        if api_settings.CHECK_USER_IS_ACTIVE and not usuario.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(usuario.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
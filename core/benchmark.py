@@ -0,0 +1,608 @@
+"""
+Benchmark dos endpoints da API com dados sintéticos.
+
+``popular`` gera um catálogo, usuários, compras (com os resumos de vendas e as
+estatísticas dos livros já calculados) e favoritos em lotes, com
+``bulk_create``. ``medir`` executa cada cenário de ``CENARIOS`` pelo cliente de
+testes (em processo) e retorna latências (p50/p95/p99), vazão e consultas SQL.
+
+Os cenários que alteram dados rodam em uma transação desfeita a cada
+requisição: todas as repetições partem do mesmo estado.
+"""
+
+import random
+import statistics
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from drf_spectacular.drainage import GENERATOR_STATS
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import search
+from core.models import (
+    Autor,
+    Categoria,
+    Compra,
+    Editora,
+    Favorito,
+    ItensCompra,
+    Livro,
+    LivroEstatistica,
+    User,
+    VendaDiaria,
+    VendaLivro,
+)
+
+TAMANHO_LOTE = 2000
+EMAIL_ADMIN = 'bench-admin@example.com'
+EMAIL_AVULSO = 'bench-avulso@example.com'
+AVULSO = 'Sem referências'  # nome dos registros que os cenários de exclusão removem
+SENHA = 'benchmark-senha'
+PALAVRAS = [
+    'amor', 'guerra', 'código', 'história', 'mar', 'tempo', 'noite', 'cidade', 'segredo', 'jardim',
+    'viagem', 'sombra', 'casa', 'rio', 'fogo', 'memória', 'caminho', 'silêncio', 'estrela', 'python',
+]  # fmt: skip
+STATUS_VENDIDOS = [Compra.StatusCompra.FINALIZADO, Compra.StatusCompra.PAGO, Compra.StatusCompra.ENTREGUE]
+PREFIXO_ROTAS = 'api/'
+ROTAS_IGNORADAS = {'api-root'}
+# Rotas da API fora dos cenários, com o motivo
+ROTAS_EXCLUIDAS = {
+    ('image-list', 'post'): 'grava o arquivo no armazenamento, fora da transação desfeita',
+    ('document-list', 'post'): 'grava o arquivo no armazenamento, fora da transação desfeita',
+    # O FavoritoSerializer recebe o livro pelo contexto, que só o livros-favoritar informa
+    ('favorito-list', 'post'): 'favoritos são criados por POST livros-favoritar',
+}
+
+
+# Dados sintéticos
+
+
+@contextmanager
+def _datas_explicitas():
+    """Permite gravar compras com ``data`` no passado (o campo é ``auto_now_add``)."""
+    campo = Compra._meta.get_field('data')
+    campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        campo.auto_now_add = True
+
+
+def _meia_noite(dia):
+    """Início de ``dia`` no fuso horário local."""
+    return timezone.make_aware(datetime.combine(dia, datetime.min.time()))
+
+
+def _criar(modelo, objetos):
+    """``bulk_create`` em lotes de um iterável, retornando as instâncias (com ``pk``)."""
+    criados, lote = [], []
+    for objeto in objetos:
+        lote.append(objeto)
+        if len(lote) >= TAMANHO_LOTE:
+            criados.extend(modelo.objects.bulk_create(lote))
+            lote = []
+    if lote:
+        criados.extend(modelo.objects.bulk_create(lote))
+    return criados
+
+
+@dataclass(frozen=True)
+class Escala:
+    """Quantidades dos dados sintéticos, período das compras (em dias) e semente do gerador aleatório."""
+
+    livros: int
+    usuarios: int
+    itens: int
+    favoritos: int
+    dias: int = 365
+    semente: int = 0
+
+
+class GeradorDados:
+    def __init__(self, escala, progresso=None):
+        self.escala = escala
+        self.dias = max(escala.dias, 1)
+        self.aleatorio = random.Random(escala.semente)
+        self.progresso = progresso
+        self.vendidos = defaultdict(int)  # livro_id -> quantidade vendida
+        self.notas = defaultdict(list)  # livro_id -> notas dos favoritos
+
+    def _avisar(self, etapa, quantidade):
+        if self.progresso:
+            self.progresso(etapa, quantidade)
+
+    def popular(self):
+        with transaction.atomic():
+            self._catalogo()
+            self._usuarios()
+            with _datas_explicitas():
+                self._compras()
+            self._carrinhos()
+            self._favoritos()
+            self._estatisticas()
+            self._avulsos()
+        search.reconstruir_indice()
+        return self.escala
+
+    def _catalogo(self):
+        aleatorio = self.aleatorio
+        categorias = _criar(Categoria, (Categoria(descricao=f'Categoria {indice}') for indice in range(1, 31)))
+        editoras = _criar(
+            Editora, (Editora(nome=f'Editora {indice}', cidade=f'Cidade {indice % 50}') for indice in range(1, 301))
+        )
+        autores = _criar(
+            Autor,
+            (
+                Autor(nome=f'{aleatorio.choice(PALAVRAS).title()} Autor {indice}')
+                for indice in range(1, max(self.escala.livros // 10, 1) + 1)
+            ),
+        )
+        self.livros = _criar(
+            Livro,
+            (
+                Livro(
+                    titulo=f'{" ".join(aleatorio.sample(PALAVRAS, 3)).capitalize()} {indice}',
+                    isbn=f'{9780000000000 + indice}',
+                    quantidade=1_000_000,
+                    preco=Decimal(aleatorio.randint(990, 19990)) / 100,
+                    categoria_id=aleatorio.choice(categorias).pk,
+                    editora_id=aleatorio.choice(editoras).pk,
+                )
+                for indice in range(1, self.escala.livros + 1)
+            ),
+        )
+        LivroAutor = Livro.autores.through
+        _criar(
+            LivroAutor,
+            (
+                LivroAutor(livro_id=livro.pk, autor_id=autor.pk)
+                for livro in self.livros
+                for autor in aleatorio.sample(autores, min(aleatorio.randint(1, 2), len(autores)))
+            ),
+        )
+        self._avisar('livros', len(self.livros))
+
+    def _usuarios(self):
+        self.admin = User.objects.create_superuser(EMAIL_ADMIN, SENHA)
+        usuarios = _criar(
+            User,
+            (
+                User(email=f'usuario{indice}@example.com', name=f'Usuário {indice}', password='!')
+                for indice in range(1, self.escala.usuarios + 1)
+            ),
+        )
+        self.usuarios = [usuario.pk for usuario in usuarios]
+        self._avisar('usuarios', len(self.usuarios))
+
+    def _itens(self, compra, quantidade_itens):
+        """Itens de uma compra (livros distintos) e o total calculado."""
+        itens = [
+            ItensCompra(compra=compra, livro_id=livro.pk, quantidade=self.aleatorio.randint(1, 3), preco=livro.preco)
+            for livro in self.aleatorio.sample(self.livros, min(quantidade_itens, len(self.livros)))
+        ]
+        compra.total = sum(item.preco * item.quantidade for item in itens)
+        return itens
+
+    def _compras(self):
+        """Compras vendidas distribuídas pelos últimos ``dias``, gravadas dia a dia com os resumos."""
+        aleatorio = self.aleatorio
+        hoje = timezone.localdate()
+        restantes = self.escala.itens
+        total_itens = 0
+        for dia in range(self.dias - 1, -1, -1):
+            itens_do_dia = restantes // (dia + 1)
+            restantes -= itens_do_dia
+            # Dias no fuso local, como nos resumos (timezone.localdate(compra.data))
+            dia_venda = hoje - timedelta(days=dia)
+            inicio_dia = _meia_noite(dia_venda)
+            segundos = int((_meia_noite(dia_venda + timedelta(days=1)) - inicio_dia).total_seconds())
+            vendas_dia = defaultdict(lambda: [0, Decimal(0)])  # (tipo_pagamento, status) -> [quantidade, total]
+            vendas_livros = defaultdict(lambda: [0, Decimal(0)])  # livro_id -> [quantidade, valor]
+
+            while itens_do_dia > 0:
+                compras, itens = [], []
+                while itens_do_dia > 0 and len(itens) < TAMANHO_LOTE:
+                    compra = Compra(
+                        usuario_id=aleatorio.choice(self.usuarios),
+                        status=aleatorio.choice(STATUS_VENDIDOS),
+                        tipo_pagamento=aleatorio.choice(Compra.TipoPagamento.values),
+                        data=inicio_dia + timedelta(seconds=aleatorio.randrange(segundos)),
+                    )
+                    itens_compra = self._itens(compra, min(aleatorio.randint(1, 9), itens_do_dia))
+                    itens_do_dia -= len(itens_compra)
+                    compras.append(compra)
+                    itens.extend(itens_compra)
+
+                Compra.objects.bulk_create(compras)
+                for item in itens:
+                    item.compra_id = item.compra.pk
+                ItensCompra.objects.bulk_create(itens)
+                total_itens += len(itens)
+
+                for compra in compras:
+                    venda = vendas_dia[compra.tipo_pagamento, compra.status]
+                    venda[0] += 1
+                    venda[1] += compra.total
+                for item in itens:
+                    venda = vendas_livros[item.livro_id]
+                    venda[0] += item.quantidade
+                    venda[1] += item.preco * item.quantidade
+                    self.vendidos[item.livro_id] += item.quantidade
+
+            VendaDiaria.objects.bulk_create([
+                VendaDiaria(dia=dia_venda, tipo_pagamento=tipo, status=situacao, quantidade_vendas=vendas, total=soma)
+                for (tipo, situacao), (vendas, soma) in vendas_dia.items()
+            ])
+            _criar(
+                VendaLivro,
+                (
+                    VendaLivro(livro_id=livro_id, dia=dia_venda, quantidade=quantidade, valor=valor)
+                    for livro_id, (quantidade, valor) in vendas_livros.items()
+                ),
+            )
+            self._avisar('itens', total_itens)
+
+    def _carrinhos(self):
+        """Um carrinho aberto para o administrador e para 10% dos usuários."""
+        donos = [self.admin.pk, *self.usuarios[: len(self.usuarios) // 10]]
+        compras = [Compra(usuario_id=dono, data=timezone.now()) for dono in donos]
+        itens = [item for compra in compras for item in self._itens(compra, self.aleatorio.randint(1, 3))]
+        Compra.objects.bulk_create(compras)
+        for item in itens:
+            item.compra_id = item.compra.pk
+        _criar(ItensCompra, itens)
+
+    def _favoritos(self):
+        aleatorio = self.aleatorio
+        limite = min(self.escala.favoritos, len(self.usuarios) * len(self.livros))
+        pares = set()
+        while len(pares) < limite:
+            pares.add((aleatorio.choice(self.usuarios), aleatorio.choice(self.livros).pk))
+        # Alguns favoritos do administrador, para as rotas de /api/favoritos/
+        pares.update((self.admin.pk, livro.pk) for livro in self.livros[:20])
+
+        favoritos = []
+        for usuario_id, livro_id in pares:
+            nota = aleatorio.randint(1, 5)
+            self.notas[livro_id].append(nota)
+            favoritos.append(
+                Favorito(usuario_id=usuario_id, livro_id=livro_id, nota=nota, comentario=f'Nota {nota} para o livro.')
+            )
+        _criar(Favorito, favoritos)
+        self._avisar('favoritos', len(favoritos))
+
+    def _estatisticas(self):
+        _criar(
+            LivroEstatistica,
+            (
+                LivroEstatistica(
+                    livro_id=livro.pk,
+                    total_vendidos=self.vendidos.get(livro.pk, 0),
+                    media_notas=statistics.fmean(self.notas[livro.pk]) if livro.pk in self.notas else 0,
+                    total_favoritos=len(self.notas.get(livro.pk, ())),
+                )
+                for livro in self.livros
+            ),
+        )
+
+    def _avulsos(self):
+        """Registros sem livros, compras ou vendas, que os cenários de exclusão conseguem remover."""
+        Categoria.objects.create(descricao=AVULSO)
+        Editora.objects.create(nome=AVULSO)
+        Livro.objects.create(titulo=AVULSO, quantidade=1, preco=Decimal(10))
+        User.objects.create(email=EMAIL_AVULSO, name=AVULSO, password='!')
+
+
+def popular(escala, progresso=None):
+    """Gera os dados sintéticos (``Escala``) no banco atual e retorna a escala usada."""
+    return GeradorDados(escala, progresso).popular()
+
+
+# Cenários
+
+
+@dataclass
+class Cenario:
+    rota: str  # nome da URL
+    metodo: str = 'get'
+    kwargs: object = None  # função (alvos) -> kwargs da URL
+    corpo: object = None  # função (alvos) -> corpo (JSON, ou os campos do formulário com formato='multipart')
+    params: object = None  # função (alvos) -> query string
+    variante: str = ''
+    status: tuple = (200, 201)
+    formato: str = 'json'
+
+    @property
+    def nome(self):
+        return f'{self.metodo.upper()} {self.rota}{f" [{self.variante}]" if self.variante else ""}'
+
+    @property
+    def altera_dados(self):
+        return self.metodo not in {'get', 'head', 'options'}
+
+
+def _pk(nome):
+    return lambda alvos: {'pk': alvos[nome]}
+
+
+def _itens_compra(alvos):
+    return {'itens': [{'livro': livro, 'quantidade': 1} for livro in alvos['livros'][:5]]}
+
+
+def _livro(alvos):
+    return {
+        'titulo': 'Livro do benchmark',
+        'preco': '19.90',
+        'quantidade': 10,
+        'categoria': alvos['categoria'],
+        'editora': alvos['editora'],
+        'autores': [alvos['autor']],
+    }
+
+
+def _arquivo_importacao(alvos):
+    linhas = ''.join(f'Importado {indice},1,10,Categoria 1,Editora 1,Autor importado\n' for indice in range(100))
+    conteudo = f'titulo,quantidade,preco,categoria,editora,autores\n{linhas}'.encode()
+    return {'arquivo': SimpleUploadedFile('livros.csv', conteudo, content_type='text/csv')}
+
+
+CENARIOS = [
+    # Catálogo
+    Cenario('livros-list'),
+    Cenario('livros-list', params=lambda alvos: {'search': alvos['palavra']}, variante='busca'),
+    Cenario('livros-list', params=lambda alvos: {'ordering': '-estatistica__media_notas'}, variante='melhores notas'),
+    Cenario('livros-list', params=lambda alvos: {'cursor': ''}, variante='cursor'),
+    Cenario('livros-detail', kwargs=_pk('livro')),
+    Cenario('livros-mais-vendidos'),
+    Cenario('livros-mais-vendidos', params=lambda alvos: {'periodo': '30'}, variante='30 dias'),
+    Cenario('livros-list', 'post', corpo=_livro),
+    Cenario('livros-detail', 'put', kwargs=_pk('livro'), corpo=_livro),
+    Cenario('livros-detail', 'patch', kwargs=_pk('livro'), corpo=lambda alvos: {'preco': '29.90'}),
+    Cenario('livros-detail', 'delete', kwargs=_pk('livro_avulso'), status=(204,)),
+    Cenario('livros-alterar-preco', 'patch', kwargs=_pk('livro'), corpo=lambda alvos: {'preco': '29.90'}),
+    Cenario('livros-ajustar-estoque', 'post', kwargs=_pk('livro'), corpo=lambda alvos: {'quantidade': 5}),
+    Cenario('livros-adicionar-ao-carrinho', 'post', kwargs=_pk('livro'), corpo=lambda alvos: {'quantidade': 1}),
+    Cenario('livros-favoritar', 'post', kwargs=_pk('livro'), corpo=lambda alvos: {'nota': 5}),
+    Cenario('livros-favoritar', 'put', kwargs=_pk('livro_favorito'), corpo=lambda alvos: {'nota': 4}),
+    Cenario('livros-favoritar', 'patch', kwargs=_pk('livro_favorito'), corpo=lambda alvos: {'nota': 4}),
+    Cenario('livros-importar', 'post', corpo=_arquivo_importacao, formato='multipart', variante='100 linhas'),
+    Cenario('autores-list'),
+    Cenario('autores-detail', kwargs=_pk('autor')),
+    Cenario('autores-list', 'post', corpo=lambda alvos: {'nome': 'Autor do benchmark'}),
+    Cenario('autores-detail', 'put', kwargs=_pk('autor'), corpo=lambda alvos: {'nome': 'Autor alterado'}),
+    Cenario('autores-detail', 'patch', kwargs=_pk('autor'), corpo=lambda alvos: {'nome': 'Autor alterado'}),
+    Cenario('autores-detail', 'delete', kwargs=_pk('autor'), status=(204,)),
+    Cenario('editoras-list'),
+    Cenario('editoras-detail', kwargs=_pk('editora')),
+    Cenario('editoras-list', 'post', corpo=lambda alvos: {'nome': 'Editora do benchmark'}),
+    Cenario('editoras-detail', 'put', kwargs=_pk('editora'), corpo=lambda alvos: {'nome': 'Editora alterada'}),
+    Cenario('editoras-detail', 'patch', kwargs=_pk('editora'), corpo=lambda alvos: {'nome': 'Editora alterada'}),
+    Cenario('editoras-detail', 'delete', kwargs=_pk('editora_avulsa'), status=(204,)),
+    Cenario('categorias-list'),
+    Cenario('categorias-detail', kwargs=_pk('categoria')),
+    Cenario('categorias-list', 'post', corpo=lambda alvos: {'descricao': 'Categoria do benchmark'}),
+    Cenario('categorias-detail', 'put', kwargs=_pk('categoria'), corpo=lambda alvos: {'descricao': 'Alterada'}),
+    Cenario('categorias-detail', 'patch', kwargs=_pk('categoria'), corpo=lambda alvos: {'descricao': 'Alterada'}),
+    Cenario('categorias-detail', 'delete', kwargs=_pk('categoria_avulsa'), status=(204,)),
+    # Compras
+    Cenario('compras-list'),
+    Cenario('compras-detail', kwargs=_pk('compra')),
+    Cenario('compras-relatorio-vendas-mes'),
+    Cenario(
+        'compras-relatorio-vendas',
+        params=lambda alvos: {'inicio': alvos['inicio_ano'], 'agrupar_por': 'mes'},
+        variante='12 meses por mês',
+    ),
+    Cenario(
+        'compras-relatorio-vendas',
+        params=lambda alvos: {'inicio': alvos['inicio_ano'], 'agrupar_por': 'categoria'},
+        variante='12 meses por categoria',
+    ),
+    Cenario('compras-exportar', params=lambda alvos: {'inicio': alvos['inicio_semana']}, variante='7 dias'),
+    Cenario('compras-list', 'post', corpo=_itens_compra),
+    Cenario('compras-detail', 'put', kwargs=_pk('carrinho'), corpo=_itens_compra),
+    Cenario('compras-detail', 'patch', kwargs=_pk('carrinho'), corpo=_itens_compra),
+    Cenario('compras-detail', 'delete', kwargs=_pk('compra'), status=(204,)),
+    Cenario('compras-finalizar', 'post', kwargs=_pk('carrinho')),
+    Cenario('compras-adicionar-ao-carrinho', 'post', corpo=lambda alvos: {'livro_id': alvos['livro'], 'quantidade': 1}),
+    Cenario(
+        'compras-adicionar-itens-ao-carrinho',
+        'post',
+        corpo=lambda alvos: {'itens': [{'livro_id': livro, 'quantidade': 1} for livro in alvos['livros'][:5]]},
+    ),
+    # Favoritos
+    Cenario('favorito-list'),
+    Cenario('favorito-detail', kwargs=_pk('favorito')),
+    Cenario('favorito-livros-com-estatisticas'),
+    Cenario(
+        'favorito-detail',
+        'put',
+        kwargs=_pk('favorito'),
+        corpo=lambda alvos: {'livro': alvos['livro_favorito'], 'nota': 3},
+    ),
+    Cenario('favorito-detail', 'patch', kwargs=_pk('favorito'), corpo=lambda alvos: {'nota': 3}),
+    Cenario('favorito-detail', 'delete', kwargs=_pk('favorito'), status=(204,)),
+    # Usuários e autenticação
+    Cenario('usuarios-list'),
+    Cenario('usuarios-detail', kwargs=_pk('usuario')),
+    Cenario('usuarios-me'),
+    Cenario('usuarios-list', 'post', corpo=lambda alvos: {'email': 'criado@example.com', 'name': 'Criado'}),
+    Cenario(
+        'usuarios-detail',
+        'put',
+        kwargs=_pk('usuario'),
+        corpo=lambda alvos: {'email': 'alterado@example.com', 'name': 'Usuário alterado'},
+    ),
+    Cenario('usuarios-detail', 'patch', kwargs=_pk('usuario'), corpo=lambda alvos: {'name': 'Usuário alterado'}),
+    Cenario('usuarios-detail', 'delete', kwargs=_pk('usuario_avulso'), status=(204,)),
+    Cenario(
+        'user_registration',
+        'post',
+        corpo=lambda alvos: {'email': 'novo@example.com', 'name': 'Novo', 'password': 'senha-do-benchmark'},
+    ),
+    Cenario('token_obtain_pair', 'post', corpo=lambda alvos: {'email': EMAIL_ADMIN, 'password': SENHA}),
+    Cenario('token_refresh', 'post', corpo=lambda alvos: {'refresh': alvos['refresh']}),
+    Cenario('token_verify', 'post', corpo=lambda alvos: {'token': alvos['access']}),
+    # Uploads e documentação
+    Cenario('image-list'),
+    Cenario('document-list'),
+    Cenario('schema'),
+    Cenario('swagger-ui'),
+    Cenario('redoc'),
+]
+
+
+def alvos():
+    """Ids usados nas URLs e nos corpos dos cenários (a partir dos dados do banco)."""
+    admin = User.objects.get(email=EMAIL_ADMIN)
+    livros = list(Livro.objects.exclude(titulo=AVULSO).order_by('id').values_list('id', flat=True)[:100])
+    favorito = admin.favoritos.order_by('id').first()
+    token = RefreshToken.for_user(admin)
+    hoje = timezone.localdate()
+    return {
+        'admin': admin,
+        'livros': livros,
+        'livro': livros[len(livros) // 2],
+        'autor': Autor.objects.values_list('id', flat=True).first(),
+        'editora': Editora.objects.values_list('id', flat=True).first(),
+        'categoria': Categoria.objects.values_list('id', flat=True).first(),
+        'livro_avulso': Livro.objects.get(titulo=AVULSO).pk,
+        'editora_avulsa': Editora.objects.get(nome=AVULSO).pk,
+        'categoria_avulsa': Categoria.objects.get(descricao=AVULSO).pk,
+        'usuario_avulso': User.objects.get(email=EMAIL_AVULSO).pk,
+        'compra': Compra.objects.exclude(status=Compra.StatusCompra.CARRINHO).values_list('id', flat=True).last(),
+        'carrinho': admin.compras.get(status=Compra.StatusCompra.CARRINHO).pk,
+        'favorito': favorito.pk,
+        'livro_favorito': favorito.livro_id,
+        'usuario': User.objects.exclude(pk=admin.pk).values_list('id', flat=True).first(),
+        'palavra': PALAVRAS[0],
+        'inicio_ano': (hoje - timedelta(days=364)).isoformat(),
+        'inicio_semana': (hoje - timedelta(days=6)).isoformat(),
+        'refresh': str(token),
+        'access': str(token.access_token),
+    }
+
+
+def rotas_da_api(padroes=None, prefixo=''):
+    """``(nome, métodos)`` de cada rota nomeada em ``/api/`` (ViewSets, APIViews e views simples)."""
+    if padroes is None:
+        padroes = get_resolver().url_patterns
+    for padrao in padroes:
+        caminho = prefixo + str(padrao.pattern)
+        if isinstance(padrao, URLResolver):
+            yield from rotas_da_api(padrao.url_patterns, caminho)
+            continue
+        if not isinstance(padrao, URLPattern) or not padrao.name or padrao.name in ROTAS_IGNORADAS:
+            continue
+        if not caminho.startswith(PREFIXO_ROTAS) or '(?P<format>' in caminho:
+            continue
+        view = padrao.callback
+        if getattr(view, 'actions', None):
+            metodos = set(view.actions)
+        elif hasattr(view, 'cls'):
+            metodos = {metodo for metodo in view.cls.http_method_names if hasattr(view.cls, metodo)}
+        else:
+            metodos = {'get'}
+        yield padrao.name, metodos - {'head', 'options'}
+
+
+def rotas_sem_cenario():
+    """Rotas da API sem cenário e fora de ``ROTAS_EXCLUIDAS``: cenários que faltam."""
+    medidas = {(cenario.rota, cenario.metodo) for cenario in CENARIOS} | set(ROTAS_EXCLUIDAS)
+    return sorted(
+        f'{metodo.upper()} {nome}'
+        for nome, metodos in rotas_da_api()
+        for metodo in metodos
+        if (nome, metodo) not in medidas
+    )
+
+
+# Medição
+
+
+def _percentil(valores, percentil):
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[percentil - 1]
+
+
+def _executar(cliente, cenario, url, corpo, params):
+    with CaptureQueriesContext(connection) as consultas:
+        inicio = time.perf_counter()
+        if cenario.metodo == 'get':
+            resposta = cliente.get(url, params)
+        else:
+            resposta = getattr(cliente, cenario.metodo)(url, corpo, format=cenario.formato)
+        if resposta.streaming:
+            for _ in resposta.streaming_content:
+                pass
+        duracao = (time.perf_counter() - inicio) * 1000
+    return resposta.status_code, duracao, len(consultas)
+
+
+def medir_cenario(cliente, cenario, dados, repeticoes, aquecimento=2):
+    url = reverse(cenario.rota, kwargs=cenario.kwargs(dados) if cenario.kwargs else None)
+    params = cenario.params(dados) if cenario.params else None
+
+    tempos, consultas, codigos = [], [], set()
+    for repeticao in range(aquecimento + repeticoes):
+        # Um corpo por requisição: os arquivos enviados são consumidos
+        corpo = cenario.corpo(dados) if cenario.corpo else None
+        if cenario.altera_dados:
+            with transaction.atomic():
+                codigo, duracao, quantidade = _executar(cliente, cenario, url, corpo, params)
+                transaction.set_rollback(True)
+        else:
+            codigo, duracao, quantidade = _executar(cliente, cenario, url, corpo, params)
+        if repeticao >= aquecimento:
+            tempos.append(duracao)
+            consultas.append(quantidade)
+            codigos.add(codigo)
+
+    return {
+        'nome': cenario.nome,
+        'metodo': cenario.metodo.upper(),
+        'url': url,
+        'status': sorted(codigos),
+        'ok': codigos <= set(cenario.status),
+        'repeticoes': repeticoes,
+        'media_ms': statistics.fmean(tempos),
+        'p50_ms': _percentil(tempos, 50),
+        'p95_ms': _percentil(tempos, 95),
+        'p99_ms': _percentil(tempos, 99),
+        'req_s': 1000 * len(tempos) / sum(tempos),
+        'consultas': {'min': min(consultas), 'max': max(consultas)},
+    }
+
+
+def medir(repeticoes=30, aquecimento=2, filtro=None, progresso=None):
+    """Mede os cenários (os que contêm ``filtro`` no nome, se informado) e retorna os resultados."""
+    dados = alvos()
+    # Fora de INTERNAL_IPS: a barra de depuração não é renderizada nas respostas
+    cliente = APIClient(REMOTE_ADDR='198.51.100.1')
+    cliente.force_authenticate(dados['admin'])
+
+    resultados = []
+    # Os avisos do drf-spectacular se repetiriam a cada geração do schema
+    with GENERATOR_STATS.silence():
+        for cenario in CENARIOS:
+            if filtro and filtro not in cenario.nome:
+                continue
+            try:
+                resultado = medir_cenario(cliente, cenario, dados, repeticoes, aquecimento)
+            except Exception as erro:  # noqa: BLE001 - uma rota com erro não interrompe as demais
+                resultado = {'nome': cenario.nome, 'metodo': cenario.metodo.upper(), 'ok': False, 'erro': repr(erro)}
+            resultados.append(resultado)
+            if progresso:
+                progresso(resultado)
+    return resultados
@@ -0,0 +1,67 @@
+"""
+Cache de respostas das coleções pequenas e muito lidas (autores, editoras e
+categorias).
+
+Cada coleção tem um número de geração guardado no próprio cache, que faz parte
+da chave das respostas. Ao salvar ou excluir um registro, a geração é
+incrementada (após o commit) e as respostas antigas deixam de ser usadas, sem
+precisar apagá-las uma a uma.
+
+O cache só é usado quando é compartilhado entre os processos (``REDIS_URL``).
+Com o ``LocMemCache`` padrão, cada worker do gunicorn só veria as próprias
+invalidações e continuaria servindo as respostas antigas até expirarem; nesse
+caso as respostas vêm sempre das views.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+PREFIXO = 'respostas'
+
+
+def compartilhado():
+    """Se o cache do Django é visto por todos os processos (não é o ``LocMemCache`` nem o ``DummyCache``)."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _chave_geracao(colecao):
+    return f'{PREFIXO}:{colecao}:geracao'
+
+
+def geracao(colecao):
+    chave = _chave_geracao(colecao)
+    valor = cache.get(chave)
+    if valor is None:
+        # Se a geração foi descartada pelo cache, recomeça de um valor que não repete os anteriores
+        cache.add(chave, time.time_ns(), timeout=None)
+        valor = cache.get(chave)
+    return valor
+
+
+def chave_resposta(colecao, request):
+    conteudo = '|'.join([request.get_full_path(), request.META.get('HTTP_ACCEPT', '')])
+    resumo = hashlib.md5(conteudo.encode(), usedforsecurity=False).hexdigest()
+    return f'{PREFIXO}:{colecao}:{geracao(colecao)}:{resumo}'
+
+
+def tempo_expiracao():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def _incrementar(colecoes):
+    for colecao in colecoes:
+        try:
+            cache.incr(_chave_geracao(colecao))
+        except ValueError:
+            cache.add(_chave_geracao(colecao), time.time_ns(), timeout=None)
+
+
+def invalidar(*colecoes):
+    """Descarta as respostas guardadas das coleções, depois do commit da transação atual."""
+    transaction.on_commit(lambda: _incrementar(colecoes))
@@ -0,0 +1,195 @@
+"""
+Carga de dumps do ``dumpdata`` (formato JSON) em fluxo.
+
+Diferente do ``loaddata``, o arquivo não é lido inteiro para a memória: os
+objetos são decodificados um a um (``raw_decode`` sobre um buffer), agrupados
+por modelo e gravados em lotes com ``bulk_create`` (inserindo ou atualizando
+pela chave primária), junto com as linhas das tabelas M2M. Tudo roda em uma
+transação, com as chaves estrangeiras verificadas ao final, como no
+``loaddata``.
+
+Como ``bulk_create`` não dispara signals, ao final as sequências são
+reiniciadas, os totais das compras, os resumos de vendas e as estatísticas dos
+livros são recalculados (``core.vendas``), o índice de busca é reconstruído e
+as versões (ETag) e o cache das coleções são invalidados.
+"""
+
+import json
+import re
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from core import cache as cache_respostas
+from core import search, vendas
+from core.models import (
+    Autor,
+    Compra,
+    Favorito,
+    ItensCompra,
+    Livro,
+    LivroEstatistica,
+    VendaDiaria,
+    VendaLivro,
+    VersaoRecurso,
+)
+from core.signals import COLECOES
+
+TAMANHO_LOTE = 1000
+TAMANHO_BLOCO = 64 * 1024
+SEPARADORES = re.compile(r'[\s,]*')
+# Modelos de que dependem os totais das compras, os resumos de vendas e as estatísticas dos livros
+MODELOS_RESUMIDOS = {Livro, Compra, ItensCompra, Favorito, LivroEstatistica, VendaDiaria, VendaLivro}
+
+
+def iterar_objetos(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Decodifica os objetos de uma lista JSON à medida que o arquivo é lido.
+    Ignora qualquer texto antes do ``[`` inicial (saídas de ``print`` que
+    acabaram no dump).
+    """
+    decodificador = json.JSONDecoder()
+    buffer = ''
+    iniciado = False
+
+    while True:
+        bloco = arquivo.read(tamanho_bloco)
+        buffer += bloco
+        posicao = 0
+
+        if not iniciado:
+            inicio = buffer.find('[')
+            if inicio < 0:
+                if not bloco:
+                    raise ValueError('O arquivo não contém uma lista JSON.')
+                continue
+            iniciado, posicao = True, inicio + 1
+
+        while True:
+            posicao = SEPARADORES.match(buffer, posicao).end()
+            if buffer.startswith(']', posicao):
+                return
+            try:
+                objeto, posicao_final = decodificador.raw_decode(buffer, posicao)
+            except json.JSONDecodeError:
+                break  # objeto incompleto: lê o próximo bloco
+            yield objeto
+            posicao = posicao_final
+
+        buffer = buffer[posicao:]
+        if not bloco:
+            raise ValueError(f'JSON inválido ou incompleto perto de: {buffer[:80]!r}')
+
+
+class CarregadorDump:
+    def __init__(self, tamanho_lote=TAMANHO_LOTE, progresso=None, excluir=()):
+        self.tamanho_lote = tamanho_lote
+        self.progresso = progresso
+        self.excluir = {rotulo.lower() for rotulo in excluir}  # 'app' ou 'app.modelo', como no loaddata
+        self.objetos = {}  # modelo -> instâncias pendentes
+        self.relacoes = {}  # modelo intermediário do M2M -> (campo de origem, ids de origem, linhas)
+        self.contagem = {}
+
+    def carregar(self, arquivo):
+        with transaction.atomic():
+            objetos = (objeto for objeto in iterar_objetos(arquivo) if not self._excluido(objeto))
+            for deserializado in serializers.deserialize('python', objetos, ignorenonexistent=True):
+                self._adicionar(deserializado)
+
+            modelos = serializers.sort_dependencies([(None, list(self.objetos))], allow_cycles=True)
+            for modelo in modelos:
+                self._gravar(modelo)
+            for intermediario in list(self.relacoes):
+                self._gravar_relacoes(intermediario)
+
+            tabelas = [modelo._meta.db_table for modelo in self.contagem]
+            connection.check_constraints(table_names=tabelas)
+            self._reiniciar_sequencias()
+            if MODELOS_RESUMIDOS & set(self.contagem):
+                vendas.recalcular_resumos()
+
+        self._finalizar()
+        return self.contagem
+
+    def _excluido(self, objeto):
+        rotulo = str(objeto.get('model', '')).lower()
+        return rotulo in self.excluir or rotulo.split('.')[0] in self.excluir
+
+    def _adicionar(self, deserializado):
+        objeto = deserializado.object
+        modelo = type(objeto)
+        if objeto.pk is None:
+            # Sem chave primária (ex.: chave natural ainda inexistente): grava como o loaddata
+            deserializado.save()
+            self._contar(modelo, 1)
+            return
+
+        self.objetos.setdefault(modelo, []).append(objeto)
+        for nome, ids in (deserializado.m2m_data or {}).items():
+            self._adicionar_relacoes(objeto, modelo._meta.get_field(nome), ids)
+
+        if len(self.objetos[modelo]) >= self.tamanho_lote:
+            self._gravar(modelo)
+
+    def _adicionar_relacoes(self, objeto, campo, ids):
+        intermediario = campo.remote_field.through
+        if not intermediario._meta.auto_created:
+            return
+        origem, destino = f'{campo.m2m_field_name()}_id', f'{campo.m2m_reverse_field_name()}_id'
+        _, origens, linhas = self.relacoes.setdefault(intermediario, (origem, set(), []))
+        origens.add(objeto.pk)
+        linhas.extend(intermediario(**{origem: objeto.pk, destino: pk}) for pk in ids)
+
+        if len(linhas) >= self.tamanho_lote:
+            self._gravar_relacoes(intermediario)
+
+    def _gravar(self, modelo):
+        objetos = self.objetos.pop(modelo, [])
+        if not objetos:
+            return
+        campos = [campo.name for campo in modelo._meta.concrete_fields if not campo.primary_key]
+        modelo.objects.bulk_create(
+            objetos,
+            batch_size=self.tamanho_lote,
+            update_conflicts=bool(campos),
+            ignore_conflicts=not campos,
+            unique_fields=[modelo._meta.pk.name] if campos else None,
+            update_fields=campos or None,
+        )
+        self._contar(modelo, len(objetos))
+
+    def _gravar_relacoes(self, intermediario):
+        origem, origens, linhas = self.relacoes.pop(intermediario)
+        # Como no loaddata, as relações do dump substituem as existentes
+        intermediario.objects.filter(**{f'{origem}__in': origens}).delete()
+        intermediario.objects.bulk_create(linhas, batch_size=self.tamanho_lote, ignore_conflicts=True)
+        self._contar(intermediario, len(linhas))
+
+    def _contar(self, modelo, quantidade):
+        self.contagem[modelo] = self.contagem.get(modelo, 0) + quantidade
+        if self.progresso:
+            self.progresso(modelo, self.contagem[modelo])
+
+    def _reiniciar_sequencias(self):
+        sql = connection.ops.sequence_reset_sql(no_style(), list(self.contagem))
+        if sql:
+            with connection.cursor() as cursor:
+                for comando in sql:
+                    cursor.execute(comando)
+
+    def _finalizar(self):
+        modelos = set(self.contagem)
+        colecoes = {colecao for modelo, colecao in COLECOES.items() if modelo in modelos}
+        if modelos & MODELOS_RESUMIDOS:
+            colecoes.add(COLECOES[Livro])  # estatísticas exibidas e ordenadas no catálogo
+        if modelos & {Livro, Livro.autores.through, Autor}:
+            search.reconstruir_indice()
+        if colecoes:
+            VersaoRecurso.incrementar(*colecoes)
+            cache_respostas.invalidar(*colecoes)
+
+
+def carregar_dump(arquivo, tamanho_lote=TAMANHO_LOTE, progresso=None, excluir=()):
+    """Carrega o dump do arquivo de texto aberto e retorna a quantidade gravada por modelo."""
+    return CarregadorDump(tamanho_lote, progresso, excluir).carregar(arquivo)
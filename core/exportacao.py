@@ -0,0 +1,135 @@
+"""
+Exportação das compras e dos seus itens em fluxo (NDJSON ou CSV).
+
+As linhas vêm de uma única consulta (compra com ``LEFT JOIN`` nos itens),
+lida com ``iterator()`` em blocos: no PostgreSQL, por um cursor no servidor.
+A memória fica constante, qualquer que seja o período exportado.
+
+- NDJSON: uma compra por linha, com a lista de itens;
+- CSV: um item por linha, repetindo os dados da compra (compras sem itens
+  aparecem uma vez, com as colunas do item vazias).
+"""
+
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.models import Compra
+
+TAMANHO_BLOCO = 2000  # linhas lidas do banco por vez
+LINHAS_POR_ENVIO = 500  # linhas agrupadas em cada parte da resposta
+
+CAMPOS_COMPRA = ('id', 'data', 'usuario__email', 'status', 'tipo_pagamento', 'total')
+CAMPOS_ITEM = ('itens__livro_id', 'itens__livro__titulo', 'itens__quantidade', 'itens__preco')
+COLUNAS_CSV = [
+    'compra_id',
+    'data',
+    'usuario',
+    'status',
+    'tipo_pagamento',
+    'total',
+    'livro_id',
+    'livro',
+    'quantidade',
+    'preco',
+]
+
+FORMATOS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+
+
+def _linhas(queryset):
+    return (
+        queryset
+        .prefetch_related(None)
+        .order_by('id', 'itens__id')
+        .values_list(*CAMPOS_COMPRA, *CAMPOS_ITEM)
+        .iterator(chunk_size=TAMANHO_BLOCO)
+    )
+
+
+def _compras(queryset):
+    """Agrupa as linhas consecutivas de cada compra (a consulta é ordenada pelo id da compra)."""
+    compra = None
+    for linha in _linhas(queryset):
+        id_compra, data, usuario, status, tipo_pagamento, total, livro_id, titulo, quantidade, preco = linha
+        if compra is None or compra['id'] != id_compra:
+            if compra is not None:
+                yield compra
+            compra = {
+                'id': id_compra,
+                'data': data,
+                'usuario': usuario,
+                'status': Compra.StatusCompra(status).label,
+                'tipo_pagamento': Compra.TipoPagamento(tipo_pagamento).label,
+                'total': total,
+                'itens': [],
+            }
+        if livro_id is not None:
+            compra['itens'].append({'livro_id': livro_id, 'livro': titulo, 'quantidade': quantidade, 'preco': preco})
+    if compra is not None:
+        yield compra
+
+
+def _agrupar(linhas):
+    bloco = []
+    for linha in linhas:
+        bloco.append(linha)
+        if len(bloco) >= LINHAS_POR_ENVIO:
+            yield ''.join(bloco)
+            bloco = []
+    if bloco:
+        yield ''.join(bloco)
+
+
+def gerar_ndjson(queryset):
+    return _agrupar(
+        json.dumps(compra, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n' for compra in _compras(queryset)
+    )
+
+
+class _Linha:
+    """Destino do ``csv.writer`` que apenas devolve a linha formatada."""
+
+    def write(self, valor):
+        return valor
+
+
+def gerar_csv(queryset):
+    escritor = csv.writer(_Linha())
+
+    def linhas():
+        yield escritor.writerow(COLUNAS_CSV)
+        for compra in _compras(queryset):
+            dados = [compra[campo] for campo in ('id', 'data', 'usuario', 'status', 'tipo_pagamento', 'total')]
+            dados[1] = dados[1].isoformat()
+            for item in compra['itens'] or [{}]:
+                yield escritor.writerow(
+                    dados + [item.get(campo) for campo in ('livro_id', 'livro', 'quantidade', 'preco')]
+                )
+
+    return _agrupar(linhas())
+
+
+GERADORES = {'ndjson': gerar_ndjson, 'csv': gerar_csv}
+
+
+async def assincrono(partes):
+    """
+    Entrega um gerador síncrono (consultas ao banco) a servidores ASGI sem
+    acumular a resposta: cada parte é obtida em uma thread.
+    """
+    partes = iter(partes)
+    while (parte := await sync_to_async(next)(partes, None)) is not None:
+        yield parte
+
+
+def para_o_servidor(partes, request):
+    """
+    Adapta as partes ao servidor que atende a requisição: sob ASGI (sem o
+    ``wsgi.version`` do ambiente WSGI), o streaming precisa de um iterador assíncrono.
+    """
+    if 'wsgi.version' in request.META:
+        return partes
+    return assincrono(partes)
@@ -0,0 +1,212 @@
+"""
+Importação em lote do catálogo de livros (CSV ou NDJSON).
+
+As linhas são lidas em fluxo e processadas em lotes: autores, editoras e
+categorias são resolvidos pelo nome (mapas em memória, carregados uma vez) e
+criados quando não existem; livros e a tabela ``autores`` do M2M são inseridos
+com ``bulk_create``. Cada lote é uma transação.
+
+Colunas: ``titulo`` (obrigatória), ``isbn``, ``quantidade``, ``preco``,
+``categoria``, ``editora`` e ``autores`` (no CSV, nomes separados por ``;``;
+no NDJSON, uma lista ou o mesmo texto separado por ``;``).
+
+``bulk_create`` não dispara signals: cada lote indexa na busca os livros que
+criou (na mesma transação) e, ao final, as versões (ETag) e o cache das
+coleções são invalidados.
+
+Se o arquivo não puder mais ser lido no meio da importação (texto fora do
+UTF-8, CSV malformado), os lotes já gravados são mantidos e o resumo informa
+em ``interrompida`` onde a importação parou.
+"""
+
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+
+from core import cache as cache_respostas
+from core import search
+from core.models import Autor, Categoria, Editora, Livro, LivroEstatistica, VersaoRecurso
+
+TAMANHO_LOTE = 1000
+LIMITE_ERROS = 100  # erros detalhados no resumo; os demais são apenas contados
+SEPARADOR_AUTORES = ';'
+FORMATOS = ('csv', 'ndjson')
+
+
+class LinhaInvalida(ValueError):
+    pass
+
+
+def ler_csv(arquivo):
+    yield from csv.DictReader(arquivo)
+
+
+def ler_ndjson(arquivo):
+    for linha in arquivo:
+        if linha.strip():
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError as erro:
+                # A linha inválida é reportada em importar_livros, sem interromper a importação
+                yield erro
+
+
+LEITORES = {'csv': ler_csv, 'ndjson': ler_ndjson}
+
+
+def _chave(nome):
+    return ' '.join(str(nome).split()).casefold()
+
+
+def _texto(valor):
+    return ' '.join(str(valor).split()) if valor not in {None, ''} else ''
+
+
+def _autores(valor):
+    if isinstance(valor, list):
+        nomes = valor
+    else:
+        nomes = (valor or '').split(SEPARADOR_AUTORES)
+    return [_texto(nome) for nome in nomes if _texto(nome)]
+
+
+def _converter(linha):
+    if not isinstance(linha, dict):
+        raise LinhaInvalida(f'JSON inválido: {linha}')
+
+    titulo = _texto(linha.get('titulo'))
+    if not titulo:
+        raise LinhaInvalida('O título é obrigatório.')
+    try:
+        quantidade = int(linha.get('quantidade') or 0)
+        preco = Decimal(str(linha.get('preco') or 0).replace(',', '.'))
+    except (TypeError, ValueError, InvalidOperation) as erro:
+        raise LinhaInvalida(f'Quantidade ou preço inválido: {erro}') from erro
+
+    return {
+        'titulo': titulo[: Livro._meta.get_field('titulo').max_length],
+        'isbn': _texto(linha.get('isbn')) or None,
+        'quantidade': quantidade,
+        'preco': preco,
+        'categoria': _texto(linha.get('categoria')),
+        'editora': _texto(linha.get('editora')),
+        'autores': _autores(linha.get('autores')),
+    }
+
+
+class ImportadorLivros:
+    def __init__(self, tamanho_lote=TAMANHO_LOTE, progresso=None):
+        self.tamanho_lote = tamanho_lote
+        self.progresso = progresso
+        self.resumo = {
+            'linhas': 0,
+            'livros': 0,
+            'autores': 0,
+            'editoras': 0,
+            'categorias': 0,
+            'linhas_com_erro': 0,
+            'erros': [],
+            'interrompida': None,
+        }
+        self.mapas = {
+            Categoria: {_chave(nome): pk for pk, nome in Categoria.objects.values_list('id', 'descricao')},
+            Editora: {_chave(nome): pk for pk, nome in Editora.objects.values_list('id', 'nome')},
+            Autor: {_chave(nome): pk for pk, nome in Autor.objects.values_list('id', 'nome')},
+        }
+
+    def importar(self, linhas):
+        try:
+            self._importar(iter(linhas))
+        except (UnicodeDecodeError, csv.Error) as erro:
+            mensagem = 'O arquivo deve estar em UTF-8.' if isinstance(erro, UnicodeDecodeError) else str(erro)
+            # As linhas do lote em leitura não foram gravadas
+            self.resumo['interrompida'] = {'linha': self.resumo['linhas'] + 1, 'erro': mensagem}
+        self._finalizar()
+        return self.resumo
+
+    def _importar(self, linhas):
+        numero = 0
+        while lote := list(islice(linhas, self.tamanho_lote)):
+            convertidas = []
+            for linha in lote:
+                numero += 1
+                try:
+                    convertidas.append(_converter(linha))
+                except LinhaInvalida as erro:
+                    self.resumo['linhas_com_erro'] += 1
+                    if len(self.resumo['erros']) < LIMITE_ERROS:
+                        self.resumo['erros'].append({'linha': numero, 'erro': str(erro)})
+
+            with transaction.atomic():
+                self._inserir(convertidas)
+
+            self.resumo['linhas'] = numero
+            if self.progresso:
+                self.progresso(self.resumo)
+
+    def _resolver(self, modelo, campo, nomes, chave_resumo):
+        """Cria os nomes ainda desconhecidos (um bulk_create) e atualiza o mapa do modelo."""
+        mapa = self.mapas[modelo]
+        novos = {}
+        for nome in nomes:
+            if nome and _chave(nome) not in mapa:
+                novos.setdefault(_chave(nome), nome[: modelo._meta.get_field(campo).max_length])
+        if not novos:
+            return
+
+        criados = modelo.objects.bulk_create([modelo(**{campo: nome}) for nome in novos.values()])
+        if any(objeto.pk is None for objeto in criados):
+            # Bancos sem RETURNING no INSERT em lote: busca os ids pelos nomes
+            criados = modelo.objects.filter(**{f'{campo}__in': list(novos.values())})
+        for objeto in criados:
+            mapa[_chave(getattr(objeto, campo))] = objeto.pk
+        self.resumo[chave_resumo] += len(novos)
+
+    def _inserir(self, linhas):
+        if not linhas:
+            return
+
+        self._resolver(Categoria, 'descricao', {linha['categoria'] for linha in linhas}, 'categorias')
+        self._resolver(Editora, 'nome', {linha['editora'] for linha in linhas}, 'editoras')
+        self._resolver(Autor, 'nome', {nome for linha in linhas for nome in linha['autores']}, 'autores')
+
+        categorias, editoras, autores = self.mapas[Categoria], self.mapas[Editora], self.mapas[Autor]
+        livros = Livro.objects.bulk_create([
+            Livro(
+                titulo=linha['titulo'],
+                isbn=linha['isbn'],
+                quantidade=linha['quantidade'],
+                preco=linha['preco'],
+                categoria_id=categorias.get(_chave(linha['categoria'])),
+                editora_id=editoras.get(_chave(linha['editora'])),
+            )
+            for linha in linhas
+        ])
+
+        LivroAutor = Livro.autores.through
+        LivroAutor.objects.bulk_create(
+            [
+                LivroAutor(livro_id=livro.pk, autor_id=autor_id)
+                for livro, linha in zip(livros, linhas)
+                for autor_id in {autores[_chave(nome)] for nome in linha['autores']}
+            ],
+            batch_size=self.tamanho_lote,
+        )
+        LivroEstatistica.objects.bulk_create([LivroEstatistica(livro_id=livro.pk) for livro in livros])
+        search.indexar_livros([livro.pk for livro in livros])
+
+        self.resumo['livros'] += len(livros)
+
+    def _finalizar(self):
+        if not self.resumo['livros']:
+            return
+        VersaoRecurso.incrementar('livros', 'autores', 'editoras', 'categorias')
+        cache_respostas.invalidar('autores', 'editoras', 'categorias')
+
+
+def importar_livros(arquivo, formato='csv', tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Importa os livros do arquivo de texto aberto e retorna o resumo (contagens e erros por linha)."""
+    return ImportadorLivros(tamanho_lote, progresso).importar(LEITORES[formato](arquivo))
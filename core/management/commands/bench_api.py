@@ -0,0 +1,145 @@
+import json
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core import benchmark
+from core.models import Livro
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark dos endpoints da API: gera dados sintéticos em um banco de testes (separado do banco '
+        'configurado) e mede latência (p50/p95/p99), vazão e consultas SQL de cada rota, pelo cliente de '
+        'testes. Os resultados podem ser gravados em JSON e comparados com os de outro commit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--livros', type=int, default=10_000, help='Livros gerados (ex.: 1000000).')
+        parser.add_argument('--usuarios', type=int, default=1_000, help='Usuários gerados (ex.: 100000).')
+        parser.add_argument('--itens', type=int, default=50_000, help='Itens de compra gerados (ex.: 5000000).')
+        parser.add_argument('--favoritos', type=int, default=20_000, help='Favoritos gerados.')
+        parser.add_argument('--dias', type=int, default=365, help='Período, em dias, das compras geradas.')
+        parser.add_argument('--semente', type=int, default=0, help='Semente dos dados aleatórios.')
+        parser.add_argument('--repeticoes', type=int, default=30, help='Requisições medidas por cenário.')
+        parser.add_argument('--aquecimento', type=int, default=2, help='Requisições descartadas por cenário.')
+        parser.add_argument('--rota', help='Mede apenas os cenários que contêm este texto (ex.: compras-).')
+        parser.add_argument(
+            '--banco',
+            help='Arquivo do banco de testes (SQLite). Padrão: em memória, ou test_<nome> nos demais bancos.',
+        )
+        parser.add_argument(
+            '--manter', action='store_true', help='Mantém o banco de testes e reaproveita os dados já gerados.'
+        )
+        parser.add_argument('--json', dest='saida_json', help='Grava os resultados neste arquivo JSON.')
+        parser.add_argument('--comparar', help='JSON de uma execução anterior, para mostrar as diferenças.')
+
+    def handle(self, *args, **options):
+        anterior = self._ler_anterior(options['comparar'])
+        if options['banco']:
+            if options['banco'] == str(connection.settings_dict['NAME']):
+                raise CommandError('O banco de testes não pode ser o banco configurado.')
+            connection.settings_dict['TEST']['NAME'] = options['banco']
+
+        nome_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=options['manter'])
+        try:
+            escala = self._popular(options)
+            resultados = benchmark.medir(
+                options['repeticoes'], options['aquecimento'], options['rota'], self._mostrar(anterior)
+            )
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0, keepdb=options['manter'])
+
+        nao_medidas = benchmark.rotas_sem_cenario()
+        if nao_medidas:
+            self.stdout.write(f'Rotas sem cenário: {", ".join(nao_medidas)}')
+        for (rota, metodo), motivo in benchmark.ROTAS_EXCLUIDAS.items():
+            self.stdout.write(f'Rota excluída: {metodo.upper()} {rota} ({motivo})')
+        falhas = [resultado['nome'] for resultado in resultados if not resultado['ok']]
+
+        if options['saida_json']:
+            relatorio = {
+                'gerado_em': timezone.now().isoformat(),
+                'commit': self._commit(),
+                'banco': connection.vendor,
+                'escala': escala,
+                'repeticoes': options['repeticoes'],
+                'resultados': resultados,
+                'rotas_sem_cenario': nao_medidas,
+                'rotas_excluidas': {
+                    f'{metodo.upper()} {rota}': motivo for (rota, metodo), motivo in benchmark.ROTAS_EXCLUIDAS.items()
+                },
+            }
+            with open(options['saida_json'], 'w', encoding='utf-8') as arquivo:
+                json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Resultados gravados em {options["saida_json"]}.')
+
+        if falhas:
+            raise CommandError(f'Cenários com erro ou status inesperado: {", ".join(falhas)}')
+
+    def _popular(self, options):
+        escala = {chave: options[chave] for chave in ('livros', 'usuarios', 'itens', 'favoritos')}
+        if options['manter'] and Livro.objects.exists():
+            self.stdout.write('Reaproveitando os dados do banco de testes.')
+            return escala
+
+        inicio = time.perf_counter()
+
+        def progresso(etapa, quantidade):
+            self.stdout.write(f'  {etapa}: {quantidade} ({time.perf_counter() - inicio:.0f}s)', ending='\r')
+            self.stdout.flush()
+
+        benchmark.popular(benchmark.Escala(**escala, dias=options['dias'], semente=options['semente']), progresso)
+        self.stdout.write(f'Dados gerados em {time.perf_counter() - inicio:.1f}s: {escala}' + ' ' * 20)
+        return escala
+
+    def _mostrar(self, anterior):
+        self.stdout.write(f'{"cenário":<58} {"p50":>8} {"p95":>8} {"p99":>8} {"req/s":>8} {"SQL":>5} status')
+
+        def mostrar(resultado):
+            if 'erro' in resultado:
+                self.stdout.write(self.style.ERROR(f'{resultado["nome"]:<58} erro: {resultado["erro"]}'))
+                return
+            consultas = resultado['consultas']
+            sql = str(consultas['min']) if consultas['min'] == consultas['max'] else f'{consultas["min"]}+'
+            linha = (
+                f'{resultado["nome"]:<58} {resultado["p50_ms"]:>8.1f} {resultado["p95_ms"]:>8.1f} '
+                f'{resultado["p99_ms"]:>8.1f} {resultado["req_s"]:>8.1f} {sql:>5} '
+                f'{",".join(map(str, resultado["status"]))}'
+            )
+            antes = anterior.get(resultado['nome'])
+            if antes and 'erro' not in antes:
+                variacao = (resultado['p95_ms'] / antes['p95_ms'] - 1) * 100 if antes['p95_ms'] else 0
+                linha += f'  p95 {variacao:+.0f}%  SQL {consultas["max"] - antes["consultas"]["max"]:+d}'
+            self.stdout.write(linha if resultado['ok'] else self.style.ERROR(linha))
+
+        return mostrar
+
+    @staticmethod
+    def _ler_anterior(caminho):
+        if not caminho:
+            return {}
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                return {resultado['nome']: resultado for resultado in json.load(arquivo)['resultados']}
+        except (OSError, ValueError, KeyError) as erro:
+            raise CommandError(f'Não foi possível ler {caminho}: {erro}') from erro
+
+    @staticmethod
+    def _commit():
+        try:
+            processo = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=False,  # fora de um repositório git, o relatório fica sem o commit
+            )
+        except OSError:
+            return None
+        return processo.stdout.strip() or None
@@ -0,0 +1,79 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Livro, User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede as consultas SQL e o tempo de criação (POST) e atualização (PUT) de compras com '
+        'quantidades crescentes de itens. Tudo roda em uma transação desfeita ao final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--itens', type=int, nargs='+', default=[1, 10, 50, 100], help='Quantidades de itens a medir.'
+        )
+
+    def handle(self, *args, **options):
+        tamanhos = sorted(set(options['itens']))
+        resultados = []
+        try:
+            with transaction.atomic():
+                resultados = self._medir(tamanhos)
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f'{"itens":>6} {"POST":>6} {"ms":>8} {"PUT":>6} {"ms":>8}')
+        for itens, criar, tempo_criar, atualizar, tempo_atualizar in resultados:
+            self.stdout.write(f'{itens:>6} {criar:>6} {tempo_criar:>8.1f} {atualizar:>6} {tempo_atualizar:>8.1f}')
+
+        if len({resultado[1] for resultado in resultados}) > 1 or len({resultado[3] for resultado in resultados}) > 1:
+            raise CommandError('A quantidade de consultas varia com a quantidade de itens.')
+
+    def _medir(self, tamanhos):
+        prefixo = f'bench-{uuid.uuid4().hex[:8]}'
+        livros = Livro.objects.bulk_create([
+            Livro(titulo=f'{prefixo}-{indice}', quantidade=1000, preco=10) for indice in range(max(tamanhos))
+        ])
+        cliente = APIClient()
+
+        resultados = []
+        for tamanho in tamanhos:
+            usuario = User.objects.create(email=f'{prefixo}-{tamanho}@bench.local')
+            cliente.force_authenticate(usuario)
+            itens = [{'livro': livro.id, 'quantidade': 1} for livro in livros[:tamanho]]
+
+            criar, tempo_criar, resposta = self._requisicao(cliente.post, '/api/compras/', {'itens': itens})
+            if resposta.status_code != status.HTTP_201_CREATED:
+                raise CommandError(f'POST /api/compras/ retornou {resposta.status_code}: {resposta.data}')
+            compra_id = usuario.compras.get().id
+
+            itens = [{'livro': livro.id, 'quantidade': 2} for livro in livros[:tamanho]]
+            atualizar, tempo_atualizar, resposta = self._requisicao(
+                cliente.put, f'/api/compras/{compra_id}/', {'itens': itens}
+            )
+            if resposta.status_code != status.HTTP_200_OK:
+                raise CommandError(f'PUT /api/compras/{compra_id}/ retornou {resposta.status_code}: {resposta.data}')
+
+            resultados.append((tamanho, criar, tempo_criar, atualizar, tempo_atualizar))
+        return resultados
+
+    @staticmethod
+    def _requisicao(metodo, url, dados):
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            resposta = metodo(url, dados, format='json')
+            duracao = (time.perf_counter() - inicio) * 1000
+        return len(consultas), duracao, resposta
@@ -0,0 +1,104 @@
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from core import vendas
+from core.models import Compra, ItensCompra, Livro, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Finaliza carrinhos em paralelo, todos disputando o mesmo livro, e verifica que o estoque '
+        'nunca é vendido além do disponível. Use com PostgreSQL para medir a concorrência real.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estoque', type=int, default=20, help='Estoque inicial do livro disputado.')
+        parser.add_argument('--compras', type=int, default=50, help='Quantidade de carrinhos a finalizar.')
+        parser.add_argument('--threads', type=int, default=8, help='Finalizações simultâneas.')
+        parser.add_argument('--quantidade', type=int, default=1, help='Unidades do livro em cada carrinho.')
+
+    def handle(self, *args, **options):
+        prefixo = f'bench-{uuid.uuid4().hex[:8]}'
+        livro = Livro.objects.create(titulo=prefixo, quantidade=options['estoque'], preco=10)
+        compras = self._criar_carrinhos(prefixo, livro, options['compras'], options['quantidade'])
+
+        resultados = {'finalizadas': 0, 'recusadas': 0, 'erros': 0}
+        tempos = []
+        trava = threading.Lock()
+        fila = list(compras)
+
+        def trabalhador():
+            cliente = APIClient()
+            try:
+                while True:
+                    with trava:
+                        if not fila:
+                            return
+                        compra = fila.pop()
+                    cliente.force_authenticate(compra.usuario)
+                    inicio = time.perf_counter()
+                    try:
+                        resposta = cliente.post(f'/api/compras/{compra.id}/finalizar/')
+                        chave = {200: 'finalizadas', 400: 'recusadas'}.get(resposta.status_code, 'erros')
+                    except Exception:  # noqa: BLE001
+                        chave = 'erros'
+                    with trava:
+                        resultados[chave] += 1
+                        tempos.append(time.perf_counter() - inicio)
+            finally:
+                connection.close()
+
+        inicio = time.perf_counter()
+        threads = [threading.Thread(target=trabalhador) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        livro.refresh_from_db()
+        vendidos = Compra.objects.filter(itens__livro=livro, status=Compra.StatusCompra.FINALIZADO).count()
+        esperados = min(options['compras'], options['estoque'] // options['quantidade'])
+
+        tempos.sort()
+        self.stdout.write(
+            f'{resultados["finalizadas"]} finalizadas, {resultados["recusadas"]} recusadas, '
+            f'{resultados["erros"]} erros em {duracao:.2f}s ({len(tempos) / duracao:.1f} req/s, '
+            f'p50 {tempos[len(tempos) // 2] * 1000:.1f}ms, p95 {tempos[int(len(tempos) * 0.95)] * 1000:.1f}ms)'
+        )
+        self.stdout.write(f'Estoque final: {livro.quantidade} (inicial {options["estoque"]})')
+
+        self._limpar(prefixo, livro)
+
+        vendido_alem = livro.quantidade < 0 or vendidos * options['quantidade'] != options['estoque'] - livro.quantidade
+        if vendido_alem:
+            raise CommandError('Estoque inconsistente: houve venda além do disponível.')
+        if resultados['erros'] == 0 and vendidos != esperados:
+            raise CommandError(f'Esperadas {esperados} compras finalizadas, mas {vendidos} foram finalizadas.')
+        self.stdout.write(self.style.SUCCESS('Nenhuma venda além do estoque.'))
+
+    @staticmethod
+    def _criar_carrinhos(prefixo, livro, quantidade_compras, quantidade):
+        User.objects.bulk_create([
+            User(email=f'{prefixo}-{indice}@example.com', name=prefixo) for indice in range(quantidade_compras)
+        ])
+        usuarios = list(User.objects.filter(email__startswith=f'{prefixo}-'))
+        Compra.objects.bulk_create([Compra(usuario=usuario) for usuario in usuarios])
+        compras = list(Compra.objects.filter(usuario__in=usuarios).select_related('usuario'))
+        ItensCompra.objects.bulk_create([
+            ItensCompra(compra=compra, livro=livro, quantidade=quantidade, preco=livro.preco) for compra in compras
+        ])
+        return compras
+
+    @staticmethod
+    def _limpar(prefixo, livro):
+        # Uma compra por vez, para desfazer também os resumos de vendas (VendaDiaria e VendaLivro)
+        for compra in Compra.objects.filter(usuario__email__startswith=f'{prefixo}-'):
+            vendas.excluir_compra(compra)
+        User.objects.filter(email__startswith=f'{prefixo}-').delete()
+        livro.delete()
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.carga import TAMANHO_LOTE, carregar_dump
+
+
+class Command(BaseCommand):
+    help = (
+        'Carrega um dump JSON do dumpdata (ex.: core.json) em fluxo, com inserções em lote. '
+        'Alternativa ao loaddata para dumps grandes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do dump JSON.')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Objetos por INSERT em lote.')
+        parser.add_argument(
+            '-e',
+            '--excluir',
+            action='append',
+            default=[],
+            help='App ou modelo a ignorar (ex.: contenttypes, sessions.Session). Pode ser repetido.',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+
+        def progresso(modelo, quantidade):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{modelo._meta.label}: {quantidade}')
+
+        try:
+            with open(options['arquivo'], encoding='utf-8') as arquivo:
+                contagem = carregar_dump(arquivo, options['lote'], progresso, options['excluir'])
+        except (OSError, ValueError) as erro:
+            raise CommandError(erro) from erro
+
+        duracao = time.perf_counter() - inicio
+        for modelo, quantidade in contagem.items():
+            self.stdout.write(f'{modelo._meta.label}: {quantidade}')
+        self.stdout.write(self.style.SUCCESS(f'{sum(contagem.values())} objetos carregados em {duracao:.2f}s.'))
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importacao import FORMATOS, TAMANHO_LOTE, importar_livros
+
+
+class Command(BaseCommand):
+    help = 'Importa livros de um arquivo CSV ou NDJSON, criando autores, editoras e categorias pelo nome.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo (.csv, .ndjson ou .jsonl).')
+        parser.add_argument('--formato', choices=FORMATOS, help='Padrão: deduzido pela extensão do arquivo.')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Linhas por lote (e por transação).')
+        parser.add_argument(
+            '--meta', type=float, default=0, help='Linhas por segundo esperadas; avisa se a importação ficar abaixo.'
+        )
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or ('csv' if options['arquivo'].lower().endswith('.csv') else 'ndjson')
+        inicio = time.perf_counter()
+
+        def progresso(resumo):
+            decorrido = time.perf_counter() - inicio
+            self.stdout.write(
+                f'{resumo["linhas"]} linhas, {resumo["livros"]} livros ({resumo["linhas"] / decorrido:.0f} linhas/s)'
+            )
+
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                resumo = importar_livros(arquivo, formato, options['lote'], progresso)
+        except OSError as erro:
+            raise CommandError(erro) from erro
+
+        duracao = time.perf_counter() - inicio
+        taxa = resumo['linhas'] / duracao if duracao else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{resumo["livros"]} livros, {resumo["autores"]} autores, {resumo["editoras"]} editoras e '
+                f'{resumo["categorias"]} categorias criados em {duracao:.1f}s ({taxa:.0f} linhas/s).'
+            )
+        )
+        if resumo['interrompida']:
+            self.stderr.write(
+                self.style.ERROR(
+                    f'Importação interrompida a partir da linha {resumo["interrompida"]["linha"]}: '
+                    f'{resumo["interrompida"]["erro"]} Os lotes anteriores foram gravados.'
+                )
+            )
+        for erro in resumo['erros']:
+            self.stderr.write(f'Linha {erro["linha"]}: {erro["erro"]}')
+        if resumo['linhas_com_erro'] > len(resumo['erros']):
+            self.stderr.write(f'... {resumo["linhas_com_erro"]} linhas com erro no total.')
+        if options['meta'] and taxa < options['meta']:
+            self.stderr.write(self.style.WARNING(f'Abaixo da meta de {options["meta"]:.0f} linhas/s.'))
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+# SQL fixado nesta migração (não importa core.search, que pode mudar depois)
+CRIAR = {
+    'sqlite': [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS core_livro_busca USING fts5('
+        "titulo, autores, editora, categoria, tokenize='unicode61 remove_diacritics 2')",
+        'INSERT INTO core_livro_busca (rowid, titulo, autores, editora, categoria) '
+        'SELECT l.id, l.titulo, '
+        "COALESCE((SELECT group_concat(a.nome, ' ') FROM core_livro_autores la "
+        "JOIN core_autor a ON a.id = la.autor_id WHERE la.livro_id = l.id), ''), "
+        "COALESCE(e.nome, ''), COALESCE(c.descricao, '') "
+        'FROM core_livro l '
+        'LEFT JOIN core_editora e ON e.id = l.editora_id '
+        'LEFT JOIN core_categoria c ON c.id = l.categoria_id',
+    ],
+    'postgresql': [
+        'CREATE TABLE IF NOT EXISTS core_livro_busca ('
+        'livro_id bigint PRIMARY KEY REFERENCES core_livro (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+        'documento tsvector NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS core_livro_busca_documento ON core_livro_busca USING GIN (documento)',
+        'INSERT INTO core_livro_busca (livro_id, documento) '
+        'SELECT d.id, '
+        "setweight(to_tsvector('portuguese', d.titulo), 'A') || "
+        "setweight(to_tsvector('portuguese', d.autores), 'B') || "
+        "setweight(to_tsvector('portuguese', d.editora), 'C') || "
+        "setweight(to_tsvector('portuguese', d.categoria), 'D') "
+        'FROM (SELECT l.id, l.titulo, '
+        "COALESCE((SELECT string_agg(a.nome, ' ') FROM core_livro_autores la "
+        "JOIN core_autor a ON a.id = la.autor_id WHERE la.livro_id = l.id), ''), "
+        "COALESCE(e.nome, ''), COALESCE(c.descricao, '') "
+        'FROM core_livro l '
+        'LEFT JOIN core_editora e ON e.id = l.editora_id '
+        'LEFT JOIN core_categoria c ON c.id = l.categoria_id) AS d (id, titulo, autores, editora, categoria) '
+        'ON CONFLICT (livro_id) DO UPDATE SET documento = EXCLUDED.documento',
+    ],
+}
+
+
+def criar_indice(apps, schema_editor):
+    for sql in CRIAR.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor in CRIAR:
+        schema_editor.execute('DROP TABLE IF EXISTS core_livro_busca')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0035_remove_user_passage_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_livro_busca'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='compra',
+            name='data',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
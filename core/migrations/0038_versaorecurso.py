@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:04
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0037_compra_data_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoRecurso',
+            fields=[
+                ('chave', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('versao', models.PositiveBigIntegerField(default=1)),
+                ('atualizado_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Versão de recurso',
+                'verbose_name_plural': 'Versões de recursos',
+            },
+        ),
+    ]
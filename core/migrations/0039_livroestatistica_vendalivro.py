@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+
+
+def registrar_vendas_existentes(apps, schema_editor):
+    ItensCompra = apps.get_model('core', 'ItensCompra')
+    LivroEstatistica = apps.get_model('core', 'LivroEstatistica')
+    VendaLivro = apps.get_model('core', 'VendaLivro')
+
+    # Status acima de CARRINHO (1): finalizado, pago ou entregue
+    vendidos = ItensCompra.objects.filter(compra__status__gt=1)
+
+    por_dia = (
+        vendidos.annotate(dia=TruncDate('compra__data'))
+        .values('livro_id', 'dia')
+        .annotate(total_quantidade=Sum('quantidade'), total_valor=Sum(F('preco') * F('quantidade')))
+    )
+    VendaLivro.objects.bulk_create(
+        [
+            VendaLivro(
+                livro_id=venda['livro_id'],
+                dia=venda['dia'],
+                quantidade=venda['total_quantidade'],
+                valor=venda['total_valor'] or 0,
+            )
+            for venda in por_dia.iterator()
+        ],
+        batch_size=1000,
+    )
+
+    por_livro = vendidos.values('livro_id').annotate(total_quantidade=Sum('quantidade'))
+    LivroEstatistica.objects.bulk_create(
+        [
+            LivroEstatistica(livro_id=venda['livro_id'], total_vendidos=venda['total_quantidade'])
+            for venda in por_livro.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0038_versaorecurso'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LivroEstatistica',
+            fields=[
+                ('livro', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estatistica', serialize=False, to='core.livro')),
+                ('total_vendidos', models.PositiveIntegerField(db_index=True, default=0)),
+            ],
+            options={
+                'verbose_name': 'Estatística do livro',
+                'verbose_name_plural': 'Estatísticas dos livros',
+            },
+        ),
+        migrations.CreateModel(
+            name='VendaLivro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('quantidade', models.PositiveIntegerField(default=0)),
+                ('valor', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('livro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vendas', to='core.livro')),
+            ],
+            options={
+                'verbose_name': 'Venda do livro',
+                'verbose_name_plural': 'Vendas dos livros',
+                'indexes': [models.Index(fields=['dia', 'livro'], name='core_vendal_dia_9ff6e3_idx')],
+                'unique_together': {('livro', 'dia')},
+            },
+        ),
+        migrations.RunPython(registrar_vendas_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:07
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def registrar_vendas_diarias(apps, schema_editor):
+    Compra = apps.get_model('core', 'Compra')
+    VendaDiaria = apps.get_model('core', 'VendaDiaria')
+
+    # Status acima de CARRINHO (1): finalizado, pago ou entregue
+    resumos = (
+        Compra.objects.filter(status__gt=1)
+        .annotate(dia=TruncDate('data'))
+        .values('dia', 'tipo_pagamento', 'status')
+        .annotate(quantidade=Count('id'), soma=Sum('total'))
+        .order_by()
+    )
+    VendaDiaria.objects.bulk_create(
+        [
+            VendaDiaria(
+                dia=resumo['dia'],
+                tipo_pagamento=resumo['tipo_pagamento'],
+                status=resumo['status'],
+                quantidade_vendas=resumo['quantidade'],
+                total=resumo['soma'] or 0,
+            )
+            for resumo in resumos.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0039_livroestatistica_vendalivro'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('tipo_pagamento', models.IntegerField()),
+                ('status', models.IntegerField()),
+                ('quantidade_vendas', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Venda diária',
+                'verbose_name_plural': 'Vendas diárias',
+                'unique_together': {('dia', 'tipo_pagamento', 'status')},
+            },
+        ),
+        migrations.RunPython(registrar_vendas_diarias, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def recalcular_totais(apps, schema_editor):
+    Compra = apps.get_model('core', 'Compra')
+    ItensCompra = apps.get_model('core', 'ItensCompra')
+    VendaDiaria = apps.get_model('core', 'VendaDiaria')
+
+    soma_itens = (
+        ItensCompra.objects.filter(compra=OuterRef('pk'))
+        .values('compra')
+        .annotate(soma=Sum(F('preco') * F('quantidade')))
+        .values('soma')
+    )
+    decimal = models.DecimalField(max_digits=10, decimal_places=2)
+    Compra.objects.update(total=Coalesce(Subquery(soma_itens, output_field=decimal), Value(0), output_field=decimal))
+
+    # Os resumos diários usam o total das compras: refaz a partir dos totais corrigidos
+    VendaDiaria.objects.all().delete()
+    resumos = (
+        Compra.objects.filter(status__gt=1)
+        .annotate(dia=TruncDate('data'))
+        .values('dia', 'tipo_pagamento', 'status')
+        .annotate(quantidade=Count('id'), soma=Sum('total'))
+        .order_by()
+    )
+    VendaDiaria.objects.bulk_create(
+        [
+            VendaDiaria(
+                dia=resumo['dia'],
+                tipo_pagamento=resumo['tipo_pagamento'],
+                status=resumo['status'],
+                quantidade_vendas=resumo['quantidade'],
+                total=resumo['soma'] or 0,
+            )
+            for resumo in resumos.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0040_vendadiaria'),
+    ]
+
+    operations = [
+        migrations.RunPython(recalcular_totais, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:13
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def calcular_favoritos(apps, schema_editor):
+    Favorito = apps.get_model('core', 'Favorito')
+    Livro = apps.get_model('core', 'Livro')
+    LivroEstatistica = apps.get_model('core', 'LivroEstatistica')
+
+    # Todo livro passa a ter sua linha de estatísticas (ordenação e filtro por nota no catálogo)
+    LivroEstatistica.objects.bulk_create(
+        [LivroEstatistica(livro_id=livro_id) for livro_id in Livro.objects.values_list('id', flat=True).iterator()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    favoritos = Favorito.objects.filter(livro_id=OuterRef('livro_id')).order_by().values('livro_id')
+    LivroEstatistica.objects.update(
+        media_notas=Coalesce(Subquery(favoritos.annotate(media=Avg('nota')).values('media')), Value(0.0)),
+        total_favoritos=Coalesce(Subquery(favoritos.annotate(total=Count('id')).values('total')), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0041_recalcular_total_compras'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='livroestatistica',
+            name='media_notas',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='livroestatistica',
+            name='total_favoritos',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(calcular_favoritos, migrations.RunPython.noop),
+    ]
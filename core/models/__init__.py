@@ -5,3 +5,5 @@ from .editora import Editora
 from .favorito import Favorito
 from .livro import Livro
 from .user import User
+from .venda import LivroEstatistica, VendaDiaria, VendaLivro
+from .versao import VersaoRecurso
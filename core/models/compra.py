@@ -1,10 +1,22 @@
 from django.db import models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 
 from .livro import Livro
 from .user import User
 
 
 class Compra(models.Model):
+    """
+    Compra (ou carrinho) do usuário.
+
+    O total é mantido pelos itens (``atualizar_total``). Os resumos de vendas
+    (``VendaDiaria`` por compra e ``VendaLivro`` por item) não são mantidos
+    pelos modelos: quem altera o status, o pagamento, a data ou os itens de uma
+    compra faz isso dentro de ``core.vendas.alterando_compra`` e a exclui com
+    ``core.vendas.excluir_compra``.
+    """
+
     class StatusCompra(models.IntegerChoices):
         CARRINHO = 1, 'Carrinho'
         FINALIZADO = 2, 'Finalizado'
@@ -23,14 +35,73 @@ class Compra(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.PROTECT, related_name='compras')
     status = models.IntegerField(choices=StatusCompra.choices, default=StatusCompra.CARRINHO)
     tipo_pagamento = models.IntegerField(choices=TipoPagamento.choices, default=TipoPagamento.CARTAO_CREDITO)
-    data = models.DateTimeField(auto_now_add=True)
+    data = models.DateTimeField(auto_now_add=True, db_index=True)
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     def save(self, *args, **kwargs):
-        if self.pk:
-            self.total = sum(item.preco * item.quantidade for item in self.itens.all())
+        # O total é mantido pelos itens (atualizar_total), não recalculado nem gravado a cada save: o desta
+        # instância pode estar desatualizado (itens salvos por outra instância da mesma compra)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.attname for campo in self._meta.concrete_fields if not campo.primary_key and campo.name != 'total'
+            ]
         super().save(*args, **kwargs)
 
+    def atualizar_total(self):
+        """
+        Recalcula o total com uma soma feita no banco e grava só se mudou.
+        Chamado ao salvar/excluir um item e após operações em lote nos itens.
+        """
+        # O total gravado e a soma dos itens vêm na mesma consulta: a comparação não usa self.total,
+        # que pode estar desatualizado
+        decimal = models.DecimalField(max_digits=10, decimal_places=2)
+        soma = (
+            ItensCompra.objects
+            .filter(compra=OuterRef('pk'))
+            .values('compra')
+            .annotate(soma=Sum(F('preco') * F('quantidade'), output_field=decimal))
+            .values('soma')
+        )
+        anterior, total = (
+            Compra.objects
+            .filter(pk=self.pk)
+            .annotate(novo_total=Coalesce(Subquery(soma), Value(0), output_field=decimal))
+            .values_list('total', 'novo_total')
+            .get()
+        )
+        self.total = total
+        if total != anterior:
+            Compra.objects.filter(pk=self.pk).update(total=total)
+
+    def adicionar_itens(self, itens):
+        """
+        Soma ao carrinho as quantidades de ``itens`` (``{livro: quantidade}``), atualizando o preço
+        dos itens existentes. Usa uma quantidade fixa de consultas, qualquer que seja o número de livros.
+        """
+        existentes = {item.livro_id: item for item in self.itens.filter(livro__in=[livro.pk for livro in itens])}
+        novos, alterados = [], []
+        for livro, quantidade in itens.items():
+            item = existentes.get(livro.pk)
+            if item:
+                item.quantidade += quantidade
+                item.preco = livro.preco
+                alterados.append(item)
+            else:
+                novos.append(ItensCompra(compra=self, livro=livro, quantidade=quantidade, preco=livro.preco))
+
+        ItensCompra.objects.bulk_create(novos)
+        ItensCompra.objects.bulk_update(alterados, ['quantidade', 'preco'])
+        self.atualizar_total()
+
+    def substituir_itens(self, itens):
+        """Troca todos os itens da compra por ``itens`` (``{livro: quantidade}``), com o preço atual dos livros."""
+        self.itens.all().delete()
+        ItensCompra.objects.bulk_create([
+            ItensCompra(compra=self, livro=livro, quantidade=quantidade, preco=livro.preco)
+            for livro, quantidade in itens.items()
+        ])
+        self.atualizar_total()
+
     def __str__(self):
         return f'({self.id}) {self.usuario} {self.get_status_display()} {self.total}'
 
@@ -40,3 +111,12 @@ class ItensCompra(models.Model):
     livro = models.ForeignKey(Livro, on_delete=models.PROTECT, related_name='itens_compra')
     quantidade = models.IntegerField(default=1)
     preco = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, default=0)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.compra.atualizar_total()
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        self.compra.atualizar_total()
+        return resultado
@@ -0,0 +1,120 @@
+from django.db import models
+from django.db.models import Avg, Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .favorito import Favorito
+from .livro import Livro
+
+
+def _incremento(valores, output_field):
+    """Expressão ``CASE`` com o valor a somar em cada linha, conforme o seu livro."""
+    return Case(
+        *[When(livro_id=livro_id, then=Value(valor)) for livro_id, valor in valores.items()],
+        default=Value(0),
+        output_field=output_field,
+    )
+
+
+class LivroEstatistica(models.Model):
+    """Contadores mantidos por livro, para leituras indexadas no catálogo."""
+
+    livro = models.OneToOneField(Livro, on_delete=models.CASCADE, primary_key=True, related_name='estatistica')
+    total_vendidos = models.PositiveIntegerField(default=0, db_index=True)
+    media_notas = models.FloatField(default=0, db_index=True)
+    total_favoritos = models.PositiveIntegerField(default=0, db_index=True)
+
+    class Meta:
+        verbose_name = 'Estatística do livro'
+        verbose_name_plural = 'Estatísticas dos livros'
+
+    def __str__(self):
+        return f'{self.livro} - {self.total_vendidos} vendidos'
+
+    @classmethod
+    def atualizar_favoritos(cls, *livro_ids, criar=True):
+        """
+        Recalcula a média das notas e o total de favoritos dos livros
+        informados, em um único UPDATE. Com ``criar=False`` não insere linhas
+        (usado na exclusão, quando o livro pode estar sendo removido).
+        """
+        if criar:
+            cls.objects.bulk_create([cls(livro_id=livro_id) for livro_id in livro_ids], ignore_conflicts=True)
+
+        favoritos = Favorito.objects.filter(livro_id=OuterRef('livro_id')).order_by().values('livro_id')
+        cls.objects.filter(livro_id__in=livro_ids).update(
+            media_notas=Coalesce(Subquery(favoritos.annotate(media=Avg('nota')).values('media')), Value(0.0)),
+            total_favoritos=Coalesce(Subquery(favoritos.annotate(total=Count('id')).values('total')), Value(0)),
+        )
+
+
+class VendaLivro(models.Model):
+    """Quantidade e valor vendidos de cada livro por dia (compras finalizadas, pagas ou entregues)."""
+
+    livro = models.ForeignKey(Livro, on_delete=models.CASCADE, related_name='vendas')
+    dia = models.DateField()
+    quantidade = models.PositiveIntegerField(default=0)
+    valor = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = 'Venda do livro'
+        verbose_name_plural = 'Vendas dos livros'
+        unique_together = ['livro', 'dia']
+        indexes = [models.Index(fields=['dia', 'livro'])]
+
+    def __str__(self):
+        return f'{self.dia} {self.livro} ({self.quantidade})'
+
+    @classmethod
+    def registrar(cls, itens, dia, sinal=1):
+        """
+        Soma (ou subtrai, com ``sinal=-1``) os itens de uma compra vendida aos
+        contadores do dia e ao total de cada livro, com uma quantidade fixa de
+        consultas. Chamado por ``core.vendas``.
+        """
+        quantidades, valores = {}, {}
+        for item in itens:
+            quantidades[item.livro_id] = quantidades.get(item.livro_id, 0) + sinal * item.quantidade
+            valores[item.livro_id] = valores.get(item.livro_id, 0) + sinal * (item.preco or 0) * item.quantidade
+        if not quantidades:
+            return
+
+        # Garante as linhas (concorrência segura) e incrementa tudo em um único UPDATE por tabela
+        cls.objects.bulk_create([cls(livro_id=livro_id, dia=dia) for livro_id in quantidades], ignore_conflicts=True)
+        cls.objects.filter(dia=dia, livro_id__in=quantidades).update(
+            quantidade=F('quantidade') + _incremento(quantidades, models.IntegerField()),
+            valor=F('valor') + _incremento(valores, models.DecimalField(max_digits=12, decimal_places=2)),
+        )
+
+        LivroEstatistica.objects.bulk_create(
+            [LivroEstatistica(livro_id=livro_id) for livro_id in quantidades], ignore_conflicts=True
+        )
+        LivroEstatistica.objects.filter(livro_id__in=quantidades).update(
+            total_vendidos=F('total_vendidos') + _incremento(quantidades, models.IntegerField())
+        )
+
+
+class VendaDiaria(models.Model):
+    """Totais de compras vendidas por dia, tipo de pagamento e status."""
+
+    dia = models.DateField()
+    tipo_pagamento = models.IntegerField()
+    status = models.IntegerField()
+    quantidade_vendas = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = 'Venda diária'
+        verbose_name_plural = 'Vendas diárias'
+        unique_together = ['dia', 'tipo_pagamento', 'status']
+
+    def __str__(self):
+        return f'{self.dia} ({self.quantidade_vendas}) {self.total}'
+
+    @classmethod
+    def registrar(cls, dia, tipo_pagamento, status, total, quantidade_vendas=1):
+        """Soma (ou subtrai, com valores negativos) uma venda ao resumo do dia."""
+        cls.objects.bulk_create([cls(dia=dia, tipo_pagamento=tipo_pagamento, status=status)], ignore_conflicts=True)
+        cls.objects.filter(dia=dia, tipo_pagamento=tipo_pagamento, status=status).update(
+            quantidade_vendas=F('quantidade_vendas') + quantidade_vendas,
+            total=F('total') + total,
+        )
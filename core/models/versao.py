@@ -0,0 +1,34 @@
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class VersaoRecurso(models.Model):
+    """
+    Versão de uma coleção (``livros``) ou de um recurso (``livros:42``),
+    usada para gerar ETag/Last-Modified sem consultar os dados em si.
+    """
+
+    chave = models.CharField(max_length=100, primary_key=True)
+    versao = models.PositiveBigIntegerField(default=1)
+    atualizado_em = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Versão de recurso'
+        verbose_name_plural = 'Versões de recursos'
+
+    def __str__(self):
+        return f'{self.chave} v{self.versao}'
+
+    @classmethod
+    def incrementar(cls, *chaves):
+        agora = timezone.now()
+        cls.objects.bulk_create(
+            [cls(chave=chave, versao=0, atualizado_em=agora) for chave in set(chaves)], ignore_conflicts=True
+        )
+        cls.objects.filter(chave__in=chaves).update(versao=F('versao') + 1, atualizado_em=agora)
+
+    @classmethod
+    def invalidar(cls, *chaves):
+        """Incrementa as versões após o commit, sem segurar o lock das linhas durante a transação."""
+        transaction.on_commit(lambda: cls.incrementar(*chaves))
@@ -0,0 +1,182 @@
+"""
+Busca textual do catálogo de livros.
+
+O índice fica em uma tabela auxiliar (``core_livro_busca``, criada pela
+migração 0036) com título, nomes dos autores, nome da editora e descrição da
+categoria de cada livro:
+
+- SQLite: tabela virtual FTS5, ranqueada com ``bm25``;
+- PostgreSQL: coluna ``tsvector`` com índice GIN, ranqueada com ``ts_rank``.
+
+Outros bancos caem em ``icontains`` nos mesmos campos.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend
+
+TABELA = 'core_livro_busca'
+CONFIGURACAO_PG = 'portuguese'
+TAMANHO_LOTE = 1000
+
+# Seleciona (id, titulo, autores, editora, categoria) dos livros; {filtro} restringe os ids.
+SQL_DOCUMENTOS = {
+    'sqlite': (
+        'SELECT l.id, l.titulo, '
+        "COALESCE((SELECT group_concat(a.nome, ' ') FROM core_livro_autores la "
+        "JOIN core_autor a ON a.id = la.autor_id WHERE la.livro_id = l.id), ''), "
+        "COALESCE(e.nome, ''), COALESCE(c.descricao, '') "
+        'FROM core_livro l '
+        'LEFT JOIN core_editora e ON e.id = l.editora_id '
+        'LEFT JOIN core_categoria c ON c.id = l.categoria_id {filtro}'
+    ),
+    'postgresql': (
+        'SELECT l.id, l.titulo, '
+        "COALESCE((SELECT string_agg(a.nome, ' ') FROM core_livro_autores la "
+        "JOIN core_autor a ON a.id = la.autor_id WHERE la.livro_id = l.id), ''), "
+        "COALESCE(e.nome, ''), COALESCE(c.descricao, '') "
+        'FROM core_livro l '
+        'LEFT JOIN core_editora e ON e.id = l.editora_id '
+        'LEFT JOIN core_categoria c ON c.id = l.categoria_id {filtro}'
+    ),
+}
+
+SQL_INSERIR = {
+    'sqlite': f'INSERT INTO {TABELA} (rowid, titulo, autores, editora, categoria) {{documentos}}',
+    'postgresql': (
+        f'INSERT INTO {TABELA} (livro_id, documento) '
+        'SELECT d.id, '
+        f"setweight(to_tsvector('{CONFIGURACAO_PG}', d.titulo), 'A') || "
+        f"setweight(to_tsvector('{CONFIGURACAO_PG}', d.autores), 'B') || "
+        f"setweight(to_tsvector('{CONFIGURACAO_PG}', d.editora), 'C') || "
+        f"setweight(to_tsvector('{CONFIGURACAO_PG}', d.categoria), 'D') "
+        'FROM ({documentos}) AS d (id, titulo, autores, editora, categoria) '
+        'ON CONFLICT (livro_id) DO UPDATE SET documento = EXCLUDED.documento'
+    ),
+}
+
+SQL_REMOVER = {
+    'sqlite': f'DELETE FROM {TABELA} WHERE rowid IN ({{ids}})',
+    'postgresql': f'DELETE FROM {TABELA} WHERE livro_id IN ({{ids}})',
+}
+
+
+def suportado(conexao=connection):
+    return conexao.vendor in SQL_INSERIR
+
+
+def reconstruir_indice(conexao=connection):
+    """Reindexa todo o catálogo (útil após cargas em lote que não disparam signals)."""
+    if not suportado(conexao):
+        return
+    vendor = conexao.vendor
+    documentos = SQL_DOCUMENTOS[vendor].format(filtro='')
+    with conexao.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA}')
+        cursor.execute(SQL_INSERIR[vendor].format(documentos=documentos))
+
+
+def indexar_livros(ids, conexao=connection):
+    """Atualiza no índice os livros informados, em lotes."""
+    if not suportado(conexao):
+        return
+    ids = list(ids)
+    vendor = conexao.vendor
+    with conexao.cursor() as cursor:
+        for inicio in range(0, len(ids), TAMANHO_LOTE):
+            lote = ids[inicio : inicio + TAMANHO_LOTE]
+            marcadores = ', '.join(['%s'] * len(lote))
+            if vendor == 'sqlite':
+                cursor.execute(SQL_REMOVER[vendor].format(ids=marcadores), lote)
+            documentos = SQL_DOCUMENTOS[vendor].format(filtro=f'WHERE l.id IN ({marcadores})')
+            cursor.execute(SQL_INSERIR[vendor].format(documentos=documentos), lote)
+
+
+def remover_livros(ids, conexao=connection):
+    if not suportado(conexao):
+        return
+    ids = list(ids)
+    with conexao.cursor() as cursor:
+        for inicio in range(0, len(ids), TAMANHO_LOTE):
+            lote = ids[inicio : inicio + TAMANHO_LOTE]
+            cursor.execute(SQL_REMOVER[conexao.vendor].format(ids=', '.join(['%s'] * len(lote))), lote)
+
+
+def _termos(texto):
+    return re.findall(r'\w+', texto or '')
+
+
+def buscar(queryset, texto, ordenar=True):
+    """
+    Filtra o queryset de livros pelos termos informados (busca por prefixo,
+    todos os termos obrigatórios) e, se ``ordenar``, ordena por relevância.
+    """
+    termos = _termos(texto)
+    if not termos:
+        return queryset
+
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        consulta = ' '.join(f'"{termo}"*' for termo in termos)
+        condicoes = [f'{TABELA}.rowid = core_livro.id', f'{TABELA} MATCH %s']
+        parametros = [consulta]
+        # bm25 retorna valores negativos: quanto menor, mais relevante
+        relevancia = (f'-bm25({TABELA}, 10.0, 5.0, 2.0, 1.0)', [])
+    elif vendor == 'postgresql':
+        consulta = ' & '.join(f'{termo}:*' for termo in termos)
+        condicoes = [f'{TABELA}.livro_id = core_livro.id', f'{TABELA}.documento @@ to_tsquery(%s::regconfig, %s)']
+        parametros = [CONFIGURACAO_PG, consulta]
+        relevancia = (f'ts_rank({TABELA}.documento, to_tsquery(%s::regconfig, %s))', [CONFIGURACAO_PG, consulta])
+    else:
+        filtro = Q()
+        for termo in termos:
+            filtro &= (
+                Q(titulo__icontains=termo)
+                | Q(autores__nome__icontains=termo)
+                | Q(editora__nome__icontains=termo)
+                | Q(categoria__descricao__icontains=termo)
+            )
+        return queryset.filter(id__in=queryset.model.objects.filter(filtro).values('id'))
+
+    # Junta a tabela do índice uma única vez à consulta dos livros (o ORM não conhece a tabela)
+    if not ordenar:
+        return queryset.extra(tables=[TABELA], where=condicoes, params=parametros)
+    sql, parametros_relevancia = relevancia
+    return queryset.extra(
+        select={'relevancia': sql},
+        select_params=parametros_relevancia,
+        tables=[TABELA],
+        where=condicoes,
+        params=parametros,
+    ).order_by('-relevancia', '-id')
+
+
+class BuscaTextualFilter(BaseFilterBackend):
+    """
+    Busca textual em título, autores, editora e categoria via ``?q=``.
+
+    ``?search=`` continua aceito para clientes antigos. Se ``?ordering=``
+    for informado, a ordenação pedida prevalece sobre a relevância.
+    """
+
+    search_param = 'q'
+    legacy_search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        texto = request.query_params.get(self.search_param) or request.query_params.get(self.legacy_search_param)
+        if not texto:
+            return queryset
+        return buscar(queryset, texto, ordenar=not request.query_params.get('ordering'))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Busca textual em título, autores, editora e categoria.',
+                'schema': {'type': 'string'},
+            },
+        ]
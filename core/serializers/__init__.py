@@ -1,9 +1,12 @@
 from .autor import AutorSerializer
 from .categoria import CategoriaSerializer
 from .compra import (
+    CompraAdicionarItensAoCarrinhoSerializer,
     CompraAdicionarLivroAoCarrinhoSerializer,
     CompraCreateUpdateSerializer,
+    CompraExportarSerializer,
     CompraListSerializer,
+    CompraRelatorioVendasSerializer,
     CompraSerializer,
     ItensCompraCreateUpdateSerializer,
     ItensCompraListSerializer,
@@ -16,6 +19,7 @@ from .livro import (
     LivroAjustarEstoqueSerializer,
     LivroAlterarPrecoSerializer,
     LivroComFavoritosSerializer,
+    LivroImportarSerializer,
     LivroListSerializer,
     LivroMaisVendidoSerializer,
     LivroRetrieveSerializer,
@@ -1,23 +1,61 @@
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework.serializers import (
     CharField,
+    ChoiceField,
     CurrentUserDefault,
+    DateField,
     DateTimeField,
     HiddenField,
     IntegerField,
+    ListSerializer,
     ModelSerializer,
     PrimaryKeyRelatedField,
     SerializerMethodField,
     ValidationError,
 )
 
+from core import vendas
 from core.models import Compra, ItensCompra, Livro
 from core.serializers.livro import LivroListSerializer, Serializer
 
 
+class LivroEmLoteRelatedField(PrimaryKeyRelatedField):
+    """Resolve o livro pelo cache carregado pela lista de itens, em vez de uma consulta por item."""
+
+    def to_internal_value(self, data):
+        livros = getattr(self.parent, 'livros_em_lote', None)
+        if livros is None:
+            return super().to_internal_value(data)
+        try:
+            livro = livros.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if livro is None:
+            self.fail('does_not_exist', pk_value=data)
+        return livro
+
+
+class ItensCompraCreateUpdateListSerializer(ListSerializer):
+    def to_internal_value(self, data):
+        # Carrega todos os livros da lista com uma única consulta
+        ids = set()
+        for item in data if isinstance(data, list) else []:
+            try:
+                ids.add(int(item.get('livro')))
+            except (AttributeError, TypeError, ValueError):
+                continue
+        self.child.livros_em_lote = Livro.objects.in_bulk(ids)
+        return super().to_internal_value(data)
+
+
 class ItensCompraCreateUpdateSerializer(ModelSerializer):
+    livro = LivroEmLoteRelatedField(queryset=Livro.objects.all())
+
     class Meta:
         model = ItensCompra
         fields = ('livro', 'quantidade')
+        list_serializer_class = ItensCompraCreateUpdateListSerializer
 
     def validate(self, item):
         if item['quantidade'] > item['livro'].quantidade:
@@ -63,33 +101,28 @@ class CompraCreateUpdateSerializer(ModelSerializer):
         itens = validated_data.pop('itens')
         usuario = validated_data['usuario']
 
-        compra, criada = Compra.objects.get_or_create(
-            usuario=usuario, status=Compra.StatusCompra.CARRINHO, defaults=validated_data
-        )
-
-        for item in itens:
-            item_existente = compra.itens.filter(livro=item['livro']).first()
-
-            if item_existente:
-                item_existente.quantidade += item['quantidade']
-                item_existente.preco = item['livro'].preco
-                item_existente.save()
-            else:
-                item['preco'] = item['livro'].preco
-                ItensCompra.objects.create(compra=compra, **item)
+        with transaction.atomic():
+            compra, criada = Compra.objects.get_or_create(
+                usuario=usuario, status=Compra.StatusCompra.CARRINHO, defaults=validated_data
+            )
+            compra.adicionar_itens(self._agrupar_por_livro(itens))
 
-        compra.save()
         return compra
 
     def update(self, compra, validated_data):
         itens = validated_data.pop('itens', [])
-        if itens:
-            compra.itens.all().delete()
-            for item in itens:
-                item['preco'] = item['livro'].preco
-                ItensCompra.objects.create(compra=compra, **item)
+        with vendas.alterando_compra(compra):
+            if itens:
+                compra.substituir_itens(self._agrupar_por_livro(itens))
 
-        return super().update(compra, validated_data)
+            return super().update(compra, validated_data)
+
+    @staticmethod
+    def _agrupar_por_livro(itens):
+        quantidades = {}
+        for item in itens:
+            quantidades[item['livro']] = quantidades.get(item['livro'], 0) + item['quantidade']
+        return quantidades
 
 
 class CompraListSerializer(ModelSerializer):
@@ -113,6 +146,14 @@ class CompraSerializer(ModelSerializer):
         model = Compra
         fields = ('id', 'usuario', 'status', 'total', 'data', 'tipo_pagamento', 'itens')  # modificado
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Carrega usuário, itens e livros (com as relações aninhadas) em quantidade fixa de consultas."""
+        itens = ItensCompra.objects.select_related(
+            'livro__categoria', 'livro__editora', 'livro__capa'
+        ).prefetch_related('livro__autores')
+        return queryset.select_related('usuario').prefetch_related(Prefetch('itens', queryset=itens))
+
 
 class CompraAdicionarLivroAoCarrinhoSerializer(Serializer):
     livro_id = PrimaryKeyRelatedField(queryset=Livro.objects.all())
@@ -122,3 +163,61 @@ class CompraAdicionarLivroAoCarrinhoSerializer(Serializer):
         if data['quantidade'] > data['livro_id'].quantidade:
             raise ValidationError({'quantidade': 'Quantidade solicitada não disponível em estoque.'})
         return data
+
+
+class CompraRelatorioVendasSerializer(Serializer):
+    inicio = DateField(required=False, help_text='Data inicial (padrão: primeiro dia do mês atual).')
+    fim = DateField(required=False, help_text='Data final, inclusiva (padrão: hoje).')
+    agrupar_por = ChoiceField(choices=['dia', 'semana', 'mes', 'tipo_pagamento', 'status', 'categoria'], required=False)
+    status = ChoiceField(
+        choices=[choice for choice in Compra.StatusCompra.choices if choice[0] != Compra.StatusCompra.CARRINHO],
+        required=False,
+    )
+
+    def validate(self, data):
+        if data.get('inicio') and data.get('fim') and data['inicio'] > data['fim']:
+            raise ValidationError({'fim': 'A data final deve ser posterior à inicial.'})
+        if data.get('agrupar_por') == 'categoria' and data.get('status'):
+            raise ValidationError({'status': 'O agrupamento por categoria não permite filtrar por status.'})
+        return data
+
+
+class CompraExportarSerializer(Serializer):
+    inicio = DateField(required=False, help_text='Data inicial das compras (inclusiva).')
+    fim = DateField(required=False, help_text='Data final das compras (inclusiva).')
+    status = ChoiceField(choices=Compra.StatusCompra.choices, required=False)
+    formato = ChoiceField(choices=['ndjson', 'csv'], default='ndjson')
+
+    def validate(self, data):
+        if data.get('inicio') and data.get('fim') and data['inicio'] > data['fim']:
+            raise ValidationError({'fim': 'A data final deve ser posterior à inicial.'})
+        return data
+
+
+class CompraItemCarrinhoSerializer(Serializer):
+    livro_id = IntegerField(min_value=1)
+    quantidade = IntegerField(min_value=1, default=1)
+
+
+class CompraAdicionarItensAoCarrinhoSerializer(Serializer):
+    itens = CompraItemCarrinhoSerializer(many=True, allow_empty=False)
+
+    def validate_itens(self, itens):
+        """Agrupa os itens por livro e valida existência e estoque de todos com uma única consulta."""
+        quantidades = {}
+        for item in itens:
+            quantidades[item['livro_id']] = quantidades.get(item['livro_id'], 0) + item['quantidade']
+
+        livros = Livro.objects.in_bulk(quantidades)
+
+        inexistentes = [livro_id for livro_id in quantidades if livro_id not in livros]
+        if inexistentes:
+            raise ValidationError(f'Livros não encontrados: {inexistentes}.')
+
+        sem_estoque = [
+            livro_id for livro_id, quantidade in quantidades.items() if quantidade > (livros[livro_id].quantidade or 0)
+        ]
+        if sem_estoque:
+            raise ValidationError(f'Quantidade solicitada não disponível em estoque para os livros: {sem_estoque}.')
+
+        return {livros[livro_id]: quantidade for livro_id, quantidade in quantidades.items()}
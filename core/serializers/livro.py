@@ -1,5 +1,8 @@
 from rest_framework.serializers import (
+    ChoiceField,
     DecimalField,
+    FileField,
+    FloatField,
     IntegerField,
     ModelSerializer,
     Serializer,
@@ -48,25 +51,32 @@ class LivroAlterarPrecoSerializer(Serializer):
 
 
 class LivroComFavoritosSerializer(ModelSerializer):
-    media_notas = SerializerMethodField()
-    total_favoritos = SerializerMethodField()
+    """
+    Espera o queryset anotado com ``media_notas`` e ``total_favoritos`` e os
+    comentários pré-carregados em ``comentarios_recentes`` (ver
+    ``FavoritoViewSet.livros_com_estatisticas``).
+    """
+
+    media_notas = FloatField(read_only=True)
+    total_favoritos = IntegerField(read_only=True)
     comentarios = SerializerMethodField()
 
     class Meta:
         model = Livro
         fields = ['id', 'titulo', 'media_notas', 'total_favoritos', 'comentarios']
 
-    def get_media_notas(self, obj):
-        notas = obj.favoritos.exclude(nota__isnull=True).values_list('nota', flat=True)
-        if not notas:
-            return 0
-        return sum(notas) / len(notas)
+    def get_comentarios(self, obj):
+        return [
+            {'usuario__email': favorito.usuario.email, 'comentario': favorito.comentario, 'nota': favorito.nota}
+            for favorito in obj.comentarios_recentes
+        ]
 
-    def get_total_favoritos(self, obj):
-        return obj.favoritos.count()
 
-    def get_comentarios(self, obj):
-        return obj.favoritos.exclude(comentario__isnull=True).values('usuario__email', 'comentario', 'nota')
+class LivroImportarSerializer(Serializer):
+    arquivo = FileField(
+        help_text='CSV ou NDJSON (UTF-8) com titulo, isbn, quantidade, preco, categoria, editora, autores.'
+    )
+    formato = ChoiceField(choices=['csv', 'ndjson'], required=False, help_text='Padrão: deduzido pela extensão.')
 
 
 class LivroListSerializer(ModelSerializer):
@@ -0,0 +1,103 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core import cache as cache_respostas
+from core import search
+from core.autenticacao import invalidar_usuarios
+from core.models import Autor, Categoria, Editora, Favorito, Livro, LivroEstatistica, User, VersaoRecurso
+from uploader.models import Image
+
+# Coleções com respostas guardadas por core.views.mixins.CachedResponseMixin
+COLECOES_EM_CACHE = {Autor, Editora, Categoria}
+
+COLECOES = {
+    Livro: 'livros',
+    Autor: 'autores',
+    Editora: 'editoras',
+    Categoria: 'categorias',
+    Image: 'imagens',
+}
+
+
+@receiver(post_save, sender=Livro)
+def indexar_livro(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.indexar_livros([instance.pk])
+
+
+@receiver(post_delete, sender=Livro)
+def remover_livro_do_indice(sender, instance, **kwargs):
+    search.remover_livros([instance.pk])
+
+
+@receiver(m2m_changed, sender=Livro.autores.through)
+def indexar_autores_do_livro(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # autor.livros.clear(): guarda os livros afetados antes de limpar
+        instance._livros_afetados = list(instance.livros.values_list('id', flat=True))
+    elif action in {'post_add', 'post_remove'}:
+        search.indexar_livros(pk_set if reverse else [instance.pk])
+    elif action == 'post_clear':
+        search.indexar_livros(getattr(instance, '_livros_afetados', []) if reverse else [instance.pk])
+
+
+@receiver(post_save, sender=Autor)
+@receiver(post_save, sender=Categoria)
+@receiver(post_save, sender=Editora)
+def indexar_livros_relacionados(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        search.indexar_livros(instance.livros.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Autor)
+@receiver(post_save, sender=Categoria)
+@receiver(post_save, sender=Editora)
+@receiver(post_save, sender=Image)
+@receiver(post_save, sender=Livro)
+@receiver(post_delete, sender=Autor)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_delete, sender=Editora)
+@receiver(post_delete, sender=Image)
+@receiver(post_delete, sender=Livro)
+def atualizar_versao(sender, instance, **kwargs):
+    colecao = COLECOES[sender]
+    VersaoRecurso.invalidar(colecao, f'{colecao}:{instance.pk}')
+    if sender in COLECOES_EM_CACHE:
+        cache_respostas.invalidar(colecao)
+
+
+@receiver(m2m_changed, sender=Livro.autores.through)
+def atualizar_versao_autores_do_livro(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {'post_add', 'post_remove', 'post_clear'}:
+        return
+    if reverse:
+        livros = pk_set or getattr(instance, '_livros_afetados', [])
+    else:
+        livros = [instance.pk]
+    VersaoRecurso.invalidar('livros', *(f'livros:{pk}' for pk in livros))
+
+
+@receiver(post_save, sender=Livro)
+def criar_estatistica(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        LivroEstatistica.objects.get_or_create(livro=instance)
+
+
+@receiver(post_save, sender=Favorito)
+def atualizar_estatistica_favoritos(sender, instance, raw=False, **kwargs):
+    if not raw:
+        LivroEstatistica.atualizar_favoritos(instance.livro_id)
+        VersaoRecurso.invalidar('livros', f'livros:{instance.livro_id}')
+
+
+@receiver(post_delete, sender=Favorito)
+def remover_estatistica_favoritos(sender, instance, **kwargs):
+    LivroEstatistica.atualizar_favoritos(instance.livro_id, criar=False)
+    VersaoRecurso.invalidar('livros', f'livros:{instance.livro_id}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_usuario_em_cache(sender, instance, **kwargs):
+    # Usuários guardados por core.autenticacao.CachedJWTAuthentication
+    invalidar_usuarios(instance.pk)
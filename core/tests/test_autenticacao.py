@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import autenticacao
+from core import cache as cache_respostas
+from core.models import User
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(autenticacao, 'usuarios_locais', autenticacao._LRU())
+        self.usuarios_locais = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.usuario = User.objects.create(email='cliente@example.com')
+        self.token = str(AccessToken.for_user(self.usuario))
+
+    def autenticar(self):
+        requisicao = APIRequestFactory().get('/', headers={'Authorization': f'Bearer {self.token}'})
+        usuario, _ = autenticacao.CachedJWTAuthentication().authenticate(requisicao)
+        return usuario
+
+    def test_segunda_autenticacao_sem_consultas(self):
+        self.autenticar()
+        with self.assertNumQueries(0):
+            assert self.autenticar().pk == self.usuario.pk
+
+    def test_salvar_descarta_o_usuario_em_cache(self):
+        self.autenticar()
+        self.usuario.tipo_usuario = User.TipoUsuario.GERENTE
+        self.usuario.save()
+        assert self.autenticar().tipo_usuario == User.TipoUsuario.GERENTE
+
+    def test_usuario_desativado(self):
+        self.autenticar()
+        self.usuario.is_active = False
+        self.usuario.save()
+        resposta = APIClient().get('/api/autores/', headers={'Authorization': f'Bearer {self.token}'})
+        assert resposta.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_locmem_nao_e_usado_como_cache_compartilhado(self):
+        # Cada processo tem o seu LocMemCache: sem o LRU local, o usuário volta do banco
+        self.autenticar()
+        self.usuarios_locais.pop(str(self.usuario.pk))
+        with self.assertNumQueries(1):
+            self.autenticar()
+
+    def test_cache_compartilhado(self):
+        compartilhado = mock.patch.object(cache_respostas, 'compartilhado', return_value=True)
+        compartilhado.start()
+        self.addCleanup(compartilhado.stop)
+        self.autenticar()
+        self.usuarios_locais.pop(str(self.usuario.pk))
+        with self.assertNumQueries(0):
+            self.autenticar()
+
+        # Outro processo: só a geração incrementada após o commit descarta a cópia compartilhada
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.tipo_usuario = User.TipoUsuario.GERENTE
+            self.usuario.save()
+        assert self.autenticar().tipo_usuario == User.TipoUsuario.GERENTE
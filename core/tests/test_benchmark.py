@@ -0,0 +1,29 @@
+from collections import Counter
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core import benchmark
+from core.models import Compra, ItensCompra, VendaLivro
+
+ESCALA = benchmark.Escala(livros=50, usuarios=10, itens=300, favoritos=30, dias=30)
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        benchmark.popular(ESCALA)
+
+    def test_resumos_no_dia_local_das_compras(self):
+        vendidos = Counter()
+        for item in ItensCompra.objects.exclude(compra__status=Compra.StatusCompra.CARRINHO).select_related('compra'):
+            vendidos[timezone.localdate(item.compra.data), item.livro_id] += item.quantidade
+        resumos = Counter({(venda.dia, venda.livro_id): venda.quantidade for venda in VendaLivro.objects.all()})
+        assert resumos == vendidos
+
+    def test_todas_as_rotas_tem_cenario_ou_exclusao(self):
+        assert benchmark.rotas_sem_cenario() == []
+
+    def test_excluir_compra_vendida(self):
+        [resultado] = benchmark.medir(repeticoes=1, aquecimento=0, filtro='DELETE compras-detail')
+        assert resultado['ok'], resultado
@@ -0,0 +1,40 @@
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import search
+from core.models import Autor, Livro
+
+
+class BuscaTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        machado = Autor.objects.create(nome='Machado de Assis')
+        self.titulo = Livro.objects.create(titulo='Memórias póstumas de Brás Cubas')
+        self.titulo.autores.add(machado)
+        self.autor = Livro.objects.create(titulo='Contos fluminenses')
+        self.autor.autores.add(machado)
+        Livro.objects.create(titulo='Outro livro')
+
+    def titulos(self, **params):
+        resposta = self.client.get('/api/livros/', params)
+        assert resposta.status_code == status.HTTP_200_OK
+        return [livro['titulo'] for livro in resposta.data['results']]
+
+    def test_busca_por_prefixo_sem_acentos(self):
+        assert self.titulos(q='memoria postum') == [self.titulo.titulo]
+
+    def test_busca_em_autores(self):
+        assert set(self.titulos(q='machado')) == {self.titulo.titulo, self.autor.titulo}
+
+    def test_ordena_por_relevancia(self):
+        # O título pesa mais que os autores
+        Livro.objects.filter(pk=self.autor.pk).update(titulo='Contos de Machado')
+        search.indexar_livros([self.autor.pk])
+        assert self.titulos(q='machado')[0] == 'Contos de Machado'
+
+    def test_ordering_prevalece_sobre_relevancia(self):
+        assert self.titulos(q='machado', ordering='titulo') == sorted([self.titulo.titulo, self.autor.titulo])
+
+    def test_search_legado(self):
+        assert self.titulos(search='fluminenses') == [self.autor.titulo]
@@ -0,0 +1,69 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Autor
+
+
+class CacheRespostasTest(TestCase):
+    def setUp(self):
+        # Um cache em arquivos é visto por todos os processos, como o Redis
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': pasta.name}
+        self.enterContext(override_settings(CACHES={'default': cache}))
+        self.autor = Autor.objects.create(nome='Machado de Assis')
+        self.client = APIClient()
+
+    def test_miss_e_hit(self):
+        resposta = self.client.get('/api/autores/')
+        assert resposta.status_code == status.HTTP_200_OK
+        assert resposta['X-Cache'] == 'MISS'
+
+        with self.assertNumQueries(0):
+            guardada = self.client.get('/api/autores/')
+        assert guardada['X-Cache'] == 'HIT'
+        assert guardada.data == resposta.data
+        assert guardada['ETag'] == resposta['ETag']
+
+    def test_hit_com_etag_responde_304(self):
+        etag = self.client.get('/api/autores/')['ETag']
+        resposta = self.client.get('/api/autores/', headers={'If-None-Match': etag})
+        assert resposta.status_code == status.HTTP_304_NOT_MODIFIED
+        assert resposta['X-Cache'] == 'HIT'
+
+    def test_chave_inclui_query_params(self):
+        self.client.get('/api/autores/')
+        assert self.client.get('/api/autores/', {'page': 1})['X-Cache'] == 'MISS'
+        assert self.client.get(f'/api/autores/{self.autor.pk}/')['X-Cache'] == 'MISS'
+
+    def test_alteracao_invalida_as_respostas(self):
+        self.client.get('/api/autores/')
+        self.client.get(f'/api/autores/{self.autor.pk}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.autor.nome = 'Joaquim Maria Machado de Assis'
+            self.autor.save()
+
+        lista = self.client.get('/api/autores/')
+        assert lista['X-Cache'] == 'MISS'
+        assert lista.data['results'][0]['nome'] == self.autor.nome
+        assert self.client.get(f'/api/autores/{self.autor.pk}/')['X-Cache'] == 'MISS'
+
+    def test_exclusao_invalida_as_respostas(self):
+        self.client.get('/api/autores/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.autor.delete()
+        lista = self.client.get('/api/autores/')
+        assert lista['X-Cache'] == 'MISS'
+        assert lista.data['results'] == []
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_sem_cache_compartilhado_nao_guarda(self):
+        # Com o LocMemCache, cada worker serviria as próprias cópias mesmo depois de alterações em outro
+        for _ in range(2):
+            resposta = self.client.get('/api/autores/')
+            assert resposta.status_code == status.HTTP_200_OK
+            assert 'X-Cache' not in resposta
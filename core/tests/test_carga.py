@@ -0,0 +1,95 @@
+import io
+import json
+from decimal import Decimal
+
+from django.core import serializers
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.carga import carregar_dump
+from core.models import (
+    Categoria,
+    Compra,
+    Favorito,
+    ItensCompra,
+    Livro,
+    LivroEstatistica,
+    User,
+    VendaDiaria,
+    VendaLivro,
+)
+
+PRECO = Decimal(30)
+VENDIDOS = 11  # mais_vendidos lista os livros com mais de 10 unidades vendidas
+NOTAS = (4, 5)
+
+
+class CarregarDumpTest(TestCase):
+    def setUp(self):
+        # Monta um dump com os dados, sem os resumos, e limpa o banco para carregá-lo
+        categoria = Categoria.objects.create(descricao='Romance')
+        livro = Livro.objects.create(titulo='Dom Casmurro', quantidade=100, preco=PRECO, categoria=categoria)
+        usuarios = [User.objects.create(email=f'leitor{nota}@example.com') for nota in NOTAS]
+        compra = Compra.objects.create(usuario=usuarios[0], status=Compra.StatusCompra.FINALIZADO)
+        carrinho = Compra.objects.create(usuario=usuarios[1])
+        itens = [
+            ItensCompra.objects.create(compra=compra, livro=livro, quantidade=VENDIDOS, preco=PRECO),
+            ItensCompra.objects.create(compra=carrinho, livro=livro, quantidade=1, preco=PRECO),
+        ]
+        favoritos = [
+            Favorito.objects.create(usuario=usuario, livro=livro, nota=nota, comentario='Bom.')
+            for usuario, nota in zip(usuarios, NOTAS, strict=True)
+        ]
+        objetos = json.loads(
+            serializers.serialize('json', [categoria, livro, *usuarios, compra, carrinho, *itens, *favoritos])
+        )
+        for objeto in objetos:
+            if objeto['model'] == 'core.compra':
+                objeto['fields']['total'] = '0.00'  # total desatualizado no dump
+        self.dump = json.dumps(objetos)
+        self.livro = livro
+
+        Favorito.objects.all().delete()
+        Compra.objects.all().delete()
+        User.objects.all().delete()
+        Livro.objects.all().delete()
+        VendaDiaria.objects.all().delete()
+        VendaLivro.objects.all().delete()
+        LivroEstatistica.objects.all().delete()
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(email='admin@example.com', is_staff=True))
+
+    def test_recalcula_totais_resumos_e_estatisticas(self):
+        carregar_dump(io.StringIO(self.dump))
+
+        total = VENDIDOS * PRECO
+        vendida = Compra.objects.get(status=Compra.StatusCompra.FINALIZADO)
+        assert vendida.total == total
+        assert Compra.objects.get(status=Compra.StatusCompra.CARRINHO).total == PRECO
+
+        hoje = timezone.localdate(vendida.data)
+        assert list(VendaDiaria.objects.values_list('dia', 'quantidade_vendas', 'total')) == [(hoje, 1, total)]
+        assert list(VendaLivro.objects.values_list('livro_id', 'dia', 'quantidade', 'valor')) == [
+            (self.livro.pk, hoje, VENDIDOS, total)
+        ]
+        estatistica = LivroEstatistica.objects.get(livro_id=self.livro.pk)
+        assert estatistica.total_vendidos == VENDIDOS
+        assert estatistica.total_favoritos == len(NOTAS)
+        assert estatistica.media_notas == sum(NOTAS) / len(NOTAS)
+
+    def test_endpoints_usam_os_resumos_carregados(self):
+        carregar_dump(io.StringIO(self.dump))
+
+        for periodo in ('total', '7'):
+            resposta = self.client.get('/api/livros/mais_vendidos/', {'periodo': periodo})
+            assert resposta.status_code == status.HTTP_200_OK
+            assert resposta.data == [{'id': self.livro.pk, 'titulo': 'Dom Casmurro', 'total_vendidos': VENDIDOS}]
+
+        relatorio = self.client.get('/api/compras/relatorio_vendas/').data
+        assert relatorio['total_vendas'] == VENDIDOS * PRECO
+
+        estatisticas = self.client.get('/api/favoritos/livros_com_estatisticas/').data['results']
+        assert [(livro['id'], livro['total_favoritos']) for livro in estatisticas] == [(self.livro.pk, len(NOTAS))]
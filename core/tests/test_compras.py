@@ -0,0 +1,148 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Categoria, Compra, ItensCompra, Livro, User
+
+ESTOQUE = 5
+
+
+class FinalizarCompraTest(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create(email='cliente@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        categoria = Categoria.objects.create(descricao='Romance')
+        self.livro = Livro.objects.create(
+            titulo='Dom Casmurro', quantidade=ESTOQUE, preco=Decimal(30), categoria=categoria
+        )
+        self.compra = Compra.objects.create(usuario=self.usuario)
+
+    def finalizar(self):
+        return self.client.post(f'/api/compras/{self.compra.id}/finalizar/')
+
+    def adicionar(self, quantidade):
+        ItensCompra.objects.create(compra=self.compra, livro=self.livro, quantidade=quantidade, preco=self.livro.preco)
+
+    def assertNaoFinalizada(self, resposta, estoque=ESTOQUE):
+        assert resposta.status_code == status.HTTP_400_BAD_REQUEST
+        self.compra.refresh_from_db()
+        self.livro.refresh_from_db()
+        assert self.compra.status == Compra.StatusCompra.CARRINHO
+        assert self.livro.quantidade == estoque
+
+    def test_finalizar_baixa_o_estoque(self):
+        self.adicionar(2)
+        resposta = self.finalizar()
+        assert resposta.status_code == status.HTTP_200_OK
+        self.livro.refresh_from_db()
+        assert self.livro.quantidade == ESTOQUE - 2
+
+    def test_quantidade_nao_positiva_e_recusada(self):
+        for quantidade in (0, -3):
+            with self.subTest(quantidade=quantidade):
+                ItensCompra.objects.filter(compra=self.compra).delete()
+                self.adicionar(quantidade)
+                resposta = self.finalizar()
+                self.assertNaoFinalizada(resposta)
+                assert resposta.data['status'] == 'Quantidade inválida'
+
+    def test_estoque_insuficiente(self):
+        self.adicionar(ESTOQUE + 1)
+        resposta = self.finalizar()
+        self.assertNaoFinalizada(resposta)
+        assert resposta.data['status'] == 'Quantidade insuficiente'
+
+    def test_livro_sem_estoque_informado(self):
+        Livro.objects.filter(pk=self.livro.pk).update(quantidade=None)
+        self.adicionar(1)
+        resposta = self.finalizar()
+        self.assertNaoFinalizada(resposta, estoque=None)
+        assert resposta.data['quantidade_disponivel'] is None
+
+
+class AdicionarItensAoCarrinhoTest(TestCase):
+    URL = '/api/compras/adicionar_itens_ao_carrinho/'
+
+    def setUp(self):
+        self.usuario = User.objects.create(email='cliente@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        self.categoria = Categoria.objects.create(descricao='Romance')
+        self.livros = self.criar_livros(2)
+
+    def criar_livros(self, quantidade):
+        return [
+            Livro.objects.create(
+                titulo=f'Livro {indice}', quantidade=ESTOQUE, preco=Decimal(10 + indice), categoria=self.categoria
+            )
+            for indice in range(quantidade)
+        ]
+
+    def adicionar(self, itens, cliente=None):
+        return (cliente or self.client).post(
+            self.URL,
+            {'itens': [{'livro_id': livro.pk, 'quantidade': quantidade} for livro, quantidade in itens]},
+            format='json',
+        )
+
+    def itens_no_carrinho(self):
+        return dict(ItensCompra.objects.filter(compra__usuario=self.usuario).values_list('livro_id', 'quantidade'))
+
+    def test_livros_repetidos_sao_somados(self):
+        primeiro, segundo = self.livros
+        resposta = self.adicionar([(primeiro, 1), (segundo, 2), (primeiro, 2)])
+        assert resposta.status_code == status.HTTP_201_CREATED
+        assert self.itens_no_carrinho() == {primeiro.pk: 3, segundo.pk: 2}
+
+        # Um segundo envio soma aos itens do mesmo carrinho
+        resposta = self.adicionar([(primeiro, 1)])
+        assert resposta.status_code == status.HTTP_200_OK
+        assert self.itens_no_carrinho() == {primeiro.pk: 4, segundo.pk: 2}
+        assert Compra.objects.filter(usuario=self.usuario).count() == 1
+
+    def test_total_atualizado(self):
+        primeiro, segundo = self.livros
+        self.adicionar([(primeiro, 2)])
+        resposta = self.adicionar([(segundo, 1), (primeiro, 1)])
+        total = 3 * primeiro.preco + segundo.preco
+        assert Decimal(resposta.data['total']) == total
+        assert Compra.objects.get(usuario=self.usuario).total == total
+
+    def test_estoque_somado_dos_repetidos(self):
+        primeiro, segundo = self.livros
+        resposta = self.adicionar([(segundo, 1), (primeiro, ESTOQUE), (primeiro, 1)])
+        assert resposta.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(primeiro.pk) in str(resposta.data['itens'])
+        assert not Compra.objects.filter(usuario=self.usuario).exists()
+
+    def test_livro_inexistente(self):
+        primeiro, _ = self.livros
+        resposta = self.client.post(
+            self.URL,
+            {'itens': [{'livro_id': primeiro.pk, 'quantidade': 1}, {'livro_id': 999999, 'quantidade': 1}]},
+            format='json',
+        )
+        assert resposta.status_code == status.HTTP_400_BAD_REQUEST
+        assert '999999' in str(resposta.data['itens'])
+        assert not ItensCompra.objects.exists()
+
+    def test_lista_vazia(self):
+        assert self.client.post(self.URL, {'itens': []}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_consultas_nao_crescem_com_os_itens(self):
+        consultas = []
+        for quantidade in (5, 40):
+            cliente = APIClient()
+            cliente.force_authenticate(User.objects.create(email=f'cliente{quantidade}@example.com'))
+            livros = self.criar_livros(quantidade)
+            with CaptureQueriesContext(connection) as capturadas:
+                resposta = self.adicionar([(livro, 1) for livro in livros], cliente)
+            assert resposta.status_code == status.HTTP_201_CREATED
+            assert len(resposta.data['itens']) == quantidade
+            consultas.append(len(capturadas))
+        assert consultas[0] == consultas[1]
@@ -0,0 +1,80 @@
+"""
+Quantidade de consultas SQL das actions mais acessadas.
+
+O número de consultas não pode crescer com o tamanho da página: cada teste
+mede a mesma action com poucos e com muitos registros.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Autor, Categoria, Editora, Favorito, Livro, User
+
+PAGE_SIZE = 10
+AUTORES_POR_LIVRO = 2
+
+
+def criar_livros(quantidade, prefixo='Livro'):
+    categoria = Categoria.objects.create(descricao=f'{prefixo} categoria')
+    editora = Editora.objects.create(nome=f'{prefixo} editora')
+    autores = [Autor.objects.create(nome=f'{prefixo} autor {indice}') for indice in range(AUTORES_POR_LIVRO)]
+    livros = []
+    for indice in range(quantidade):
+        livro = Livro.objects.create(
+            titulo=f'{prefixo} {indice}', quantidade=10, preco=20, categoria=categoria, editora=editora
+        )
+        livro.autores.set(autores)
+        livros.append(livro)
+    return livros
+
+
+class ConsultasTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def assertConsultas(self, quantidade, caminho):
+        with self.assertNumQueries(quantidade):
+            resposta = self.client.get(caminho)
+        assert resposta.status_code == status.HTTP_200_OK
+        return resposta
+
+
+class LivroConsultasTest(ConsultasTestCase):
+    # versões (ETag) + count da paginação + livros (com categoria, editora e capa) + autores
+    LIST = 4
+    # versões (ETag) + livro (com categoria, editora e capa) + autores
+    RETRIEVE = 3
+
+    def test_list(self):
+        criar_livros(2)
+        self.assertConsultas(self.LIST, '/api/livros/')
+
+        criar_livros(PAGE_SIZE, prefixo='Outro')
+        resposta = self.assertConsultas(self.LIST, '/api/livros/')
+        assert len(resposta.data['results']) == PAGE_SIZE
+
+    def test_retrieve(self):
+        livro = criar_livros(1)[0]
+        resposta = self.assertConsultas(self.RETRIEVE, f'/api/livros/{livro.id}/')
+        assert len(resposta.data['autores']) == AUTORES_POR_LIVRO
+
+
+class FavoritoConsultasTest(ConsultasTestCase):
+    # count da paginação + livros + comentários recentes (prefetch com usuário)
+    LIVROS_COM_ESTATISTICAS = 3
+
+    def favoritar(self, livros):
+        for indice, livro in enumerate(livros):
+            usuario = User.objects.create(email=f'{livro.id}-{indice}@example.com')
+            Favorito.objects.create(usuario=usuario, livro=livro, nota=4, comentario='Bom')
+
+    def test_livros_com_estatisticas(self):
+        self.client.force_authenticate(User.objects.create(email='leitor@example.com'))
+        self.favoritar(criar_livros(2))
+        self.assertConsultas(self.LIVROS_COM_ESTATISTICAS, '/api/favoritos/livros_com_estatisticas/')
+
+        self.favoritar(criar_livros(PAGE_SIZE, prefixo='Outro'))
+        self.assertConsultas(self.LIVROS_COM_ESTATISTICAS, '/api/favoritos/livros_com_estatisticas/')
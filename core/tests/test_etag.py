@@ -0,0 +1,80 @@
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Autor, Categoria, Livro
+
+# Só a consulta das versões (VersaoRecurso): nem a lista nem o livro são lidos
+CONSULTAS_304 = 1
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        # As versões são incrementadas após o commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.autor = Autor.objects.create(nome='Machado de Assis')
+            self.livro = Livro.objects.create(
+                titulo='Dom Casmurro', quantidade=10, preco=30, categoria=Categoria.objects.create(descricao='Romance')
+            )
+            self.livro.autores.add(self.autor)
+        self.client = APIClient()
+        self.caminhos = ['/api/livros/', f'/api/livros/{self.livro.pk}/']
+
+    def etags(self):
+        return [self.client.get(caminho)['ETag'] for caminho in self.caminhos]
+
+    def test_validadores_em_list_e_retrieve(self):
+        for caminho in self.caminhos:
+            with self.subTest(caminho=caminho):
+                resposta = self.client.get(caminho)
+                assert resposta.status_code == status.HTTP_200_OK
+                assert resposta['ETag'].startswith('"')
+                assert resposta['Last-Modified']
+        assert len(set(self.etags())) == len(self.caminhos)
+
+    def test_if_none_match(self):
+        for caminho in self.caminhos:
+            with self.subTest(caminho=caminho):
+                etag = self.client.get(caminho)['ETag']
+                with self.assertNumQueries(CONSULTAS_304):
+                    resposta = self.client.get(caminho, headers={'If-None-Match': etag})
+                assert resposta.status_code == status.HTTP_304_NOT_MODIFIED
+                assert resposta['ETag'] == etag
+                assert not resposta.content
+
+                outra = self.client.get(caminho, headers={'If-None-Match': '"outra"'})
+                assert outra.status_code == status.HTTP_200_OK
+
+    def test_if_modified_since(self):
+        for caminho in self.caminhos:
+            with self.subTest(caminho=caminho):
+                ultima_alteracao = self.client.get(caminho)['Last-Modified']
+                with self.assertNumQueries(CONSULTAS_304):
+                    resposta = self.client.get(caminho, headers={'If-Modified-Since': ultima_alteracao})
+                assert resposta.status_code == status.HTTP_304_NOT_MODIFIED
+
+                antes = 'Mon, 01 Jan 2001 00:00:00 GMT'
+                assert self.client.get(caminho, headers={'If-Modified-Since': antes}).status_code == status.HTTP_200_OK
+
+    def test_etag_muda_ao_alterar_o_livro(self):
+        antes = self.etags()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.livro.preco = 35
+            self.livro.save()
+        assert all(depois != etag for depois, etag in zip(self.etags(), antes, strict=True))
+
+    def test_etag_da_lista_muda_ao_alterar_um_autor(self):
+        lista, _ = self.etags()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.autor.nome = 'Joaquim Maria Machado de Assis'
+            self.autor.save()
+        assert self.etags()[0] != lista
+        assert self.client.get('/api/livros/').data['results'][0]['autores'][0]['nome'] == self.autor.nome
+
+    def test_etag_muda_ao_alterar_os_autores_do_livro(self):
+        outro = Autor.objects.create(nome='José de Alencar')
+        for alterar in (lambda: self.livro.autores.add(outro), lambda: outro.livros.remove(self.livro)):
+            antes = self.etags()
+            with self.captureOnCommitCallbacks(execute=True):
+                alterar()
+            assert all(depois != etag for depois, etag in zip(self.etags(), antes, strict=True))
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.test import AsyncClient, TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Compra, ItensCompra, Livro, User
+
+
+class ExportarComprasTest(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create(email='cliente@example.com')
+        livro = Livro.objects.create(titulo='Dom Casmurro', quantidade=10, preco=Decimal(30))
+        self.compra = Compra.objects.create(usuario=self.usuario)
+        ItensCompra.objects.create(compra=self.compra, livro=livro, quantidade=1, preco=livro.preco)
+
+    def test_exporta_em_wsgi(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+        resposta = client.get('/api/compras/exportar/')
+        assert resposta.status_code == status.HTTP_200_OK
+        assert f'"id": {self.compra.id}' in b''.join(resposta.streaming_content).decode()
+
+    async def test_exporta_em_asgi(self):
+        token = AccessToken.for_user(self.usuario)
+        resposta = await AsyncClient().get('/api/compras/exportar/', headers={'Authorization': f'Bearer {token}'})
+        assert resposta.status_code == status.HTTP_200_OK
+        conteudo = b''.join([parte async for parte in resposta.streaming_content]).decode()
+        assert f'"id": {self.compra.id}' in conteudo
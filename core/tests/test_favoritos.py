@@ -0,0 +1,86 @@
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Categoria, Favorito, Livro, LivroEstatistica, User
+
+NOTA_MINIMA = 4
+FAVORITOS_MINIMOS = 2
+
+
+class EstatisticasDeFavoritosTest(TestCase):
+    def setUp(self):
+        categoria = Categoria.objects.create(descricao='Romance')
+        self.livros = [
+            Livro.objects.create(titulo=titulo, quantidade=10, preco=30, categoria=categoria)
+            for titulo in ('Dom Casmurro', 'Iracema', 'O Cortiço')
+        ]
+        self.usuarios = [User.objects.create(email=f'leitor{indice}@example.com') for indice in range(3)]
+        self.client = APIClient()
+
+    def favoritar(self, usuario, livro, nota):
+        return Favorito.objects.create(usuario=self.usuarios[usuario], livro=self.livros[livro], nota=nota)
+
+    def estatistica(self, livro):
+        estatistica = LivroEstatistica.objects.get(livro=self.livros[livro])
+        return estatistica.media_notas, estatistica.total_favoritos
+
+    def ids(self, params):
+        resposta = self.client.get('/api/livros/', params)
+        assert resposta.status_code == status.HTTP_200_OK
+        return [livro['id'] for livro in resposta.data['results']]
+
+    def test_criar_alterar_e_excluir(self):
+        assert self.estatistica(0) == (0, 0)
+
+        primeiro = self.favoritar(0, 0, 4)
+        assert self.estatistica(0) == (4, 1)
+        self.favoritar(1, 0, 2)
+        assert self.estatistica(0) == (3, 2)
+        # Sem nota: conta nos favoritos, mas não na média
+        self.favoritar(2, 0, None)
+        assert self.estatistica(0) == (3, 3)
+
+        primeiro.nota = 5
+        primeiro.save()
+        assert self.estatistica(0) == (3.5, 3)
+
+        primeiro.delete()
+        assert self.estatistica(0) == (2, 2)
+        Favorito.objects.filter(livro=self.livros[0]).delete()
+        assert self.estatistica(0) == (0, 0)
+
+    def test_so_o_livro_favoritado_muda(self):
+        self.favoritar(0, 1, 5)
+        assert self.estatistica(1) == (5, 1)
+        assert self.estatistica(0) == self.estatistica(2) == (0, 0)
+
+    def test_excluir_o_livro_com_favoritos(self):
+        self.favoritar(0, 0, 5)
+        self.livros[0].delete()
+        assert not LivroEstatistica.objects.filter(livro_id=self.livros[0].pk).exists()
+        assert not Favorito.objects.exists()
+
+    def test_livros_com_estatisticas(self):
+        self.favoritar(0, 0, 3)
+        self.favoritar(0, 1, 5)
+        self.favoritar(1, 1, 4)
+
+        self.client.force_authenticate(self.usuarios[2])
+        resposta = self.client.get('/api/favoritos/livros_com_estatisticas/')
+        assert resposta.status_code == status.HTTP_200_OK
+        estatisticas = [(item['id'], item['media_notas'], item['total_favoritos']) for item in resposta.data['results']]
+        assert estatisticas == [(self.livros[1].pk, 4.5, 2), (self.livros[0].pk, 3, 1)]
+
+    def test_filtros_e_ordenacao_em_livros(self):
+        dom_casmurro, iracema, cortico = (livro.pk for livro in self.livros)
+        self.favoritar(0, 0, 5)
+        self.favoritar(0, 1, 3)
+        self.favoritar(1, 1, 4)
+        self.favoritar(2, 1, 2)
+
+        assert self.ids({'estatistica__media_notas__gte': NOTA_MINIMA}) == [dom_casmurro]
+        assert self.ids({'estatistica__media_notas__lte': NOTA_MINIMA, 'ordering': 'titulo'}) == [iracema, cortico]
+        assert self.ids({'estatistica__total_favoritos__gte': FAVORITOS_MINIMOS}) == [iracema]
+        assert self.ids({'ordering': '-estatistica__media_notas'}) == [dom_casmurro, iracema, cortico]
+        assert self.ids({'ordering': '-estatistica__total_favoritos,titulo'}) == [iracema, dom_casmurro, cortico]
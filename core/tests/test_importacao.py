@@ -0,0 +1,62 @@
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import search
+from core.importacao import importar_livros
+from core.models import Livro, User
+
+CABECALHO = 'titulo,quantidade,preco,categoria,editora,autores\n'
+TAMANHO_LOTE = 100
+LINHAS_VALIDAS = 2000
+
+
+def arquivo(conteudo):
+    return io.TextIOWrapper(io.BytesIO(conteudo), encoding='utf-8-sig', newline='')
+
+
+class ImportacaoTest(TestCase):
+    def test_indexa_os_livros_criados(self):
+        linhas = (
+            CABECALHO + 'Dom Casmurro,3,30,Romance,Garnier,Machado de Assis\nIracema,1,20,Romance,,José de Alencar\n'
+        )
+        resumo = importar_livros(arquivo(linhas.encode()))
+
+        assert resumo['livros'] == len(linhas.splitlines()) - 1
+        assert resumo['interrompida'] is None
+        assert [livro.titulo for livro in search.buscar(Livro.objects.all(), 'machado')] == ['Dom Casmurro']
+
+    def test_texto_fora_do_utf8_no_meio_do_arquivo_mantem_os_lotes_gravados(self):
+        # Maior que o buffer do TextIOWrapper: o erro de decodificação só aparece depois de alguns lotes
+        validas = ''.join(f'Livro {numero},1,10,,,\n' for numero in range(LINHAS_VALIDAS))
+        conteudo = (CABECALHO + validas).encode() + 'Inválido,1,10,,,\n'.encode('latin-1')
+
+        resumo = importar_livros(arquivo(conteudo), tamanho_lote=TAMANHO_LOTE)
+
+        assert 0 < resumo['livros'] == Livro.objects.count() < LINHAS_VALIDAS
+        assert resumo['interrompida'] == {'linha': resumo['livros'] + 1, 'erro': 'O arquivo deve estar em UTF-8.'}
+        assert search.buscar(Livro.objects.all(), 'livro').count() == resumo['livros']
+
+
+class ImportacaoApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(email='admin@example.com', is_staff=True))
+
+    def importar(self, conteudo):
+        return self.client.post(
+            '/api/livros/importar/', {'arquivo': SimpleUploadedFile('livros.csv', conteudo)}, format='multipart'
+        )
+
+    def test_arquivo_fora_do_utf8_sem_nenhum_lote_gravado(self):
+        resposta = self.importar((CABECALHO + 'Inválido,1,10,,,\n').encode('latin-1'))
+        assert resposta.status_code == status.HTTP_400_BAD_REQUEST
+        assert resposta.data == {'arquivo': 'O arquivo deve estar em UTF-8.'}
+
+    def test_importa(self):
+        resposta = self.importar((CABECALHO + 'Dom Casmurro,3,30,Romance,,\n').encode())
+        assert resposta.status_code == status.HTTP_201_CREATED
+        assert resposta.data['livros'] == 1
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from prometheus_client.parser import text_string_to_metric_families
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import cache as cache_respostas
+from core.models import Autor
+
+TOKEN = 'token-de-teste'
+PROCESSOS = 2
+
+# Um worker: grava no diretório compartilhado um contador somado uma vez
+SCRIPT_WORKER = """
+from prometheus_client import Counter
+Counter('livraria_teste_workers', 'Teste.', ('worker',)).labels('todos').inc()
+"""
+
+
+def valor(resposta, nome, **labels):
+    """Valor da amostra ``nome`` com exatamente esses labels na exposição, ou ``None``."""
+    for familia in text_string_to_metric_families(resposta.content.decode()):
+        for amostra in familia.samples:
+            if amostra.name == nome and amostra.labels == labels:
+                return amostra.value
+    return None
+
+
+@override_settings(PROMETHEUS_METRICS=True, PROMETHEUS_METRICS_TOKEN=TOKEN)
+class MetricsTest(TestCase):
+    def setUp(self):
+        # O MetricsMiddleware lê PROMETHEUS_METRICS ao ser carregado, na primeira requisição do cliente
+        self.client = APIClient()
+
+    def metrics(self, token=TOKEN):
+        return self.client.get('/metrics', headers={'Authorization': f'Bearer {token}'} if token else {})
+
+    def test_exposicao(self):
+        Autor.objects.create(nome='Machado de Assis')
+        with mock.patch.object(cache_respostas, 'compartilhado', return_value=True):
+            self.client.get('/api/autores/')
+
+        resposta = self.metrics()
+        assert resposta.status_code == status.HTTP_200_OK
+        assert resposta['Content-Type'].startswith('text/plain')
+        labels = {'viewset': 'AutorViewSet', 'action': 'list', 'method': 'GET'}
+        assert valor(resposta, 'livraria_http_request_duration_seconds_count', **labels) >= 1
+        assert valor(resposta, 'livraria_http_responses_total', **labels, status='200') >= 1
+        assert valor(resposta, 'livraria_response_cache_requests_total', **labels, resultado='miss') >= 1
+
+    def test_token(self):
+        assert self.metrics(token=None).status_code == status.HTTP_401_UNAUTHORIZED
+        assert self.metrics(token='errado').status_code == status.HTTP_401_UNAUTHORIZED
+
+    @override_settings(PROMETHEUS_METRICS_TOKEN='')
+    def test_sem_token_configurado(self):
+        assert self.metrics(token=None).status_code == status.HTTP_404_NOT_FOUND
+
+    @override_settings(PROMETHEUS_METRICS=False)
+    def test_desligado(self):
+        assert self.metrics().status_code == status.HTTP_404_NOT_FOUND
+
+    def test_soma_os_processos(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            ambiente = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': diretorio}
+            for _ in range(PROCESSOS):
+                subprocess.run([sys.executable, '-c', SCRIPT_WORKER], env=ambiente, check=True)
+
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': diretorio}):
+                resposta = self.metrics()
+
+        assert resposta.status_code == status.HTTP_200_OK
+        assert valor(resposta, 'livraria_teste_workers_total', worker='todos') == PROCESSOS
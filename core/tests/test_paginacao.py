@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Categoria, Compra, Livro, User
+
+PAGE_SIZE = 10
+PAGE_SIZE_MENOR = 5
+PAGINA = 2
+LIVROS = 25
+COMPRAS = 23
+
+
+class PaginacaoTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(descricao='Romance')
+        for indice in range(LIVROS):
+            Livro.objects.create(titulo=f'Livro {indice:02}', quantidade=10, preco=20, categoria=categoria)
+
+        cls.admin = User.objects.create(email='admin@example.com', is_superuser=True)
+        usuarios = [User.objects.create(email=f'cliente{indice}@example.com') for indice in range(3)]
+        agora = timezone.now()
+        for indice in range(COMPRAS):
+            compra = Compra.objects.create(usuario=usuarios[indice % len(usuarios)])
+            # As datas não seguem os ids: a ordem por -data é diferente da ordem por -id
+            Compra.objects.filter(pk=compra.pk).update(data=agora - timedelta(hours=(indice * 7) % COMPRAS))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, caminho, params=None):
+        resposta = self.client.get(caminho, params)
+        assert resposta.status_code == status.HTTP_200_OK
+        return resposta.data
+
+    def percorrer(self, caminho, params):
+        """Segue os links ``next`` a partir da primeira página e retorna os ids na ordem."""
+        ids, pagina = [], self.get(caminho, params)
+        while True:
+            ids += [item['id'] for item in pagina['results']]
+            if not pagina['next']:
+                return ids
+            pagina = self.get(pagina['next'])
+
+    def test_envelope_por_numero_de_pagina(self):
+        pagina = self.get('/api/livros/', {'page': PAGINA})
+        assert set(pagina) == {'page', 'page_size', 'total_pages', 'results'}
+        assert pagina['page'] == PAGINA
+        assert pagina['page_size'] == PAGE_SIZE
+        assert pagina['total_pages'] == -(-LIVROS // PAGE_SIZE)
+        assert len(pagina['results']) == PAGE_SIZE
+
+    def test_cursor_sem_count(self):
+        with CaptureQueriesContext(connection) as consultas:
+            pagina = self.get('/api/livros/', {'cursor': ''})
+        assert set(pagina) == {'next', 'previous', 'page_size', 'results'}
+        assert pagina['previous'] is None
+        assert 'cursor=' in pagina['next']
+        assert len(pagina['results']) == PAGE_SIZE
+        assert not [consulta for consulta in consultas if 'COUNT(' in consulta['sql'].upper()]
+
+        segunda = self.get(pagina['next'])
+        assert segunda['previous']
+        assert self.get(segunda['previous'])['results'] == pagina['results']
+
+    def test_cursor_percorre_tudo_sem_repetir_nem_pular(self):
+        ids = self.percorrer('/api/livros/', {'cursor': ''})
+        assert ids == list(Livro.objects.order_by('-id').values_list('id', flat=True))
+
+    def test_cursor_com_page_size(self):
+        pagina = self.get('/api/livros/', {'cursor': '', 'page_size': PAGE_SIZE_MENOR})
+        assert len(pagina['results']) == PAGE_SIZE_MENOR
+        assert f'page_size={PAGE_SIZE_MENOR}' in pagina['next']
+        assert len(self.percorrer('/api/livros/', {'cursor': '', 'page_size': PAGE_SIZE_MENOR})) == LIVROS
+
+    def test_compras_por_data(self):
+        self.client.force_authenticate(self.admin)
+        esperado = list(Compra.objects.order_by('-data').values_list('id', flat=True))
+        assert esperado != sorted(esperado, reverse=True)
+
+        assert self.percorrer('/api/compras/', {'cursor': ''}) == esperado
+        # O OrderingFilter não muda a ordem do cursor
+        assert self.percorrer('/api/compras/', {'cursor': '', 'ordering': 'usuario__email'}) == esperado
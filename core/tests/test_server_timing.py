@@ -0,0 +1,57 @@
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from app import metrics
+from core.models import Autor
+
+REQUISICOES = 3
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+class ServerTimingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        Autor.objects.create(nome='Machado de Assis')
+        # O middleware lê a taxa de amostragem ao ser carregado, na primeira requisição do cliente
+        self.client = APIClient()
+
+    def tempos(self, resposta):
+        return {nome: float(duracao) for nome, duracao in re.findall(r'(\w+);dur=([\d.]+)', resposta['Server-Timing'])}
+
+    def test_cabecalho_com_sql_view_e_render(self):
+        resposta = self.client.get('/api/autores/')
+        assert resposta.status_code == status.HTTP_200_OK
+        tempos = self.tempos(resposta)
+        assert set(tempos) == {'sql', 'view', 'render', 'total'}
+        assert tempos['total'] >= tempos['sql'] + tempos['view'] + tempos['render'] - 0.3
+        assert re.search(r'sql;dur=[\d.]+;desc="[1-9]\d* consultas"', resposta['Server-Timing'])
+
+    def test_agregados_por_rota(self):
+        def amostra(nome, **labels):
+            return REGISTRY.get_sample_value(f'livraria_server_timing_{nome}_total', labels) or 0
+
+        antes = {
+            'requisicoes': amostra('requests', rota='autores-list'),
+            'consultas': amostra('queries', rota='autores-list'),
+            'total': amostra('seconds', rota='autores-list', trecho='total'),
+            'sql': amostra('seconds', rota='autores-list', trecho='sql'),
+            'sem_rota': amostra('requests', rota=metrics.SEM_ROTA),
+        }
+        for _ in range(REQUISICOES):
+            self.client.get('/api/autores/')
+        self.client.get('/nao-existe/')
+
+        assert amostra('requests', rota='autores-list') - antes['requisicoes'] == REQUISICOES
+        assert amostra('queries', rota='autores-list') > antes['consultas']
+        total = amostra('seconds', rota='autores-list', trecho='total') - antes['total']
+        assert total >= amostra('seconds', rota='autores-list', trecho='sql') - antes['sql'] > 0
+        assert amostra('requests', rota=metrics.SEM_ROTA) - antes['sem_rota'] == 1
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_desligado(self):
+        assert 'Server-Timing' not in APIClient().get('/api/autores/')
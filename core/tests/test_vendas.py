@@ -0,0 +1,182 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import vendas
+from core.models import Categoria, Compra, ItensCompra, Livro, LivroEstatistica, User, VendaDiaria, VendaLivro
+
+PRECO_LIVRO = Decimal(30)
+PRECO_OUTRO = Decimal(20)
+
+
+def totais_vendas():
+    """(quantidade de vendas, total) em VendaDiaria e (itens, valor) em VendaLivro."""
+    diaria = VendaDiaria.objects.aggregate(vendas=Sum('quantidade_vendas'), total=Sum('total'))
+    por_livro = VendaLivro.objects.aggregate(itens=Sum('quantidade'), valor=Sum('valor'))
+    return (diaria['vendas'] or 0, diaria['total'] or 0), (por_livro['itens'] or 0, por_livro['valor'] or 0)
+
+
+class VendasTestCase(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create(email='cliente@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        categoria = Categoria.objects.create(descricao='Romance')
+        self.livro = Livro.objects.create(titulo='Dom Casmurro', quantidade=10, preco=PRECO_LIVRO, categoria=categoria)
+        self.outro = Livro.objects.create(titulo='Iracema', quantidade=10, preco=PRECO_OUTRO, categoria=categoria)
+
+    def comprar(self, itens):
+        compra = Compra.objects.create(usuario=self.usuario)
+        compra.adicionar_itens(itens)
+        resposta = self.client.post(f'/api/compras/{compra.id}/finalizar/')
+        assert resposta.status_code == status.HTTP_200_OK
+        compra.refresh_from_db()
+        return compra
+
+    def assertTotais(self, vendas, total, itens):
+        assert totais_vendas() == ((vendas, total), (itens, total))
+
+
+class ResumosDeVendasTest(VendasTestCase):
+    def test_finalizar_soma_nos_dois_resumos(self):
+        quantidade = 2
+        self.comprar({self.livro: quantidade, self.outro: 1})
+        total = quantidade * PRECO_LIVRO + PRECO_OUTRO
+        self.assertTotais(vendas=1, total=total, itens=quantidade + 1)
+        assert LivroEstatistica.objects.get(livro=self.livro).total_vendidos == quantidade
+
+        relatorio = self.client.get('/api/compras/relatorio_vendas/').data
+        por_categoria = self.client.get('/api/compras/relatorio_vendas/', {'agrupar_por': 'categoria'}).data
+        assert relatorio['total_vendas'] == por_categoria['total_vendas'] == total
+
+    def test_excluir_compra_vendida(self):
+        vendas.excluir_compra(self.comprar({self.livro: 2}))
+        self.assertTotais(vendas=0, total=0, itens=0)
+        assert LivroEstatistica.objects.get(livro=self.livro).total_vendidos == 0
+
+    def test_excluir_pela_api(self):
+        compra = self.comprar({self.livro: 2})
+        assert self.client.delete(f'/api/compras/{compra.id}/').status_code == status.HTTP_204_NO_CONTENT
+        self.assertTotais(vendas=0, total=0, itens=0)
+
+    def test_voltar_ao_carrinho(self):
+        compra = self.comprar({self.livro: 2})
+        with vendas.alterando_compra(compra):
+            compra.status = Compra.StatusCompra.CARRINHO
+            compra.save()
+        self.assertTotais(vendas=0, total=0, itens=0)
+
+    def test_mudar_de_status_e_pagamento(self):
+        compra = self.comprar({self.livro: 2})
+        with vendas.alterando_compra(compra):
+            compra.status = Compra.StatusCompra.PAGO
+            compra.tipo_pagamento = Compra.TipoPagamento.PIX
+            compra.save()
+        self.assertTotais(vendas=1, total=2 * PRECO_LIVRO, itens=2)
+        assert list(VendaDiaria.objects.filter(quantidade_vendas__gt=0).values_list('status', 'tipo_pagamento')) == [
+            (Compra.StatusCompra.PAGO, Compra.TipoPagamento.PIX)
+        ]
+
+    def test_mudar_a_data(self):
+        quantidade = 2
+        compra = self.comprar({self.livro: quantidade})
+        ontem = timezone.localdate() - timedelta(days=1)
+        with vendas.alterando_compra(compra):
+            compra.data -= timedelta(days=1)
+            compra.save()
+        self.assertTotais(vendas=1, total=quantidade * PRECO_LIVRO, itens=quantidade)
+        assert VendaLivro.objects.get(livro=self.livro, dia=ontem).quantidade == quantidade
+        assert VendaDiaria.objects.get(dia=ontem).quantidade_vendas == 1
+
+    def test_alterar_item_de_compra_vendida(self):
+        compra = self.comprar({self.livro: 2, self.outro: 1})
+        item = compra.itens.get(livro=self.livro)
+        with vendas.alterando_compra(compra):
+            item.quantidade = 1
+            item.save()
+        self.assertTotais(vendas=1, total=PRECO_LIVRO + PRECO_OUTRO, itens=2)
+
+        with vendas.alterando_compra(compra):
+            ItensCompra.objects.get(pk=item.pk).delete()
+        self.assertTotais(vendas=1, total=PRECO_OUTRO, itens=1)
+
+    def test_substituir_itens_de_compra_vendida(self):
+        compra = self.comprar({self.livro: 2})
+        quantidade = 3
+        resposta = self.client.put(
+            f'/api/compras/{compra.id}/', {'itens': [{'livro': self.outro.id, 'quantidade': quantidade}]}, format='json'
+        )
+        assert resposta.status_code == status.HTTP_200_OK
+        self.assertTotais(vendas=1, total=quantidade * PRECO_OUTRO, itens=quantidade)
+        assert VendaLivro.objects.get(livro=self.outro, dia=timezone.localdate()).quantidade == quantidade
+        assert VendaLivro.objects.get(livro=self.livro).quantidade == 0
+
+
+class TotalDaCompraTest(VendasTestCase):
+    def test_save_de_instancia_desatualizada_nao_sobrescreve_o_total(self):
+        compra = Compra.objects.create(usuario=self.usuario)
+        desatualizada = Compra.objects.get(pk=compra.pk)
+        compra.adicionar_itens({self.livro: 1})
+
+        with vendas.alterando_compra(desatualizada):
+            desatualizada.status = Compra.StatusCompra.FINALIZADO
+            desatualizada.save()
+        assert Compra.objects.get(pk=compra.pk).total == PRECO_LIVRO
+        self.assertTotais(vendas=1, total=PRECO_LIVRO, itens=1)
+
+    def test_alterar_item_com_total_desatualizado(self):
+        compra = self.comprar({self.livro: 1})
+        desatualizada = Compra.objects.get(pk=compra.pk)
+        with vendas.alterando_compra(compra):
+            compra.adicionar_itens({self.outro: 1})
+
+        # A instância ainda tem o total antigo: a diferença vem do total gravado no banco
+        with vendas.alterando_compra(desatualizada):
+            desatualizada.adicionar_itens({self.outro: 1})
+        total = PRECO_LIVRO + 2 * PRECO_OUTRO
+        assert Compra.objects.get(pk=compra.pk).total == total
+        self.assertTotais(vendas=1, total=total, itens=3)
+
+        vendas.excluir_compra(desatualizada)
+        self.assertTotais(vendas=0, total=0, itens=0)
+
+
+class AdminDeComprasTest(VendasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create(email='admin@example.com', is_staff=True, is_superuser=True))
+
+    def test_alterar_status_e_itens(self):
+        compra = self.comprar({self.livro: 2})
+        item = compra.itens.get()
+        quantidade = 3
+        resposta = self.client.post(
+            f'/admin/core/compra/{compra.pk}/change/',
+            {
+                'usuario': self.usuario.pk,
+                'status': Compra.StatusCompra.PAGO,
+                'tipo_pagamento': compra.tipo_pagamento,
+                'total': compra.total,
+                'itens-TOTAL_FORMS': 1,
+                'itens-INITIAL_FORMS': 1,
+                'itens-0-id': item.pk,
+                'itens-0-compra': compra.pk,
+                'itens-0-livro': self.livro.pk,
+                'itens-0-quantidade': quantidade,
+                'itens-0-preco': PRECO_LIVRO,
+            },
+        )
+        assert resposta.status_code == status.HTTP_302_FOUND
+        self.assertTotais(vendas=1, total=quantidade * PRECO_LIVRO, itens=quantidade)
+        assert VendaDiaria.objects.get(status=Compra.StatusCompra.PAGO).quantidade_vendas == 1
+
+    def test_excluir(self):
+        compra = self.comprar({self.livro: 2})
+        resposta = self.client.post(f'/admin/core/compra/{compra.pk}/delete/', {'post': 'yes'})
+        assert resposta.status_code == status.HTTP_302_FOUND
+        self.assertTotais(vendas=0, total=0, itens=0)
@@ -0,0 +1,164 @@
+"""
+Resumos de vendas (``VendaDiaria`` e ``VendaLivro``) e estatísticas dos livros.
+
+As alterações de compras vendidas são somadas aos resumos aqui, e não nos
+modelos: quem muda o status, o pagamento, a data ou os itens de uma compra
+(``finalizar``, o ``CompraCreateUpdateSerializer``, o admin) faz isso dentro
+de ``alterando_compra``, e ``excluir_compra`` exclui a compra e a retira dos
+resumos. ``update()`` e ``delete()`` em querysets não passam por eles.
+
+``recalcular_resumos`` refaz os totais das compras, os resumos e
+``LivroEstatistica`` do zero, a partir das compras, itens e favoritos
+gravados, com consultas agregadas (como nas migrações 0039 a 0042). Usado
+depois de gravações que não passam pelos modelos, como a carga de dumps com
+``bulk_create``.
+"""
+
+from contextlib import contextmanager
+
+from django.db import models, transaction
+from django.db.models import Avg, Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from core.models import Compra, Favorito, ItensCompra, Livro, LivroEstatistica, VendaDiaria, VendaLivro
+
+TAMANHO_LOTE = 1000
+DECIMAL = models.DecimalField(max_digits=10, decimal_places=2)
+# Campos dos itens somados em VendaLivro
+CAMPOS_ITEM_VENDA = ('livro_id', 'quantidade', 'preco')
+
+
+def _vendidos(modelo, prefixo=''):
+    """Compras (ou itens) finalizados, pagos ou entregues."""
+    return modelo.objects.filter(**{f'{prefixo}status__gt': Compra.StatusCompra.CARRINHO})
+
+
+def _somar_venda(compra, sinal):
+    """Soma (ou subtrai, com ``sinal=-1``) aos resumos a compra como está gravada, se ela foi vendida."""
+    gravada = (
+        Compra.objects
+        .select_for_update()
+        .only('data', 'tipo_pagamento', 'status', 'total')
+        .filter(pk=compra.pk)
+        .first()
+    )
+    if gravada is None or gravada.status == Compra.StatusCompra.CARRINHO:
+        return
+    dia = timezone.localdate(gravada.data)
+    VendaDiaria.registrar(
+        dia, gravada.tipo_pagamento, gravada.status, total=sinal * gravada.total, quantidade_vendas=sinal
+    )
+    VendaLivro.registrar(ItensCompra.objects.filter(compra_id=compra.pk).only(*CAMPOS_ITEM_VENDA), dia, sinal=sinal)
+
+
+def retirar_venda(compra):
+    """Subtrai a compra gravada (e os seus itens) dos resumos, antes de alterá-la."""
+    _somar_venda(compra, -1)
+
+
+def registrar_venda(compra):
+    """Soma a compra gravada (e os seus itens) aos resumos, depois de alterá-la."""
+    _somar_venda(compra, 1)
+
+
+@contextmanager
+def alterando_compra(compra):
+    """
+    Bloco que altera a compra ou os seus itens: a venda como estava gravada sai
+    dos resumos antes do bloco e a gravada no fim entra, na mesma transação.
+    Para carrinhos, só confere o status.
+    """
+    with transaction.atomic():
+        retirar_venda(compra)
+        yield compra
+        registrar_venda(compra)
+
+
+def excluir_compra(compra):
+    """Exclui a compra e a retira dos resumos de vendas."""
+    with transaction.atomic():
+        retirar_venda(compra)
+        return compra.delete()
+
+
+def recalcular_totais():
+    """Grava em cada compra a soma dos seus itens."""
+    soma = (
+        ItensCompra.objects
+        .filter(compra=OuterRef('pk'))
+        .values('compra')
+        .annotate(soma=Sum(F('preco') * F('quantidade'), output_field=DECIMAL))
+        .values('soma')
+    )
+    Compra.objects.update(total=Coalesce(Subquery(soma), Value(0), output_field=DECIMAL))
+
+
+def recalcular_vendas():
+    """Refaz ``VendaDiaria`` (por compra) e ``VendaLivro`` (por item), no dia local de cada compra."""
+    VendaDiaria.objects.all().delete()
+    resumos = (
+        _vendidos(Compra)
+        .annotate(dia=TruncDate('data'))
+        .values('dia', 'tipo_pagamento', 'status')
+        .annotate(quantidade=Count('id'), soma=Sum('total'))
+        .order_by()
+    )
+    VendaDiaria.objects.bulk_create(
+        [
+            VendaDiaria(
+                dia=resumo['dia'],
+                tipo_pagamento=resumo['tipo_pagamento'],
+                status=resumo['status'],
+                quantidade_vendas=resumo['quantidade'],
+                total=resumo['soma'] or 0,
+            )
+            for resumo in resumos.iterator()
+        ],
+        batch_size=TAMANHO_LOTE,
+    )
+
+    VendaLivro.objects.all().delete()
+    por_dia = (
+        _vendidos(ItensCompra, 'compra__')
+        .annotate(dia=TruncDate('compra__data'))
+        .values('livro_id', 'dia')
+        .annotate(total_quantidade=Sum('quantidade'), total_valor=Sum(F('preco') * F('quantidade')))
+        .order_by()
+    )
+    VendaLivro.objects.bulk_create(
+        [
+            VendaLivro(
+                livro_id=venda['livro_id'],
+                dia=venda['dia'],
+                quantidade=venda['total_quantidade'],
+                valor=venda['total_valor'] or 0,
+            )
+            for venda in por_dia.iterator()
+        ],
+        batch_size=TAMANHO_LOTE,
+    )
+
+
+def recalcular_estatisticas():
+    """Garante a linha de cada livro em ``LivroEstatistica`` e refaz vendidos, média das notas e favoritos."""
+    LivroEstatistica.objects.bulk_create(
+        [LivroEstatistica(livro_id=livro_id) for livro_id in Livro.objects.values_list('id', flat=True).iterator()],
+        batch_size=TAMANHO_LOTE,
+        ignore_conflicts=True,
+    )
+
+    vendidos = _vendidos(ItensCompra, 'compra__').filter(livro_id=OuterRef('livro_id')).order_by().values('livro_id')
+    favoritos = Favorito.objects.filter(livro_id=OuterRef('livro_id')).order_by().values('livro_id')
+    LivroEstatistica.objects.update(
+        total_vendidos=Coalesce(Subquery(vendidos.annotate(total=Sum('quantidade')).values('total')), Value(0)),
+        media_notas=Coalesce(Subquery(favoritos.annotate(media=Avg('nota')).values('media')), Value(0.0)),
+        total_favoritos=Coalesce(Subquery(favoritos.annotate(total=Count('id')).values('total')), Value(0)),
+    )
+
+
+def recalcular_resumos():
+    """Totais das compras, resumos de vendas e estatísticas dos livros, nessa ordem."""
+    recalcular_totais()
+    recalcular_vendas()
+    recalcular_estatisticas()
@@ -1,12 +1,16 @@
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.viewsets import ModelViewSet
 
+from app.middleware import MedicaoViewMixin
 from core.models import Autor
 from core.serializers import AutorSerializer
 
+from .mixins import CachedResponseMixin, ConditionalGetMixin
 
-class AutorViewSet(ModelViewSet):
+
+class AutorViewSet(MedicaoViewMixin, CachedResponseMixin, ConditionalGetMixin, ModelViewSet):
     queryset = Autor.objects.order_by('-id')
     serializer_class = AutorSerializer
     search_fields = ['nome']
     filter_backends = (SearchFilter, OrderingFilter)
+    version_key = 'autores'
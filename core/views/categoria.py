@@ -1,12 +1,16 @@
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.viewsets import ModelViewSet
 
+from app.middleware import MedicaoViewMixin
 from core.models import Categoria
 from core.serializers import CategoriaSerializer
 
+from .mixins import CachedResponseMixin, ConditionalGetMixin
 
-class CategoriaViewSet(ModelViewSet):
+
+class CategoriaViewSet(MedicaoViewMixin, CachedResponseMixin, ConditionalGetMixin, ModelViewSet):
     queryset = Categoria.objects.order_by('-id')
     search_fields = ['descricao']
     filter_backends = (SearchFilter, OrderingFilter)
     serializer_class = CategoriaSerializer
+    version_key = 'categorias'
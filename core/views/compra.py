@@ -1,4 +1,9 @@
-from django.db import transaction
+from datetime import datetime, time, timedelta
+
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, inline_serializer
@@ -9,34 +14,56 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from core.models import Compra, User
-from core.models.compra import ItensCompra
+from app.middleware import MedicaoViewMixin
+from core import exportacao, vendas
+from core.models import Compra, Livro, User, VendaDiaria, VendaLivro, VersaoRecurso
 from core.serializers import (
+    CompraAdicionarItensAoCarrinhoSerializer,
     CompraAdicionarLivroAoCarrinhoSerializer,
     CompraCreateUpdateSerializer,
+    CompraExportarSerializer,
     CompraListSerializer,
+    CompraRelatorioVendasSerializer,
     CompraSerializer,
 )
 
+# Expressão de agrupamento sobre os resumos diários (VendaDiaria / VendaLivro)
+AGRUPAMENTOS_RELATORIO = {
+    'dia': F('dia'),
+    'semana': TruncWeek('dia'),
+    'mes': TruncMonth('dia'),
+    'tipo_pagamento': F('tipo_pagamento'),
+    'status': F('status'),
+    'categoria': F('livro__categoria__descricao'),
+}
+
 
-class CompraViewSet(ModelViewSet):
+class CompraViewSet(MedicaoViewMixin, ModelViewSet):
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ['usuario__email', 'status', 'data']
     search_fields = ['usuario__email']
     ordering_fields = ['usuario__email', 'status', 'data']
     ordering = ['-data']
+    cursor_ordering = '-data'
     permission_classes = [IsAuthenticated]
     queryset = Compra.objects.order_by('-id')
 
     def get_queryset(self):
         usuario = self.request.user
-        if usuario.is_superuser:
-            return Compra.objects.prefetch_related('itens').prefetch_related('itens__livro').prefetch_related('usuario').order_by('-id')
-        if usuario.groups.filter(name='administradores'):
-            return Compra.objects.prefetch_related('itens').prefetch_related('itens__livro').prefetch_related('usuario').order_by('-id')
-        if usuario.tipo_usuario == User.TipoUsuario.GERENTE:
-            return Compra.objects.prefetch_related('itens').prefetch_related('itens__livro').prefetch_related('usuario').order_by('-id')
-        return Compra.objects.filter(usuario=usuario).prefetch_related('itens').prefetch_related('itens__livro').prefetch_related('usuario').order_by('-id')
+        queryset = Compra.objects.order_by('-id')
+        if not (
+            usuario.is_superuser
+            or usuario.groups.filter(name='administradores')
+            or usuario.tipo_usuario == User.TipoUsuario.GERENTE
+        ):
+            queryset = queryset.filter(usuario=usuario)
+        if self.action == 'finalizar':
+            # finalizar relê a compra e os itens com lock; o prefetch seria descartado
+            return queryset
+        return queryset.prefetch_related('itens').prefetch_related('itens__livro').prefetch_related('usuario')
+
+    def perform_destroy(self, instance):
+        vendas.excluir_compra(instance)
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -48,39 +75,78 @@ class CompraViewSet(ModelViewSet):
     @extend_schema(
         summary="Finalizar compra",
         description="Finaliza a compra do carrinho de compras do usuário autenticado.",
-        responses={200: None, 400: None, 404: None},
+        responses={200: None, 400: None, 404: None, 409: None},
     )
     @action(detail=True, methods=['post'])
     def finalizar(self, request, pk=None):
         ''' Finaliza a compra do carrinho de compras.'''
         compra = self.get_object()
 
-        if compra.status != Compra.StatusCompra.CARRINHO:
-            return Response(
-                status=status.HTTP_400_BAD_REQUEST,
-                data={'status': 'Compra já finalizada'},
-            )
-
         with transaction.atomic():
+            # Trava a compra: duas finalizações simultâneas não podem baixar o estoque duas vezes
+            compra = Compra.objects.select_for_update().get(pk=compra.pk)
+            if compra.status != Compra.StatusCompra.CARRINHO:
+                return Response(
+                    status=status.HTTP_400_BAD_REQUEST,
+                    data={'status': 'Compra já finalizada'},
+                )
+
+            quantidades = {}
             for item in compra.itens.all():
-                if item.quantidade > item.livro.quantidade:
+                if item.quantidade <= 0:
                     return Response(
                         status=status.HTTP_400_BAD_REQUEST,
-                        data={
-                            'status': 'Quantidade insuficiente',
-                            'livro': item.livro.titulo,
-                            'quantidade_disponivel': item.livro.quantidade,
-                        },
+                        data={'status': 'Quantidade inválida', 'livro': item.livro_id, 'quantidade': item.quantidade},
                     )
+                quantidades[item.livro_id] = quantidades.get(item.livro_id, 0) + item.quantidade
+
+            # Trava todos os livros de uma vez, sempre na mesma ordem (evita deadlock entre checkouts)
+            livros = Livro.objects.select_for_update().filter(id__in=quantidades).order_by('id')
+            for livro in livros.only('id', 'titulo', 'quantidade'):
+                if quantidades[livro.id] > (livro.quantidade or 0):
+                    return self._quantidade_insuficiente(livro)
 
-                item.livro.quantidade -= item.quantidade
-                item.livro.save()
+            if quantidades:
+                baixa = Case(
+                    *[When(id=livro_id, then=Value(quantidade)) for livro_id, quantidade in quantidades.items()],
+                    output_field=models.IntegerField(),
+                )
+                # A condição no UPDATE garante que o estoque nunca fica negativo, mesmo sem lock (SQLite)
+                atualizados = Livro.objects.filter(id__in=quantidades, quantidade__gte=baixa).update(
+                    quantidade=F('quantidade') - baixa
+                )
+                if atualizados != len(quantidades):
+                    transaction.set_rollback(True)
+                    livro = Livro.objects.filter(
+                        Q(quantidade__lt=baixa) | Q(quantidade__isnull=True), id__in=quantidades
+                    ).first()
+                    if livro is None:
+                        # O estoque mudou entre a conferência e a baixa; o cliente pode tentar de novo
+                        return Response(
+                            status=status.HTTP_409_CONFLICT,
+                            data={'status': 'Estoque alterado durante a finalização, tente novamente'},
+                        )
+                    return self._quantidade_insuficiente(livro)
 
-            compra.status = Compra.StatusCompra.FINALIZADO
-            compra.save()
+            with vendas.alterando_compra(compra):
+                compra.status = Compra.StatusCompra.FINALIZADO
+                compra.save(update_fields=['status'])
+
+            VersaoRecurso.invalidar('livros', *(f'livros:{livro_id}' for livro_id in quantidades))
 
         return Response(status=status.HTTP_200_OK, data={'status': 'Compra finalizada'})
 
+    @staticmethod
+    def _quantidade_insuficiente(livro):
+        return Response(
+            status=status.HTTP_400_BAD_REQUEST,
+            data={
+                'status': 'Quantidade insuficiente',
+                'livro': livro.titulo,
+                'quantidade_disponivel': livro.quantidade,
+            },
+        )
+
     @extend_schema(
         summary="Relatório de vendas do mês",
         description="Gera um relatório com o total de vendas e a quantidade de vendas do mês atual.",
@@ -95,23 +161,131 @@ class CompraViewSet(ModelViewSet):
     )
     @action(detail=False, methods=['get'])
     def relatorio_vendas_mes(self, request):
-        agora = timezone.now()
-        inicio_mes = agora.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-        compras = Compra.objects.filter(status=Compra.StatusCompra.FINALIZADO, data__gte=inicio_mes)
+        inicio_mes = timezone.localdate().replace(day=1)
 
-        total_vendas = sum(compra.total for compra in compras)
-        quantidade_vendas = compras.count()
+        totais = VendaDiaria.objects.filter(status=Compra.StatusCompra.FINALIZADO, dia__gte=inicio_mes).aggregate(
+            total_vendas=Coalesce(Sum('total'), 0, output_field=models.DecimalField()),
+            quantidade_vendas=Coalesce(Sum('quantidade_vendas'), 0),
+        )
 
         return Response(
             {
                 'status': 'Relatório de vendas deste mês',
-                'total_vendas': total_vendas,
-                'quantidade_vendas': quantidade_vendas,
+                'total_vendas': totais['total_vendas'],
+                'quantidade_vendas': totais['quantidade_vendas'],
             },
             status=status.HTTP_200_OK,
         )
 
+    @extend_schema(
+        summary="Relatório de vendas",
+        description=(
+            "Totais de vendas (compras finalizadas, pagas ou entregues) em um intervalo de datas, "
+            "opcionalmente agrupados por dia, semana, mês, tipo de pagamento, status ou categoria. "
+            "Calculado a partir dos resumos diários, com custo independente do tamanho do intervalo."
+        ),
+        parameters=[CompraRelatorioVendasSerializer],
+        responses={200: inline_serializer(
+            name='RelatorioVendasResponse',
+            fields={
+                'inicio': serializers.DateField(),
+                'fim': serializers.DateField(),
+                'agrupar_por': serializers.CharField(allow_null=True),
+                'total_vendas': serializers.FloatField(),
+                'quantidade_vendas': serializers.IntegerField(required=False),
+                'quantidade_itens': serializers.IntegerField(required=False),
+                'grupos': serializers.ListField(child=serializers.DictField()),
+            },
+        )},
+    )
+    @action(detail=False, methods=['get'])
+    def relatorio_vendas(self, request):
+        parametros = CompraRelatorioVendasSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+
+        hoje = timezone.localdate()
+        inicio = parametros.validated_data.get('inicio', hoje.replace(day=1))
+        fim = parametros.validated_data.get('fim', hoje)
+        agrupar_por = parametros.validated_data.get('agrupar_por')
+        status_compra = parametros.validated_data.get('status')
+
+        if agrupar_por == 'categoria':
+            # Totais por item vendido: não há contagem de compras por categoria
+            resumos = VendaLivro.objects.filter(dia__range=(inicio, fim))
+            somas = {'total_vendas': Sum('valor'), 'quantidade_itens': Sum('quantidade')}
+        else:
+            resumos = VendaDiaria.objects.filter(dia__range=(inicio, fim))
+            if status_compra:
+                resumos = resumos.filter(status=status_compra)
+            somas = {'total_vendas': Sum('total'), 'quantidade_vendas': Sum('quantidade_vendas')}
+
+        totais = resumos.aggregate(**somas)
+        grupos = []
+        if agrupar_por:
+            linhas = (
+                resumos.annotate(grupo=AGRUPAMENTOS_RELATORIO[agrupar_por])
+                .values('grupo')
+                .annotate(**somas)
+                .order_by('grupo')
+            )
+            grupos = [
+                {**linha, 'grupo': self._rotulo_grupo(agrupar_por, linha['grupo'])}
+                for linha in linhas
+            ]
+
+        return Response(
+            {
+                'inicio': inicio,
+                'fim': fim,
+                'agrupar_por': agrupar_por,
+                **{campo: valor or 0 for campo, valor in totais.items()},
+                'grupos': grupos,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def _rotulo_grupo(agrupar_por, grupo):
+        if agrupar_por == 'tipo_pagamento':
+            return Compra.TipoPagamento(grupo).label
+        if agrupar_por == 'status':
+            return Compra.StatusCompra(grupo).label
+        if agrupar_por == 'categoria':
+            return grupo or 'Sem categoria'
+        return grupo
+
+    @extend_schema(
+        summary="Exportar compras",
+        description=(
+            "Exporta as compras visíveis ao usuário, com os itens, em NDJSON (uma compra por linha) "
+            "ou CSV (um item por linha). A resposta é enviada em fluxo, sem paginação."
+        ),
+        parameters=[CompraExportarSerializer],
+        responses={(200, 'application/x-ndjson'): str, (200, 'text/csv'): str},
+    )
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        parametros = CompraExportarSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        dados = parametros.validated_data
+
+        compras = self.get_queryset()
+        if dados.get('inicio'):
+            compras = compras.filter(data__gte=timezone.make_aware(datetime.combine(dados['inicio'], time.min)))
+        if dados.get('fim'):
+            compras = compras.filter(
+                data__lt=timezone.make_aware(datetime.combine(dados['fim'] + timedelta(days=1), time.min))
+            )
+        if dados.get('status'):
+            compras = compras.filter(status=dados['status'])
+
+        formato = dados['formato']
+        partes = exportacao.para_o_servidor(exportacao.GERADORES[formato](compras), request)
+
+        resposta = StreamingHttpResponse(partes, content_type=exportacao.FORMATOS[formato])
+        resposta['Content-Disposition'] = f'attachment; filename="compras.{formato}"'
+        return resposta
+
     @extend_schema(
         summary="Adicionar livro ao carrinho",
         description="Adiciona um livro ao carrinho de compras do usuário autenticado.",
@@ -133,27 +307,44 @@ class CompraViewSet(ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-        compra, criada = Compra.objects.get_or_create(
+        with transaction.atomic():
+            compra, criada = self._carrinho(usuario)
+            compra.adicionar_itens({livro: quantidade})
+
+        return self._resposta_carrinho(compra, criada)
+
+    @extend_schema(
+        summary="Adicionar vários livros ao carrinho",
+        description=(
+            "Adiciona vários livros ao carrinho de compras do usuário autenticado de uma só vez. "
+            "Livros repetidos têm as quantidades somadas; o estoque de todos é validado antes de alterar o carrinho."
+        ),
+        request=CompraAdicionarItensAoCarrinhoSerializer,
+        responses={200: CompraSerializer, 201: CompraSerializer, 400: None},
+    )
+    @action(detail=False, methods=['post'])
+    def adicionar_itens_ao_carrinho(self, request):
+        serializer = CompraAdicionarItensAoCarrinhoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            compra, criada = self._carrinho(request.user)
+            compra.adicionar_itens(serializer.validated_data['itens'])
+
+        return self._resposta_carrinho(compra, criada)
+
+    @staticmethod
+    def _carrinho(usuario):
+        return Compra.objects.get_or_create(
             usuario=usuario,
             status=Compra.StatusCompra.CARRINHO,
             defaults={'tipo_pagamento': Compra.TipoPagamento.CARTAO_CREDITO},
         )
 
-        item_existente = compra.itens.filter(livro=livro).first()
-        if item_existente:
-            item_existente.quantidade += quantidade
-            item_existente.save()
-        else:
-            ItensCompra.objects.create(
-                compra=compra,
-                livro=livro,
-                quantidade=quantidade,
-                preco=livro.preco,
-            )
-
-        compra_serializada = CompraSerializer(compra)
-
+    @staticmethod
+    def _resposta_carrinho(compra, criada):
+        compra = CompraSerializer.setup_eager_loading(Compra.objects.filter(pk=compra.pk)).get()
         return Response(
-            compra_serializada.data,
+            CompraSerializer(compra).data,
             status=status.HTTP_200_OK if not criada else status.HTTP_201_CREATED,
         )
@@ -1,12 +1,16 @@
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.viewsets import ModelViewSet
 
+from app.middleware import MedicaoViewMixin
 from core.models import Editora
 from core.serializers import EditoraSerializer
 
+from .mixins import CachedResponseMixin, ConditionalGetMixin
 
-class EditoraViewSet(ModelViewSet):
+
+class EditoraViewSet(MedicaoViewMixin, CachedResponseMixin, ConditionalGetMixin, ModelViewSet):
     queryset = Editora.objects.order_by('-id')
     serializer_class = EditoraSerializer
     search_fields = ['nome', 'cidade']
     filter_backends = (SearchFilter, OrderingFilter)
+    version_key = 'editoras'
@@ -1,7 +1,9 @@
+from django.db.models import F, Prefetch
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from app.middleware import MedicaoViewMixin
 from core.models import Favorito, Livro
 from core.serializers.favorito import (
     FavoritoDetailSerializer,
@@ -9,8 +11,10 @@ from core.serializers.favorito import (
 )
 from core.serializers.livro import LivroComFavoritosSerializer
 
+COMENTARIOS_POR_LIVRO = 5  # comentários mais recentes retornados por livro
 
-class FavoritoViewSet(ModelViewSet):
+
+class FavoritoViewSet(MedicaoViewMixin, ModelViewSet):
     queryset = Favorito.objects.all()
     serializer_class = FavoritoSerializer
 
@@ -29,7 +33,28 @@ class FavoritoViewSet(ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def livros_com_estatisticas(self, request):
-        # Retorna apenas os livros que têm favoritos
-        livros = Livro.objects.filter(favoritos__isnull=False).distinct()
+        # Retorna apenas os livros que têm favoritos, com média e total mantidos em LivroEstatistica
+        comentarios = (
+            Favorito.objects
+            .exclude(comentario__isnull=True)
+            .select_related('usuario')
+            .only('livro_id', 'comentario', 'nota', 'usuario__email')
+        )
+        livros = (
+            Livro.objects
+            .filter(estatistica__total_favoritos__gt=0)
+            .annotate(media_notas=F('estatistica__media_notas'), total_favoritos=F('estatistica__total_favoritos'))
+            .only('id', 'titulo')
+            .order_by('-estatistica__total_favoritos', 'id')
+            .prefetch_related(
+                Prefetch('favoritos', queryset=comentarios[:COMENTARIOS_POR_LIVRO], to_attr='comentarios_recentes')
+            )
+        )
+
+        page = self.paginate_queryset(livros)
+        if page is not None:
+            serializer = LivroComFavoritosSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         serializer = LivroComFavoritosSerializer(livros, many=True)
         return Response(serializer.data)
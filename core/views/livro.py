@@ -1,33 +1,58 @@
-from django.db.models.aggregates import Sum
+import io
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from core.models import Compra, Favorito, ItensCompra, Livro
+from app.middleware import MedicaoViewMixin
+from core.importacao import importar_livros
+from core.models import Compra, Favorito, Livro
+from core.search import BuscaTextualFilter
 from core.serializers import (
     CompraSerializer,
     FavoritoSerializer,
     LivroAdicionarAoCarrinhoSerializer,
     LivroAjustarEstoqueSerializer,
     LivroAlterarPrecoSerializer,
+    LivroImportarSerializer,
     LivroListSerializer,
     LivroMaisVendidoSerializer,
     LivroRetrieveSerializer,
     LivroSerializer,
 )
 
+from .mixins import ConditionalGetMixin
+
 
-class LivroViewSet(ModelViewSet):
+class LivroViewSet(MedicaoViewMixin, ConditionalGetMixin, ModelViewSet):
     queryset = Livro.objects.order_by('-id')
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
-    filterset_fields = ['categoria__descricao', 'editora__nome']
-    search_fields = ['titulo']
-    ordering_fields = ['titulo', 'preco']
+    filter_backends = [DjangoFilterBackend, OrderingFilter, BuscaTextualFilter]
+    filterset_fields = {
+        'categoria__descricao': ['exact'],
+        'editora__nome': ['exact'],
+        'estatistica__media_notas': ['gte', 'lte'],
+        'estatistica__total_favoritos': ['gte'],
+    }
+    ordering_fields = ['titulo', 'preco', 'estatistica__media_notas', 'estatistica__total_favoritos']
     ordering = ['titulo']
+    version_key = 'livros'
+    version_dependencies = ('autores', 'editoras', 'categorias', 'imagens')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in {'list', 'retrieve'}:
+            return queryset.select_related('categoria', 'editora', 'capa').prefetch_related('autores')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -82,16 +107,36 @@ class LivroViewSet(ModelViewSet):
 
     @extend_schema(
         summary="Lista os livros mais vendidos",
-        description="Retorna os livros que venderam mais de 10 unidades.",
+        description="Retorna os livros que venderam mais de 10 unidades no período (compras finalizadas).",
+        parameters=[
+            OpenApiParameter(
+                'periodo',
+                str,
+                enum=['7', '30', '365', 'total'],
+                description='Janela em dias ou "total" (padrão).',
+            ),
+        ],
         responses={
             200: LivroMaisVendidoSerializer(many=True)
         },
     )
     @action(detail=False, methods=['get'])
     def mais_vendidos(self, request):
-        livros = Livro.objects.annotate(
-            total_vendidos=Sum('itens_compra__quantidade')
-        ).filter(total_vendidos__gt=10).order_by('-total_vendidos')
+        periodo = request.query_params.get('periodo', 'total')
+        if periodo not in {'7', '30', '365', 'total'}:
+            return Response(
+                {'periodo': 'Use 7, 30, 365 ou total.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if periodo == 'total':
+            # Leitura indexada dos contadores mantidos em LivroEstatistica
+            livros = Livro.objects.annotate(total_vendidos=F('estatistica__total_vendidos'))
+        else:
+            inicio = timezone.localdate() - timedelta(days=int(periodo) - 1)
+            livros = Livro.objects.filter(vendas__dia__gte=inicio).annotate(total_vendidos=Sum('vendas__quantidade'))
+
+        livros = livros.filter(total_vendidos__gt=10).only('id', 'titulo').order_by('-total_vendidos')
 
         serializer = LivroMaisVendidoSerializer(livros, many=True)
 
@@ -117,17 +162,11 @@ class LivroViewSet(ModelViewSet):
         serializer.is_valid(raise_exception=True)
         quantidade = serializer.validated_data['quantidade']
 
-        compra, created = Compra.objects.get_or_create(usuario=request.user, status=Compra.StatusCompra.CARRINHO)
-
-        item_existente = compra.itens.filter(livro=livro).first()
-
-        if item_existente:
-            item_existente.quantidade += quantidade
-            item_existente.preco = livro.preco
-            item_existente.save()
-        else:
-            ItensCompra.objects.create(compra=compra, livro=livro, quantidade=quantidade, preco=livro.preco)
+        with transaction.atomic():
+            compra, created = Compra.objects.get_or_create(usuario=request.user, status=Compra.StatusCompra.CARRINHO)
+            compra.adicionar_itens({livro: quantidade})
 
+        compra = CompraSerializer.setup_eager_loading(Compra.objects.filter(pk=compra.pk)).get()
         compra_serializada = CompraSerializer(compra)
         return Response(compra_serializada.data, status=status.HTTP_200_OK)
 
@@ -162,3 +201,29 @@ class LivroViewSet(ModelViewSet):
 
         status_code = status.HTTP_200_OK if favorito else status.HTTP_201_CREATED
         return Response(serializer.data, status=status_code)
+
+    @extend_schema(
+        summary="Importar livros",
+        description=(
+            "Importa livros em lote de um arquivo CSV ou NDJSON, criando autores, editoras e categorias "
+            "pelo nome. Retorna as quantidades criadas e os erros por linha."
+        ),
+        request={'multipart/form-data': LivroImportarSerializer},
+        responses={201: None, 400: None},
+    )
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser], parser_classes=[MultiPartParser])
+    def importar(self, request):
+        serializer = LivroImportarSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        arquivo = serializer.validated_data['arquivo']
+        formato = serializer.validated_data.get('formato') or (
+            'csv' if arquivo.name.lower().endswith('.csv') else 'ndjson'
+        )
+
+        resumo = importar_livros(io.TextIOWrapper(arquivo.file, encoding='utf-8-sig', newline=''), formato)
+        if resumo['interrompida'] and not resumo['livros']:
+            return Response({'arquivo': resumo['interrompida']['erro']}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Interrompida depois de gravar algum lote: importação parcial, com o ponto de parada no resumo
+        return Response(resumo, status=status.HTTP_201_CREATED)
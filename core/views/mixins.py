@@ -0,0 +1,122 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from core import cache as cache_respostas
+from core.models import VersaoRecurso
+
+
+class ConditionalGetMixin:
+    """
+    Responde ``304 Not Modified`` em list/retrieve a partir das versões de
+    ``VersaoRecurso``, antes de executar a consulta e a serialização.
+
+    ``version_key`` é a coleção da view (``'livros'``); no retrieve é usada a
+    chave do recurso (``'livros:42'``). ``version_dependencies`` lista as
+    coleções aninhadas na resposta (ex.: autores de um livro).
+    """
+
+    version_key = None
+    version_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_version_keys(self):
+        chave = self.version_key
+        if self.action == 'retrieve':
+            chave = f'{chave}:{self.kwargs[self.lookup_url_kwarg or self.lookup_field]}'
+        return [chave, *self.version_dependencies]
+
+    def get_validators(self, request):
+        versoes = VersaoRecurso.objects.filter(chave__in=self.get_version_keys()).values_list(
+            'chave', 'versao', 'atualizado_em'
+        )
+        versoes = sorted(versoes)
+
+        conteudo = '|'.join([request.get_full_path(), request.META.get('HTTP_ACCEPT', '')])
+        conteudo += '|' + '|'.join(f'{chave}={versao}' for chave, versao, _ in versoes)
+        etag = quote_etag(hashlib.md5(conteudo.encode(), usedforsecurity=False).hexdigest())
+
+        ultima_alteracao = max((atualizado_em for _, _, atualizado_em in versoes), default=None)
+        return etag, ultima_alteracao and int(ultima_alteracao.timestamp())
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, ultima_alteracao = self.get_validators(request)
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if if_none_match:
+            nao_modificado = etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        else:
+            nao_modificado = bool(ultima_alteracao and if_modified_since and ultima_alteracao <= if_modified_since)
+
+        if nao_modificado:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+
+        response['ETag'] = etag
+        if ultima_alteracao:
+            response['Last-Modified'] = http_date(ultima_alteracao)
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Guarda no cache do Django as respostas de list/retrieve, por URL completa
+    (com query params) e ``Accept``, até a próxima alteração da coleção
+    (``response_cache_key``; padrão: ``version_key``).
+
+    Deve vir antes de ``ConditionalGetMixin``: em um acerto, nem as versões
+    são consultadas no banco, e o ``ETag`` guardado responde ao
+    ``If-None-Match``. O cabeçalho ``X-Cache`` indica ``HIT`` ou ``MISS``.
+    Sem um cache compartilhado entre os processos (``core.cache.compartilhado``),
+    as respostas não são guardadas.
+    """
+
+    response_cache_key = None
+    cached_headers = ('ETag', 'Last-Modified')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not cache_respostas.compartilhado():
+            return handler(request, *args, **kwargs)
+
+        chave = cache_respostas.chave_resposta(self.response_cache_key or self.version_key, request)
+        guardada = cache.get(chave)
+
+        if guardada is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cabecalhos = {nome: response[nome] for nome in self.cached_headers if nome in response}
+                cache.set(chave, (response.data, cabecalhos), cache_respostas.tempo_expiracao())
+            response['X-Cache'] = 'MISS'
+            return response
+
+        data, cabecalhos = guardada
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if (
+            if_none_match
+            and 'ETag' in cabecalhos
+            and (cabecalhos['ETag'] in parse_etags(if_none_match) or if_none_match.strip() == '*')
+        ):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+
+        for nome, valor in cabecalhos.items():
+            response[nome] = valor
+        response['X-Cache'] = 'HIT'
+        return response
@@ -6,11 +6,12 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from app.middleware import MedicaoViewMixin
 from core.models import User
 from core.serializers import UserRegistrationSerializer, UserSerializer
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(MedicaoViewMixin, ModelViewSet):
     queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
 
@@ -27,7 +28,7 @@ class UserViewSet(ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UserRegistrationView(CreateAPIView):
+class UserRegistrationView(MedicaoViewMixin, CreateAPIView):
     """Endpoint para registro de novos usuários."""
 
     queryset = User.objects.all()
@@ -0,0 +1,20 @@
+# Configuração do gunicorn (carregada automaticamente pelo comando do Procfile)
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+# Métricas do Prometheus de vários workers (app/metrics.py)
+PROMETHEUS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+
+def on_starting(server):
+    """Descarta as métricas de execuções anteriores."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+        os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from uploader.models import Document, Image
+from uploader.models import Blob, Document, Image
 
 admin.site.register(Image)
 admin.site.register(Document)
+admin.site.register(Blob)
@@ -1,5 +1,11 @@
+from importlib import import_module
+
 from django.apps import AppConfig
 
 
 class MediaConfig(AppConfig):
     name = 'uploader'
+
+    def ready(self):
+        # Registers the signal receivers once the models are loaded
+        import_module(f'{self.name}.signals')
@@ -1,4 +1,6 @@
 import magic
+from django.conf import settings
+from PIL import Image as PILImage
 
 CONTENT_TYPE_ICO = 'image/x-icon'
 CONTENT_TYPE_JPG = 'image/jpeg'
@@ -6,14 +8,38 @@ CONTENT_TYPE_PNG = 'image/png'
 
 CONTENT_TYPE_PDF = 'application/pdf'
 
+# libmagic identifies the formats we accept from the first bytes of the file
+HEADER_SIZE = 2048
+DEFAULT_MAX_IMAGE_PIXELS = 40_000_000
+
+
+def read_header(file, size: int = HEADER_SIZE) -> bytes:
+    """Reads the first ``size`` bytes of the file, leaving it at the start."""
+    file.seek(0)
+    header = file.read(size)
+    file.seek(0)
+    return header
+
 
 def get_content_type(file):
-    if hasattr(file, 'temporary_file_path'):
-        content_type = magic.from_file(file.temporary_file_path(), mime=True)
-    else:
-        content_type = magic.from_buffer(file.read(), mime=True)
+    return magic.from_buffer(read_header(file), mime=True)
 
-    if hasattr(file, 'seek') and callable(file.seek):
-        file.seek(0)
 
-    return content_type
+def get_max_image_pixels() -> int:
+    return getattr(settings, 'IMAGE_MAX_PIXELS', DEFAULT_MAX_IMAGE_PIXELS)
+
+
+def get_image_size(file) -> tuple[int, int] | None:
+    """
+    Width and height read from the image header, without decoding the pixels.
+    Returns ``None`` if the file is not a readable image. Pillow raises
+    ``DecompressionBombError`` for images far above its own pixel limit.
+    """
+    file.seek(0)
+    try:
+        with PILImage.open(file) as image:
+            return image.size
+    except (OSError, SyntaxError, ValueError):
+        return None
+    finally:
+        file.seek(0)
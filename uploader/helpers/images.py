@@ -0,0 +1,121 @@
+import functools
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image as PILImage
+from PIL import ImageOps
+
+from uploader.models import Image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VARIANTS = {'thumb': (150, 150), 'medium': (400, 400), 'large': (1024, 1024)}
+DEFAULT_VARIANT_FORMATS = ['jpeg', 'webp']
+DEFAULT_VARIANT_WORKERS = 2
+
+FORMAT_OPTIONS = {
+    'jpeg': {'extension': 'jpg', 'save': {'quality': 85, 'optimize': True, 'progressive': True}},
+    'webp': {'extension': 'webp', 'save': {'quality': 80, 'method': 4}},
+}
+
+
+def get_variant_sizes() -> dict:
+    return getattr(settings, 'IMAGE_VARIANTS', DEFAULT_VARIANTS)
+
+
+def get_variant_formats() -> list:
+    return getattr(settings, 'IMAGE_VARIANT_FORMATS', DEFAULT_VARIANT_FORMATS)
+
+
+def missing_variants(image, check_files: bool = False) -> list:
+    """
+    Lists the ``(size, format)`` pairs configured but not recorded in
+    ``image.variants`` (or, with ``check_files``, recorded but missing from the storage).
+    """
+    storage = image.file.storage
+    missing = []
+    for size in get_variant_sizes():
+        for image_format in get_variant_formats():
+            name = image.variants.get(size, {}).get(image_format)
+            if not name or (check_files and not storage.exists(name)):
+                missing.append((size, image_format))
+    return missing
+
+
+def _encode(picture, image_format: str) -> bytes:
+    if image_format == 'jpeg' and picture.mode != 'RGB':
+        # JPEG has no alpha channel: flatten transparent images on a white background
+        background = PILImage.new('RGB', picture.size, 'white')
+        rgba = picture.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        picture = background
+    buffer = io.BytesIO()
+    picture.save(buffer, format=image_format.upper(), **FORMAT_OPTIONS[image_format]['save'])
+    return buffer.getvalue()
+
+
+def generate_variants(image) -> dict:
+    """
+    Creates the resized copies of ``image`` for every configured size and
+    format, saves them next to the original and records them in
+    ``image.variants`` as ``{size: {format: storage name}}``.
+    """
+    storage = image.file.storage
+    variants = {}
+    # Images sharing a blob share the variants too
+    folder = image.blob.sha256 if image.blob_id else image.public_id
+
+    with image.file.open('rb') as original:
+        source = ImageOps.exif_transpose(PILImage.open(original))
+        source.load()
+
+    for size, dimensions in get_variant_sizes().items():
+        picture = source.copy()
+        picture.thumbnail(dimensions, PILImage.Resampling.LANCZOS)  # never upscales
+        variants[size] = {}
+        for image_format in get_variant_formats():
+            name = f'images/variants/{folder}/{size}.{FORMAT_OPTIONS[image_format]["extension"]}'
+            variants[size][image_format] = storage.save(name, ContentFile(_encode(picture, image_format)))
+
+    image.variants = variants
+    image.save(update_fields=['variants'])
+    return variants
+
+
+def _generate_variants_in_background(image_id) -> None:
+    try:
+        image = Image.objects.filter(pk=image_id).first()
+        if image is not None:
+            generate_variants(image)
+    except Exception:  # noqa: BLE001
+        logger.exception('Could not generate the variants of image %s', image_id)
+    finally:
+        connection.close()
+
+
+@functools.cache
+def _executor() -> ThreadPoolExecutor:
+    workers = getattr(settings, 'IMAGE_VARIANT_WORKERS', DEFAULT_VARIANT_WORKERS)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-variants')
+
+
+def schedule_variants(image) -> None:
+    """
+    Generates the variants in a background thread pool (``IMAGE_VARIANT_WORKERS``
+    threads), once the upload transaction is committed: a burst of uploads waits in
+    the queue instead of resizing all at once. A duplicate upload reuses the variants
+    of the same content. Images whose generation failed (or was lost on a restart)
+    are picked up by the ``generate_image_variants`` command.
+    """
+    if image.blob_id:
+        existing = Image.objects.filter(blob_id=image.blob_id).exclude(pk=image.pk).exclude(variants={}).first()
+        if existing is not None:
+            image.variants = existing.variants
+            image.save(update_fields=['variants'])
+            return
+
+    transaction.on_commit(lambda: _executor().submit(_generate_variants_in_background, image.pk))
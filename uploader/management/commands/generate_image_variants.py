@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from uploader.helpers.images import generate_variants, missing_variants
+from uploader.models import Image
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates the resized variants of images that miss some of them (uploaded before variants existed, '
+        'whose background generation failed, or since new sizes or formats were configured), or of all images '
+        'with --all.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate the variants of every image.')
+        parser.add_argument(
+            '--check-files',
+            action='store_true',
+            help='Also regenerate variants recorded on the image but missing from the storage.',
+        )
+        parser.add_argument('--attempts', type=int, default=2, help='Attempts per image before giving up.')
+
+    def handle(self, *args, **options):
+        done = failed = skipped = 0
+        for image in Image.objects.order_by('pk').iterator():
+            if not options['all'] and not missing_variants(image, check_files=options['check_files']):
+                skipped += 1
+                continue
+            if self._generate(image, max(options['attempts'], 1)):
+                done += 1
+            else:
+                failed += 1
+        self.stdout.write(f'{done} images processed, {failed} failed, {skipped} already complete.')
+
+    def _generate(self, image, attempts):
+        for attempt in range(1, attempts + 1):
+            try:
+                generate_variants(image)
+            except Exception as error:  # noqa: BLE001
+                self.stderr.write(f'Image {image.pk} (attempt {attempt} of {attempts}): {error}')
+            else:
+                return True
+        return False
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:17
+
+import django.db.models.deletion
+import uploader.models.blob
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0002_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(upload_to=uploader.models.blob.blob_file_path)),
+                ('size', models.PositiveBigIntegerField()),
+                ('content_type', models.CharField(max_length=255)),
+                ('references', models.PositiveIntegerField(default=0)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Shared stored content. Empty for files uploaded before deduplication.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documents', to='uploader.blob'),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Shared stored content. Empty for files uploaded before deduplication.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='images', to='uploader.blob'),
+        ),
+    ]
@@ -1,2 +1,3 @@
+from .blob import Blob
 from .document import Document
 from .image import Image
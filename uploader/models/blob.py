@@ -0,0 +1,87 @@
+import hashlib
+import mimetypes
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+from uploader.helpers.files import get_content_type
+
+
+def blob_file_path(blob, _) -> str:
+    extension: str = mimetypes.guess_extension(blob.content_type)
+    if extension == '.jpe':
+        extension = '.jpg'
+    return f'blobs/{blob.sha256[:2]}/{blob.sha256}{extension or ""}'
+
+
+def hash_file(file) -> str:
+    """SHA-256 of the file, read in chunks so large uploads stay at constant memory."""
+    sha256 = hashlib.sha256()
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
+
+
+class Blob(models.Model):
+    """
+    Uploaded content stored once per SHA-256 hash. Images and documents with
+    the same content share the blob (and its file); ``references`` counts
+    them, and the file is removed when the last one is deleted.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=blob_file_path)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=255)
+    references = models.PositiveIntegerField(default=0)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f'{self.sha256} ({self.references})'
+
+    @classmethod
+    def store(cls, file) -> 'Blob':
+        """
+        Returns the blob with the file's content, adding one reference to it.
+
+        The upload is hashed before anything is written: Django keeps it in memory or
+        in a temporary file, so reading it twice is cheap. The file is only written to
+        the storage, under its hash, the first time the content is seen.
+        """
+        sha256 = hash_file(file)
+
+        with transaction.atomic():
+            blob = cls.objects.select_for_update().filter(sha256=sha256).first()
+            if blob is None:
+                blob = cls(sha256=sha256, size=file.size, content_type=get_content_type(file))
+                blob.file.save(file.name, file, save=False)
+                try:
+                    with transaction.atomic():
+                        blob.save()
+                except IntegrityError:
+                    # Same content stored concurrently by another upload: keep theirs
+                    blob.file.storage.delete(blob.file.name)
+                    blob = cls.objects.select_for_update().get(sha256=sha256)
+            cls.objects.filter(pk=blob.pk).update(references=F('references') + 1)
+
+        blob.references += 1
+        return blob
+
+    @classmethod
+    def release(cls, blob_id) -> bool:
+        """
+        Removes one reference. The last one deletes the blob and its file
+        (after commit) and returns ``True``.
+        """
+        with transaction.atomic():
+            blob = cls.objects.select_for_update().filter(pk=blob_id).first()
+            if blob is None:
+                return False
+            if blob.references > 1:
+                cls.objects.filter(pk=blob.pk).update(references=F('references') - 1)
+                return False
+            name, storage = blob.file.name, blob.file.storage
+            blob.delete()
+            transaction.on_commit(lambda: storage.delete(name))
+            return True
@@ -5,6 +5,8 @@ from django.db import models
 
 from uploader.helpers.files import get_content_type
 
+from .blob import Blob
+
 
 def document_file_path(document, _) -> str:
     content_type = get_content_type(document.file)
@@ -30,6 +32,14 @@ class Document(models.Model):
         ),
     )
     file = models.FileField(upload_to=document_file_path)
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='documents',
+        help_text='Shared stored content. Empty for files uploaded before deduplication.',
+    )
     description = models.CharField(max_length=255, blank=True)
     uploaded_on = models.DateTimeField(auto_now_add=True)
 
@@ -3,6 +3,8 @@ import uuid
 
 from django.db import models
 
+from .blob import Blob
+
 
 def image_file_path(image, _) -> str:
     extension: str = mimetypes.guess_extension(image.file.file.content_type)
@@ -27,8 +29,21 @@ class Image(models.Model):
         ),
     )
     file = models.ImageField(upload_to=image_file_path)
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='images',
+        help_text='Shared stored content. Empty for files uploaded before deduplication.',
+    )
     description = models.CharField(max_length=255, blank=True)
     uploaded_on = models.DateTimeField(auto_now_add=True)
+    variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Resized copies of the image, as {size: {format: file name}}. Filled in after the upload.',
+    )
 
     def __str__(self) -> str:
         return f'{self.description} - {self.attachment_key}'
@@ -36,3 +51,11 @@ class Image(models.Model):
     @property
     def url(self) -> str:
         return self.file.url  # pylint: disable=no-member
+
+    @property
+    def variant_urls(self) -> dict:
+        storage = self.file.storage  # pylint: disable=no-member
+        return {
+            size: {image_format: storage.url(name) for image_format, name in formats.items()}
+            for size, formats in self.variants.items()
+        }
@@ -1,7 +1,8 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from uploader.helpers.files import CONTENT_TYPE_PDF, get_content_type
-from uploader.models import Document
+from uploader.models import Blob, Document
 
 
 class DocumentUploadSerializer(serializers.ModelSerializer):
@@ -17,6 +18,12 @@ class DocumentUploadSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Invalid or corrupted document.')
         return value
 
+    def create(self, validated_data):
+        # Identical content is stored once: the new row points to the existing blob's file
+        with transaction.atomic():
+            blob = Blob.store(validated_data['file'])
+            return super().create({**validated_data, 'file': blob.file.name, 'blob': blob})
+
 
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,7 +1,15 @@
+from django.db import transaction
+from PIL import Image as PILImage
 from rest_framework import serializers
 
-from uploader.helpers.files import CONTENT_TYPE_JPG, CONTENT_TYPE_PNG
-from uploader.models import Image
+from uploader.helpers.files import (
+    CONTENT_TYPE_JPG,
+    CONTENT_TYPE_PNG,
+    get_content_type,
+    get_image_size,
+    get_max_image_pixels,
+)
+from uploader.models import Blob, Image
 
 
 class ImageUploadSerializer(serializers.ModelSerializer):
@@ -13,15 +21,34 @@ class ImageUploadSerializer(serializers.ModelSerializer):
 
     def validate_file(self, value):
         valid_content_types = [CONTENT_TYPE_JPG, CONTENT_TYPE_PNG]
-        if value.content_type not in valid_content_types:
+        if get_content_type(value) not in valid_content_types:
             raise serializers.ValidationError('Invalid or corrupted image.')
+
+        # Checks the dimensions from the header, before anything decodes the pixels
+        try:
+            size = get_image_size(value)
+        except PILImage.DecompressionBombError as error:
+            raise serializers.ValidationError('Image dimensions are too large.') from error
+        if size is None:
+            raise serializers.ValidationError('Invalid or corrupted image.')
+        width, height = size
+        if width * height > get_max_image_pixels():
+            raise serializers.ValidationError('Image dimensions are too large.')
         return value
 
+    def create(self, validated_data):
+        # Identical content is stored once: the new row points to the existing blob's file
+        with transaction.atomic():
+            blob = Blob.store(validated_data['file'])
+            return super().create({**validated_data, 'file': blob.file.name, 'blob': blob})
+
 
 class ImageSerializer(serializers.ModelSerializer):
+    variants = serializers.DictField(source='variant_urls', read_only=True)
+
     class Meta:
         model = Image
-        fields = ['url', 'description', 'uploaded_on']
+        fields = ['url', 'description', 'uploaded_on', 'variants']
         read_only_fields = ['url', 'attachment_key', 'uploaded_on']
 
     def create(self, validated_data):
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from uploader.models import Blob, Document, Image
+
+
+@receiver(post_delete, sender=Document)
+def release_document_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        Blob.release(instance.blob_id)
+
+
+@receiver(post_delete, sender=Image)
+def release_image_blob(sender, instance, **kwargs):
+    if instance.blob_id and Blob.release(instance.blob_id):
+        # Last image with this content: the variants are no longer shared either
+        storage = instance.file.storage
+        names = [name for formats in instance.variants.values() for name in formats.values()]
+        transaction.on_commit(lambda: [storage.delete(name) for name in names])
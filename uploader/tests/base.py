@@ -0,0 +1,55 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image as PILImage
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import User
+from uploader.helpers import images
+from uploader.models import Image
+
+PDF = b'%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n'
+
+
+def png(color='red', size=(20, 10), mode='RGB'):
+    buffer = io.BytesIO()
+    PILImage.new(mode, size, color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class UploaderTestCase(TestCase):
+    """Uploads to a temporary ``MEDIA_ROOT``, with the variants generated synchronously."""
+
+    image_variants = {'thumb': (5, 5)}
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media = Path(media.name)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, IMAGE_VARIANTS=self.image_variants))
+        # O executor roda as variações na hora, sem a thread e o fechamento da conexão
+        self.enterContext(
+            mock.patch.object(
+                images,
+                '_executor',
+                return_value=mock.Mock(submit=lambda _, pk: images.generate_variants(Image.objects.get(pk=pk))),
+            )
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(email='admin@example.com', is_superuser=True))
+
+    def enviar_imagem(self, conteudo, nome='foto.png', **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = self.client.post(
+                '/api/media/images/', {'file': SimpleUploadedFile(nome, conteudo, **kwargs)}, format='multipart'
+            )
+        assert resposta.status_code == status.HTTP_201_CREATED, resposta.data
+        return Image.objects.get(attachment_key=resposta.data['attachment_key'])
+
+    def arquivos(self, pasta):
+        return sorted(caminho.relative_to(self.media).as_posix() for caminho in (self.media / pasta).rglob('*.*'))
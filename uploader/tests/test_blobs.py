@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+
+from uploader.helpers import images
+from uploader.models import Blob, Document, Image
+
+from .base import PDF, UploaderTestCase, png
+
+
+class BlobTest(UploaderTestCase):
+    def test_conteudo_repetido_e_gravado_uma_vez_com_o_nome_do_hash(self):
+        primeira = self.enviar_imagem(png())
+        with mock.patch.object(FileSystemStorage, '_save') as salvar:
+            segunda = self.enviar_imagem(png())
+        salvar.assert_not_called()
+
+        blob = Blob.objects.get()
+        assert blob.references == Image.objects.count()
+        assert primeira.blob == segunda.blob == blob
+        assert primeira.file.name == segunda.file.name == blob.file.name == f'blobs/{blob.sha256[:2]}/{blob.sha256}.png'
+        assert self.arquivos('blobs') == [blob.file.name]
+
+    def test_conteudos_diferentes(self):
+        self.enviar_imagem(png('red'))
+        self.enviar_imagem(png('blue'))
+        assert list(Blob.objects.values_list('references', flat=True)) == [1, 1]
+        assert len(self.arquivos('blobs')) == Blob.objects.count()
+
+    def test_documentos_compartilham_o_blob(self):
+        for _ in range(2):
+            resposta = self.client.post(
+                '/api/media/documents/', {'file': SimpleUploadedFile('livro.pdf', PDF)}, format='multipart'
+            )
+            assert resposta.status_code == status.HTTP_201_CREATED, resposta.data
+        assert Blob.objects.get().references == Document.objects.count()
+
+    def test_excluir_libera_a_referencia_e_o_ultimo_remove_o_arquivo(self):
+        primeira, segunda = self.enviar_imagem(png()), self.enviar_imagem(png())
+        arquivos = self.arquivos('blobs') + self.arquivos('images/variants')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            primeira.delete()
+        assert Blob.objects.get().references == 1
+        assert self.arquivos('blobs') + self.arquivos('images/variants') == arquivos
+
+        with self.captureOnCommitCallbacks(execute=True):
+            segunda.delete()
+        assert not Blob.objects.exists()
+        assert self.arquivos('blobs') == self.arquivos('images/variants') == []
+
+    def test_upload_repetido_reaproveita_as_variacoes(self):
+        primeira = self.enviar_imagem(png())
+        assert primeira.variants
+
+        with mock.patch.object(images, 'generate_variants') as gerar:
+            segunda = self.enviar_imagem(png())
+        gerar.assert_not_called()
+        assert segunda.variants == primeira.variants
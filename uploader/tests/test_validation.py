@@ -0,0 +1,73 @@
+import io
+import struct
+import zlib
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image as PILImage
+from PIL import ImageFile
+from rest_framework import status
+
+from uploader.models import Blob, Image
+
+from .base import PDF, UploaderTestCase, png
+
+# png() é 20 x 10
+PIXELS = 200
+
+
+def imagem(image_format):
+    buffer = io.BytesIO()
+    PILImage.new('RGB', (20, 10), 'red').save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def png_header(width, height):
+    """A PNG with only the signature and the IHDR chunk: the size is in the header, with no pixels."""
+    ihdr = b'IHDR' + struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', len(ihdr) - 4) + ihdr + struct.pack('>I', zlib.crc32(ihdr))
+
+
+class ImageValidationTest(UploaderTestCase):
+    def enviar(self, conteudo, nome='foto.png', content_type='image/png'):
+        arquivo = SimpleUploadedFile(nome, conteudo, content_type=content_type)
+        return self.client.post('/api/media/images/', {'file': arquivo}, format='multipart')
+
+    def assertRecusada(self, resposta, mensagem):
+        assert resposta.status_code == status.HTTP_400_BAD_REQUEST
+        assert mensagem in str(resposta.data['file'])
+        assert not Image.objects.exists()
+        assert not Blob.objects.exists()
+        assert self.arquivos('.') == []
+
+    def test_content_type_falso(self):
+        # Um GIF é uma imagem válida para o Pillow: só o cabeçalho mostra que não é PNG nem JPEG
+        resposta = self.enviar(imagem('GIF'), content_type='image/png')
+        self.assertRecusada(resposta, 'Invalid or corrupted image.')
+
+    def test_pdf_como_imagem(self):
+        self.assertRecusada(self.enviar(PDF, content_type='image/jpeg'), 'image')
+
+    def test_imagem_com_extensao_errada_aceita(self):
+        image = self.enviar_imagem(png(), nome='foto.pdf', content_type='application/pdf')
+        assert image.file.name.endswith('.png')
+
+    @override_settings(IMAGE_MAX_PIXELS=PIXELS - 1)
+    def test_acima_do_limite_sem_decodificar(self):
+        with mock.patch.object(ImageFile.ImageFile, 'load') as decodificar:
+            resposta = self.enviar(png())
+        decodificar.assert_not_called()
+        self.assertRecusada(resposta, 'Image dimensions are too large.')
+
+    @override_settings(IMAGE_MAX_PIXELS=PIXELS)
+    def test_no_limite(self):
+        assert self.enviar_imagem(png()).file
+
+    def test_cabecalho_com_dimensoes_enormes(self):
+        # 100000 x 100000 declarados no cabeçalho: recusada sem alocar os pixels
+        with mock.patch.object(ImageFile.ImageFile, 'load') as decodificar:
+            resposta = self.enviar(png_header(100_000, 100_000))
+        decodificar.assert_not_called()
+        assert resposta.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Image.objects.exists()
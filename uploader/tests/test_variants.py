@@ -0,0 +1,105 @@
+import io
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image as PILImage
+from rest_framework import status
+
+from core.models import Categoria, Livro
+from uploader.helpers import images
+from uploader.models import Image
+
+from .base import UploaderTestCase, png
+
+VARIANTS = {'thumb': (5, 5), 'medium': (12, 12), 'large': (100, 100)}
+FORMATS = ['jpeg', 'webp']
+
+
+@override_settings(IMAGE_VARIANT_FORMATS=FORMATS)
+class VariantsTest(UploaderTestCase):
+    image_variants = VARIANTS
+
+    def abrir(self, nome):
+        with PILImage.open(self.media / nome) as picture:
+            return picture.format, picture.size
+
+    def sem_variacoes(self, conteudo):
+        """Uploads an image whose background generation never ran."""
+        with mock.patch.object(images, '_executor'):
+            return self.enviar_imagem(conteudo)
+
+    def command(self, *args):
+        saida, erros = io.StringIO(), io.StringIO()
+        call_command('generate_image_variants', *args, stdout=saida, stderr=erros)
+        return saida.getvalue().strip(), erros.getvalue()
+
+    def test_gera_os_tamanhos_e_formatos_configurados(self):
+        image = self.enviar_imagem(png(size=(20, 10)))
+        assert set(image.variants) == set(VARIANTS)
+        assert not images.missing_variants(image, check_files=True)
+
+        tamanhos = {'thumb': (5, 3), 'medium': (12, 6), 'large': (20, 10)}  # nunca amplia
+        for size, formats in image.variants.items():
+            assert set(formats) == set(FORMATS)
+            for image_format, nome in formats.items():
+                assert nome.startswith(f'images/variants/{image.blob.sha256}/{size}.')
+                assert self.abrir(nome) == (image_format.upper(), tamanhos[size])
+
+    def test_jpeg_de_imagem_transparente(self):
+        image = self.enviar_imagem(png(color=(0, 0, 0, 0), mode='RGBA'))
+        with PILImage.open(self.media / image.variants['thumb']['jpeg']) as picture:
+            assert picture.mode == 'RGB'
+            assert picture.getpixel((0, 0)) == (255, 255, 255)
+
+    def test_urls_no_serializer(self):
+        image = self.enviar_imagem(png())
+        livro = Livro.objects.create(
+            titulo='Dom Casmurro', quantidade=1, preco=30, categoria=Categoria.objects.create(descricao='Romance')
+        )
+        livro.capa = image
+        livro.save()
+
+        resposta = self.client.get(f'/api/livros/{livro.pk}/')
+        assert resposta.status_code == status.HTTP_200_OK
+        variants = resposta.data['capa']['variants']
+        assert set(variants) == set(VARIANTS)
+        for size, formats in image.variants.items():
+            assert variants[size] == {formato: f'{settings.MEDIA_URL}{nome}' for formato, nome in formats.items()}
+
+    def test_urls_sem_variacoes(self):
+        image = self.sem_variacoes(png())
+        assert image.variants == {}
+        assert image.variant_urls == {}
+
+    def test_comando_gera_as_que_faltam(self):
+        image = self.sem_variacoes(png())
+        self.enviar_imagem(png('blue'))
+
+        assert self.command() == ('1 images processed, 0 failed, 1 already complete.', '')
+        image.refresh_from_db()
+        assert not images.missing_variants(image, check_files=True)
+
+        assert self.command()[0] == '0 images processed, 0 failed, 2 already complete.'
+        assert self.command('--all')[0] == '2 images processed, 0 failed, 0 already complete.'
+
+    def test_comando_com_arquivos_apagados(self):
+        image = self.enviar_imagem(png())
+        (self.media / image.variants['thumb']['webp']).unlink()
+
+        assert self.command()[0] == '0 images processed, 0 failed, 1 already complete.'
+        assert self.command('--check-files')[0] == '1 images processed, 0 failed, 0 already complete.'
+        image.refresh_from_db()
+        assert (self.media / image.variants['thumb']['webp']).exists()
+
+    def test_comando_com_falha(self):
+        self.sem_variacoes(png())
+        with mock.patch(
+            'uploader.management.commands.generate_image_variants.generate_variants', side_effect=OSError('disco cheio')
+        ) as gerar:
+            saida, erros = self.command('--attempts', '3')
+        assert saida == '0 images processed, 1 failed, 0 already complete.'
+        assert gerar.call_count == erros.count('disco cheio') == len(erros.splitlines())
+        assert 'attempt 3 of 3' in erros
+        assert Image.objects.get().variants == {}
@@ -1,5 +1,7 @@
 from rest_framework import mixins, parsers, viewsets
 
+from app.middleware import MedicaoViewMixin
+from uploader.helpers.images import schedule_variants
 from uploader.models import Document, Image
 from uploader.serializers import (
     DocumentUploadSerializer,
@@ -7,7 +9,7 @@ from uploader.serializers import (
 )
 
 
-class CreateViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet):
+class CreateViewSet(MedicaoViewMixin, mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet):
     pass
 
 
@@ -21,3 +23,7 @@ class ImageUploadViewSet(CreateViewSet):
     queryset = Image.objects.all()  # pylint: disable=no-member
     serializer_class = ImageUploadSerializer
     parser_classes = [parsers.FormParser, parsers.MultiPartParser]
+
+    def perform_create(self, serializer):
+        image = serializer.save()
+        schedule_variants(image)